@@ -8,7 +8,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
 from app.database import Base
-from app.models import MonitoredTerm, Result
+from app.models import MonitoredTerm, Result, SearchDocument, TermMetric, Anomaly, StreamedTweet
 from app.config import Config
 
 config = context.config
@@ -0,0 +1,61 @@
+"""Add search documents and full-text index
+
+Revision ID: a3c1f9d2e7b4
+Revises: 5ef0269c3bc1
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a3c1f9d2e7b4'
+down_revision = '5ef0269c3bc1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('search_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('result_id', sa.Integer(), nullable=False),
+    sa.Column('keyword_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('tweet_id', sa.String(), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['keyword_id'], ['monitored_terms.id'], ),
+    sa.ForeignKeyConstraint(['result_id'], ['results.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_search_documents_result_id'), 'search_documents', ['result_id'], unique=False)
+    op.create_index('ix_search_documents_keyword_created', 'search_documents', ['keyword_id', 'created_at'], unique=False)
+
+    # Dialect-specific full-text index; kept in step with app.models.*_SEARCH_DDL
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+                   "body, content='search_documents', content_rowid='id')")
+        op.execute("CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+                   "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END")
+        op.execute("CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+                   "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); END")
+        op.execute("CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+                   "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+                   "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("ALTER TABLE search_documents ADD COLUMN body_tsv tsvector "
+                   "GENERATED ALWAYS AS (to_tsvector('english', body)) STORED")
+        op.execute("CREATE INDEX ix_search_documents_body_tsv ON search_documents USING GIN (body_tsv)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS search_documents_au")
+        op.execute("DROP TRIGGER IF EXISTS search_documents_ad")
+        op.execute("DROP TRIGGER IF EXISTS search_documents_ai")
+        op.execute("DROP TABLE IF EXISTS search_documents_fts")
+    op.drop_index('ix_search_documents_keyword_created', table_name='search_documents')
+    op.drop_index(op.f('ix_search_documents_result_id'), table_name='search_documents')
+    op.drop_table('search_documents')
@@ -0,0 +1,25 @@
+"""Add result summary status
+
+Revision ID: a8e2d4c6f913
+Revises: f1c7a9e3d582
+Create Date: 2026-10-19 22:41:07.318402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a8e2d4c6f913'
+down_revision = 'f1c7a9e3d582'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('results', sa.Column('summary_status', sa.String(length=16), nullable=False, server_default='complete'))
+    op.create_index(op.f('ix_results_summary_status'), 'results', ['summary_status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_results_summary_status'), table_name='results')
+    op.drop_column('results', 'summary_status')
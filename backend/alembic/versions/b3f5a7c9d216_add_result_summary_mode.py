@@ -0,0 +1,23 @@
+"""Add result summary mode
+
+Revision ID: b3f5a7c9d216
+Revises: a8e2d4c6f913
+Create Date: 2026-10-19 23:36:52.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b3f5a7c9d216'
+down_revision = 'a8e2d4c6f913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('results', sa.Column('summary_mode', sa.String(length=16), nullable=False, server_default='full'))
+
+
+def downgrade() -> None:
+    op.drop_column('results', 'summary_mode')
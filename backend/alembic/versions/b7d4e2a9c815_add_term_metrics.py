@@ -0,0 +1,47 @@
+"""Add term metrics aggregates
+
+Revision ID: b7d4e2a9c815
+Revises: a3c1f9d2e7b4
+Create Date: 2026-10-19 11:40:02.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b7d4e2a9c815'
+down_revision = 'a3c1f9d2e7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('term_metrics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('keyword_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('tweet_count', sa.Integer(), nullable=False),
+    sa.Column('unique_authors', sa.Integer(), nullable=False),
+    sa.Column('like_count', sa.Integer(), nullable=False),
+    sa.Column('retweet_count', sa.Integer(), nullable=False),
+    sa.Column('reply_count', sa.Integer(), nullable=False),
+    sa.Column('top_tweets', sa.JSON(), nullable=True),
+    sa.Column('author_sketch', sa.LargeBinary(), nullable=True),
+    sa.ForeignKeyConstraint(['keyword_id'], ['monitored_terms.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('keyword_id', 'granularity', 'bucket_start', name='uq_term_metrics_bucket')
+    )
+    op.create_table('term_metric_tweets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('keyword_id', sa.Integer(), nullable=False),
+    sa.Column('tweet_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['keyword_id'], ['monitored_terms.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('keyword_id', 'tweet_id', name='uq_term_metric_tweets_term_tweet')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('term_metric_tweets')
+    op.drop_table('term_metrics')
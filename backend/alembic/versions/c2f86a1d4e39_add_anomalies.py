@@ -0,0 +1,38 @@
+"""Add anomalies
+
+Revision ID: c2f86a1d4e39
+Revises: b7d4e2a9c815
+Create Date: 2026-10-19 14:02:51.774310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c2f86a1d4e39'
+down_revision = 'b7d4e2a9c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('anomalies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('keyword_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('tweet_count', sa.Integer(), nullable=False),
+    sa.Column('baseline_mean', sa.Float(), nullable=False),
+    sa.Column('zscore', sa.Float(), nullable=False),
+    sa.Column('top_tags', sa.JSON(), nullable=True),
+    sa.Column('detected_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['keyword_id'], ['monitored_terms.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_anomalies_id'), 'anomalies', ['id'], unique=False)
+    op.create_index(op.f('ix_anomalies_keyword_id'), 'anomalies', ['keyword_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_anomalies_keyword_id'), table_name='anomalies')
+    op.drop_index(op.f('ix_anomalies_id'), table_name='anomalies')
+    op.drop_table('anomalies')
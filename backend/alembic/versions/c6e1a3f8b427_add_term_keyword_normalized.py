@@ -0,0 +1,50 @@
+"""Add unique normalised keyword to monitored terms
+
+Revision ID: c6e1a3f8b427
+Revises: b3f5a7c9d216
+Create Date: 2026-10-20 09:12:40.381027
+
+Existing duplicates (same keyword up to case and whitespace) are kept, not
+merged: the oldest term gets the normalised keyword and later copies get a
+"#<id>" suffix so the unique index can be built. They can be cleaned up
+with the bulk delete endpoint.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c6e1a3f8b427'
+down_revision = 'b3f5a7c9d216'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('monitored_terms', sa.Column('keyword_normalized', sa.String(), nullable=True))
+
+    terms = sa.table(
+        'monitored_terms',
+        sa.column('id', sa.Integer),
+        sa.column('keyword', sa.String),
+        sa.column('keyword_normalized', sa.String),
+    )
+    connection = op.get_bind()
+    seen = set()
+    for term_id, keyword in connection.execute(sa.select(terms.c.id, terms.c.keyword).order_by(terms.c.id)):
+        normalized = " ".join((keyword or "").split()).lower()
+        if normalized in seen:
+            normalized = f"{normalized}#{term_id}"
+        seen.add(normalized)
+        connection.execute(
+            terms.update().where(terms.c.id == term_id).values(keyword_normalized=normalized)
+        )
+
+    with op.batch_alter_table('monitored_terms') as batch_op:
+        batch_op.alter_column('keyword_normalized', existing_type=sa.String(), nullable=False)
+        batch_op.create_index('ix_monitored_terms_keyword_normalized', ['keyword_normalized'], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('monitored_terms') as batch_op:
+        batch_op.drop_index('ix_monitored_terms_keyword_normalized')
+        batch_op.drop_column('keyword_normalized')
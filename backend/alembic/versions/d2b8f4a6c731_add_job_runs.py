@@ -0,0 +1,34 @@
+"""Add job runs
+
+Revision ID: d2b8f4a6c731
+Revises: c6e1a3f8b427
+Create Date: 2026-10-20 14:05:17.502946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd2b8f4a6c731'
+down_revision = 'c6e1a3f8b427'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('job_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job', sa.String(length=32), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duration_seconds', sa.Float(), nullable=False),
+    sa.Column('stats', sa.JSON(), nullable=True),
+    sa.Column('stages', sa.JSON(), nullable=True),
+    sa.Column('profile_id', sa.String(length=64), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_job_runs_started_at'), 'job_runs', ['started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_job_runs_started_at'), table_name='job_runs')
+    op.drop_table('job_runs')
@@ -0,0 +1,36 @@
+"""Add streamed tweets
+
+Revision ID: d9a3b5c7e104
+Revises: c2f86a1d4e39
+Create Date: 2026-10-19 16:25:13.402551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd9a3b5c7e104'
+down_revision = 'c2f86a1d4e39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('streamed_tweets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('keyword_id', sa.Integer(), nullable=False),
+    sa.Column('tweet_id', sa.String(), nullable=False),
+    sa.Column('tweet', sa.JSON(), nullable=False),
+    sa.Column('result_id', sa.Integer(), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['keyword_id'], ['monitored_terms.id'], ),
+    sa.ForeignKeyConstraint(['result_id'], ['results.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('keyword_id', 'tweet_id', name='uq_streamed_tweets_term_tweet')
+    )
+    op.create_index('ix_streamed_tweets_pending', 'streamed_tweets', ['keyword_id', 'result_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_streamed_tweets_pending', table_name='streamed_tweets')
+    op.drop_table('streamed_tweets')
@@ -0,0 +1,24 @@
+"""Add monitored term updated_at
+
+Revision ID: e4b8c1f6a273
+Revises: d9a3b5c7e104
+Create Date: 2026-10-19 18:40:06.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e4b8c1f6a273'
+down_revision = 'd9a3b5c7e104'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('monitored_terms', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE monitored_terms SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    op.drop_column('monitored_terms', 'updated_at')
@@ -0,0 +1,23 @@
+"""Add result insights
+
+Revision ID: f1c7a9e3d582
+Revises: e4b8c1f6a273
+Create Date: 2026-10-19 20:12:44.905217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'f1c7a9e3d582'
+down_revision = 'e4b8c1f6a273'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('results', sa.Column('insights', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('results', 'insights')
@@ -0,0 +1,235 @@
+import hashlib
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Result, TermMetric, TermMetricTweet
+from app.search import parse_tweet_time
+
+GRANULARITIES = {"hour": 3600, "day": 86400}
+TOP_TWEETS_PER_BUCKET = 5
+# HyperLogLog precision: 2**10 one-byte registers, ~3% standard error
+AUTHOR_SKETCH_PRECISION = 10
+_IN_CHUNK_SIZE = 500
+
+def _epoch(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def _tweet_arrays(tweets: Iterable[Dict[str, Any]], fallback: datetime) -> Dict[str, Any]:
+    """
+    Flatten tweet dicts into parallel columns, dropping tweets without an id
+    and duplicates within the batch.
+    """
+    # numpy is imported on first write rather than when the API boots
+    import numpy as np
+
+    seen = set()
+    ids, authors, timestamps, likes, retweets, replies = [], [], [], [], [], []
+    for tweet in tweets:
+        if not isinstance(tweet, dict) or tweet.get("id") is None:
+            continue
+        tweet_id = str(tweet["id"])
+        if tweet_id in seen:
+            continue
+        seen.add(tweet_id)
+        metrics = tweet.get("public_metrics") or {}
+        ids.append(tweet_id)
+        authors.append(str(tweet["author_id"]) if tweet.get("author_id") is not None else None)
+        timestamps.append(_epoch(parse_tweet_time(tweet.get("created_at"), fallback)))
+        likes.append(metrics.get("like_count", 0) or 0)
+        retweets.append(metrics.get("retweet_count", 0) or 0)
+        replies.append(metrics.get("reply_count", 0) or 0)
+    return {
+        "ids": np.array(ids, dtype=object),
+        "authors": np.array(authors, dtype=object),
+        "timestamps": np.array(timestamps, dtype=np.int64),
+        "likes": np.array(likes, dtype=np.int64),
+        "retweets": np.array(retweets, dtype=np.int64),
+        "replies": np.array(replies, dtype=np.int64),
+    }
+
+def _author_registers(authors: Iterable[Optional[str]], sketch: Optional[bytes] = None):
+    """Fold author ids into a HyperLogLog register array, starting from ``sketch``."""
+    import numpy as np
+
+    size = 1 << AUTHOR_SKETCH_PRECISION
+    if sketch:
+        registers = np.frombuffer(sketch, dtype=np.uint8).copy()
+    else:
+        registers = np.zeros(size, dtype=np.uint8)
+    rest_bits = 64 - AUTHOR_SKETCH_PRECISION
+    for author in authors:
+        if author is None:
+            continue
+        value = int.from_bytes(hashlib.blake2b(author.encode(), digest_size=8).digest(), "big")
+        index = value >> rest_bits
+        rank = rest_bits - (value & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > registers[index]:
+            registers[index] = rank
+    return registers
+
+def _estimate_cardinality(registers) -> int:
+    import numpy as np
+
+    size = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / size)
+    estimate = alpha * size * size / float(np.sum(np.power(2.0, -registers.astype(np.float64))))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * size and zeros:
+        # Linear counting is more accurate while most registers are empty
+        estimate = size * math.log(size / zeros)
+    return int(round(estimate))
+
+def _drop_counted(db: Session, keyword_id: int, columns: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Remove tweets already counted for the term and mark the rest as counted.
+    """
+    import numpy as np
+
+    ids = list(columns["ids"])
+    counted_ids = set()
+    for start in range(0, len(ids), _IN_CHUNK_SIZE):
+        counted_ids.update(
+            tweet_id for (tweet_id,) in db.query(TermMetricTweet.tweet_id).filter(
+                TermMetricTweet.keyword_id == keyword_id,
+                TermMetricTweet.tweet_id.in_(ids[start:start + _IN_CHUNK_SIZE]),
+            )
+        )
+    keep = np.array([tweet_id not in counted_ids for tweet_id in ids], dtype=bool)
+    if keep.any():
+        db.execute(
+            TermMetricTweet.__table__.insert(),
+            [{"keyword_id": keyword_id, "tweet_id": tweet_id} for tweet_id in columns["ids"][keep]],
+        )
+    return {name: values[keep] for name, values in columns.items()}
+
+def record_tweets(db: Session, keyword_id: int, tweets: List[Dict[str, Any]], fetched_at: Optional[datetime] = None) -> int:
+    """
+    Fold a batch of tweets into the hourly and daily aggregates for a term.
+
+    Tweets already counted for the term (e.g. returned again by a later fetch)
+    are skipped. The caller owns the transaction.
+
+    Returns:
+        Number of newly counted tweets
+    """
+    import numpy as np
+
+    columns = _tweet_arrays(tweets, fetched_at or datetime.now(timezone.utc))
+    if len(columns["ids"]) == 0:
+        return 0
+    columns = _drop_counted(db, keyword_id, columns)
+    counted = len(columns["ids"])
+    if counted == 0:
+        return 0
+
+    ids = columns["ids"]
+    authors = columns["authors"]
+    likes = columns["likes"]
+    retweets = columns["retweets"]
+    replies = columns["replies"]
+    engagement = likes + retweets + replies
+    for granularity, width in GRANULARITIES.items():
+        buckets = columns["timestamps"] - columns["timestamps"] % width
+        unique_buckets, inverse = np.unique(buckets, return_inverse=True)
+        bucket_starts = [datetime.fromtimestamp(int(b), timezone.utc) for b in unique_buckets]
+        existing = {
+            _epoch(row.bucket_start): row
+            for row in db.query(TermMetric).filter(
+                TermMetric.keyword_id == keyword_id,
+                TermMetric.granularity == granularity,
+                TermMetric.bucket_start.in_(bucket_starts),
+            )
+        }
+
+        tweet_counts = np.bincount(inverse)
+        like_sums = np.bincount(inverse, weights=likes).astype(np.int64)
+        retweet_sums = np.bincount(inverse, weights=retweets).astype(np.int64)
+        reply_sums = np.bincount(inverse, weights=replies).astype(np.int64)
+
+        for index, bucket in enumerate(unique_buckets):
+            members = inverse == index
+            row = existing.get(int(bucket))
+            if row is None:
+                row = TermMetric(
+                    keyword_id=keyword_id,
+                    granularity=granularity,
+                    bucket_start=datetime.fromtimestamp(int(bucket), timezone.utc),
+                    tweet_count=0, unique_authors=0, like_count=0, retweet_count=0, reply_count=0,
+                    top_tweets=[],
+                )
+                db.add(row)
+
+            registers = _author_registers(authors[members], row.author_sketch)
+            candidates = list(row.top_tweets or ()) + [
+                {"id": tweet_id, "engagement": int(score)}
+                for tweet_id, score in zip(ids[members], engagement[members])
+            ]
+            candidates.sort(key=lambda t: t["engagement"], reverse=True)
+
+            # Reassign the JSON column so the ORM sees the change
+            row.top_tweets = candidates[:TOP_TWEETS_PER_BUCKET]
+            row.author_sketch = registers.tobytes()
+            row.tweet_count += int(tweet_counts[index])
+            row.unique_authors = _estimate_cardinality(registers)
+            row.like_count += int(like_sums[index])
+            row.retweet_count += int(retweet_sums[index])
+            row.reply_count += int(reply_sums[index])
+    db.flush()
+    return counted
+
+def record_result(db: Session, result: Result) -> int:
+    return record_tweets(db, result.keyword_id, result.tweets_raw or [], fetched_at=result.created_at)
+
+def get_timeseries(
+    db: Session,
+    keyword_id: int,
+    granularity: str = "hour",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[TermMetric]:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    query = db.query(TermMetric).filter(
+        TermMetric.keyword_id == keyword_id,
+        TermMetric.granularity == granularity,
+    )
+    if since is not None:
+        query = query.filter(TermMetric.bucket_start >= since)
+    if until is not None:
+        query = query.filter(TermMetric.bucket_start < until)
+    return query.order_by(TermMetric.bucket_start).all()
+
+def backfill_metrics(db: Session, chunk_size: int = 500) -> int:
+    """
+    Rebuild all aggregates from stored results, reading results in id-ordered
+    chunks and aggregating each chunk per term in one vectorised pass.
+    """
+    db.query(TermMetric).delete(synchronize_session=False)
+    db.query(TermMetricTweet).delete(synchronize_session=False)
+    counted = 0
+    last_id = 0
+    while True:
+        chunk = (
+            db.query(Result)
+            .filter(Result.id > last_id)
+            .order_by(Result.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not chunk:
+            break
+        by_term: Dict[int, List[Dict[str, Any]]] = {}
+        fallback: Dict[int, datetime] = {}
+        for result in chunk:
+            by_term.setdefault(result.keyword_id, []).extend(result.tweets_raw or [])
+            fallback.setdefault(result.keyword_id, result.created_at)
+        for keyword_id, tweets in by_term.items():
+            counted += record_tweets(db, keyword_id, tweets, fetched_at=fallback[keyword_id])
+        last_id = chunk[-1].id
+        db.commit()
+    return counted
@@ -0,0 +1,90 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli reindex-search
+    python -m app.cli backfill-metrics
+    python -m app.cli run-daily-job
+    python -m app.cli export --kind tweets --format parquet --output tweets.parquet
+
+With CASSETTE_MODE=replay, run-daily-job replays recorded X/DeepSeek traffic
+offline (CASSETTE_REPLAY_SPEED=0 for full speed).
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+
+from app.database import SessionLocal
+from app import search, analytics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def reindex_search(args):
+    db = SessionLocal()
+    try:
+        indexed = search.rebuild_search_index(db, chunk_size=args.chunk_size)
+        logger.info(f"Indexed {indexed} search documents")
+    finally:
+        db.close()
+
+def backfill_metrics(args):
+    db = SessionLocal()
+    try:
+        counted = analytics.backfill_metrics(db, chunk_size=args.chunk_size)
+        logger.info(f"Aggregated {counted} tweets into term metrics")
+    finally:
+        db.close()
+
+def run_daily_job(args):
+    from app.services.scheduler_service import SchedulerService
+
+    asyncio.run(SchedulerService().run_daily_job())
+
+def export(args):
+    from app import export as exporter
+
+    db = SessionLocal()
+    try:
+        chunks = exporter.export_chunks(
+            db, args.kind, args.format, term_id=args.term_id, since=args.since, until=args.until
+        )
+        written = 0
+        with open(args.output, "wb") as output:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        logger.info(f"Wrote {written} bytes of {args.kind} to {args.output}")
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="X Monitor maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reindex = subparsers.add_parser("reindex-search", help="Rebuild the full-text search index from stored results")
+    reindex.add_argument("--chunk-size", type=int, default=500)
+    reindex.set_defaults(func=reindex_search)
+
+    backfill = subparsers.add_parser("backfill-metrics", help="Rebuild per-term time-series aggregates from stored results")
+    backfill.add_argument("--chunk-size", type=int, default=500)
+    backfill.set_defaults(func=backfill_metrics)
+
+    run_job = subparsers.add_parser("run-daily-job", help="Run the daily fetch-and-summarise job once, in the foreground")
+    run_job.set_defaults(func=run_daily_job)
+
+    export_parser = subparsers.add_parser("export", help="Stream stored results or tweets to an NDJSON or Parquet file")
+    export_parser.add_argument("--kind", choices=["results", "tweets"], default="results")
+    export_parser.add_argument("--format", choices=["ndjson", "parquet"], default="ndjson")
+    export_parser.add_argument("--term-id", type=int)
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+    export_parser.add_argument("--until", type=datetime.fromisoformat, help="ISO date/time, exclusive")
+    export_parser.add_argument("--output", required=True)
+    export_parser.set_defaults(func=export)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
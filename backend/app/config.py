@@ -9,12 +9,120 @@ class Config:
     X_BEARER_TOKEN = os.getenv("X_BEARER_TOKEN")
     X_ACCESS_TOKEN = os.getenv("X_ACCESS_TOKEN")
     X_ACCESS_TOKEN_SECRET = os.getenv("X_ACCESS_TOKEN_SECRET")
+    X_API_BASE_URL = os.getenv("X_API_BASE_URL", "https://api.twitter.com")
     
     DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
     DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")  # or "deepseek-reasoner"
+    DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+    
+    # Terms with at most LLM_BATCH_MAX_TWEETS_PER_TERM tweets are summarised
+    # together, up to LLM_BATCH_MAX_TERMS per DeepSeek request.
+    LLM_BATCH_ENABLED = os.getenv("LLM_BATCH_ENABLED", "true").lower() == "true"
+    LLM_BATCH_MAX_TWEETS_PER_TERM = int(os.getenv("LLM_BATCH_MAX_TWEETS_PER_TERM", "10"))
+    LLM_BATCH_MAX_TERMS = int(os.getenv("LLM_BATCH_MAX_TERMS", "8"))
+    LLM_BATCH_TOKENS_PER_TERM = int(os.getenv("LLM_BATCH_TOKENS_PER_TERM", "400"))
+    
+    # Local sentiment/entity/TF-IDF analytics per run, stored with each result.
+    # With LLM_INCLUDE_DIGEST the prompt carries that digest plus only
+    # LLM_DIGEST_TWEET_LIMIT sample tweets instead of 20.
+    LOCAL_ANALYTICS_ENABLED = os.getenv("LOCAL_ANALYTICS_ENABLED", "true").lower() == "true"
+    LLM_INCLUDE_DIGEST = os.getenv("LLM_INCLUDE_DIGEST", "true").lower() == "true"
+    LLM_DIGEST_TWEET_LIMIT = int(os.getenv("LLM_DIGEST_TWEET_LIMIT", "10"))
+    
+    # Summary diffing against the term's previous result: when at least
+    # SUMMARY_REUSE_THRESHOLD of the tweets were already summarised the
+    # previous summary is reused; at SUMMARY_INCREMENTAL_THRESHOLD the LLM
+    # only gets the new tweets and the previous summary.
+    SUMMARY_DIFF_ENABLED = os.getenv("SUMMARY_DIFF_ENABLED", "true").lower() == "true"
+    SUMMARY_REUSE_THRESHOLD = float(os.getenv("SUMMARY_REUSE_THRESHOLD", "0.9"))
+    SUMMARY_INCREMENTAL_THRESHOLD = float(os.getenv("SUMMARY_INCREMENTAL_THRESHOLD", "0.5"))
     
     DB_URL = os.getenv("DB_URL", "sqlite:///./local.db")
     
     SCHEDULER_TIMEZONE = "UTC"
     DAILY_RUN_HOUR = 8
-    DAILY_RUN_MINUTE = 0
\ No newline at end of file
+    DAILY_RUN_MINUTE = 0
+
+    # Spike detection over bucketed tweet volume
+    SPIKE_BUCKET_MINUTES = int(os.getenv("SPIKE_BUCKET_MINUTES", "60"))
+    SPIKE_EWMA_ALPHA = float(os.getenv("SPIKE_EWMA_ALPHA", "0.3"))
+    SPIKE_ZSCORE_THRESHOLD = float(os.getenv("SPIKE_ZSCORE_THRESHOLD", "3.0"))
+    SPIKE_MIN_COUNT = int(os.getenv("SPIKE_MIN_COUNT", "5"))
+    SPIKE_WARMUP_BUCKETS = int(os.getenv("SPIKE_WARMUP_BUCKETS", "3"))
+    SPIKE_TRIGGER_RUN = os.getenv("SPIKE_TRIGGER_RUN", "true").lower() == "true"
+    SPIKE_RERUN_COOLDOWN_MINUTES = int(os.getenv("SPIKE_RERUN_COOLDOWN_MINUTES", "60"))
+
+    # Record/replay of X and DeepSeek HTTP traffic: "off", "record" or "replay".
+    # Replay speed 1.0 reproduces recorded latencies; 0 replays as fast as possible.
+    CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+    CASSETTE_PATH = os.getenv("CASSETTE_PATH", "cassettes/session.jsonl.gz")
+    CASSETTE_REPLAY_SPEED = float(os.getenv("CASSETTE_REPLAY_SPEED", "1.0"))
+
+    # "poll" searches each term on schedule; "stream" consumes the X filtered
+    # stream continuously and summarises the buffered tweets on schedule.
+    INGESTION_MODE = os.getenv("INGESTION_MODE", "poll")
+    STREAM_MAX_RULES = int(os.getenv("STREAM_MAX_RULES", "25"))
+    STREAM_RULE_MAX_LENGTH = int(os.getenv("STREAM_RULE_MAX_LENGTH", "512"))
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "100"))
+    STREAM_FLUSH_SECONDS = float(os.getenv("STREAM_FLUSH_SECONDS", "2.0"))
+
+    # HTTP responses: JSON bodies at least this large are compressed, and
+    # GET /api/terms and /api/results are cached for a few seconds (writes
+    # in this process invalidate the cache immediately).
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+    # Server-sent events (GET /api/events): per-client queue bound before a
+    # slow client is told to resync, events kept for Last-Event-ID replay,
+    # and the idle interval between heartbeat comments.
+    EVENTS_CLIENT_QUEUE_SIZE = int(os.getenv("EVENTS_CLIENT_QUEUE_SIZE", "100"))
+    EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "200"))
+    EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+    # Failure isolation for X and DeepSeek. A scheduled run must finish within
+    # RUN_DEADLINE_SECONDS; request timeouts shrink to what is left of it.
+    # After CIRCUIT_FAILURE_THRESHOLD consecutive failures a dependency is
+    # skipped for CIRCUIT_RESET_SECONDS, then probed with a single call.
+    # An X rate limit is waited out only if it resets within
+    # X_RATE_LIMIT_MAX_WAIT_SECONDS (and before the deadline).
+    RUN_DEADLINE_SECONDS = float(os.getenv("RUN_DEADLINE_SECONDS", "1800"))
+    X_REQUEST_TIMEOUT_SECONDS = float(os.getenv("X_REQUEST_TIMEOUT_SECONDS", "30"))
+    X_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("X_RATE_LIMIT_MAX_WAIT_SECONDS", "60"))
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "60"))
+    # Hedged DeepSeek requests: a duplicate request is sent when the first has
+    # taken longer than this percentile of recent latencies.
+    LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    # Results stored as "summary pending" are retried every
+    # SUMMARY_RETRY_INTERVAL_MINUTES, and given up on after SUMMARY_RETRY_MAX_AGE_HOURS.
+    SUMMARY_RETRY_INTERVAL_MINUTES = int(os.getenv("SUMMARY_RETRY_INTERVAL_MINUTES", "15"))
+    SUMMARY_RETRY_BATCH_SIZE = int(os.getenv("SUMMARY_RETRY_BATCH_SIZE", "20"))
+    SUMMARY_RETRY_DEADLINE_SECONDS = float(os.getenv("SUMMARY_RETRY_DEADLINE_SECONDS", "300"))
+    SUMMARY_RETRY_MAX_AGE_HOURS = float(os.getenv("SUMMARY_RETRY_MAX_AGE_HOURS", "24"))
+
+    # Term management: the keyword -> term registry is reloaded after any
+    # term write in this process, and at least every TERM_REGISTRY_TTL_SECONDS
+    # to pick up writes made elsewhere. Bulk endpoints accept up to
+    # TERM_BULK_MAX_ITEMS terms per request.
+    TERM_REGISTRY_TTL_SECONDS = float(os.getenv("TERM_REGISTRY_TTL_SECONDS", "300"))
+    TERM_BULK_MAX_ITEMS = int(os.getenv("TERM_BULK_MAX_ITEMS", "10000"))
+
+    # Exports (GET /api/export, `python -m app.cli export`): results are read
+    # EXPORT_FETCH_SIZE at a time through a server-side cursor, and Parquet
+    # files are written in row groups of EXPORT_ROW_GROUP_SIZE rows.
+    EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "200"))
+    EXPORT_ROW_GROUP_SIZE = int(os.getenv("EXPORT_ROW_GROUP_SIZE", "50000"))
+
+    # Profiling (off until armed through /api/admin/profiling). The admin
+    # endpoints are disabled unless ADMIN_TOKEN is set, and then require it
+    # in the X-Admin-Token header. Profiles are written to PROFILE_DIR; the
+    # newest PROFILE_KEEP are kept.
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    PROFILE_TOP_ALLOCATIONS = int(os.getenv("PROFILE_TOP_ALLOCATIONS", "25"))
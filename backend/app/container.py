@@ -0,0 +1,86 @@
+"""
+Process-wide service container.
+
+Services are created on first use and shared: one TwitterService (one tweepy
+session and one httpx client) and one LLMService serve both the API and the
+scheduler. Service modules are imported inside the factories so importing
+the app does not pull in tweepy, apscheduler or numpy.
+"""
+from typing import TYPE_CHECKING, Optional
+
+from app.config import Config
+import logging
+
+if TYPE_CHECKING:
+    from app.services.llm_service import LLMService
+    from app.services.scheduler_service import SchedulerService
+    from app.services.stream_service import StreamService
+    from app.services.twitter_service import TwitterService
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    def __init__(self):
+        self._twitter_service: Optional["TwitterService"] = None
+        self._llm_service: Optional["LLMService"] = None
+        self._scheduler_service: Optional["SchedulerService"] = None
+        self._stream_service: Optional["StreamService"] = None
+
+    @property
+    def twitter_service(self) -> "TwitterService":
+        if self._twitter_service is None:
+            from app.services.twitter_service import TwitterService
+            self._twitter_service = TwitterService()
+        return self._twitter_service
+
+    @property
+    def llm_service(self) -> "LLMService":
+        if self._llm_service is None:
+            from app.services.llm_service import LLMService
+            self._llm_service = LLMService()
+        return self._llm_service
+
+    @property
+    def scheduler_service(self) -> "SchedulerService":
+        if self._scheduler_service is None:
+            from app.services.scheduler_service import SchedulerService
+            self._scheduler_service = SchedulerService(
+                twitter_service=self.twitter_service,
+                llm_service=self.llm_service
+            )
+        return self._scheduler_service
+
+    @property
+    def stream_service(self) -> Optional["StreamService"]:
+        """The filtered-stream ingester, or None unless INGESTION_MODE is "stream"."""
+        if Config.INGESTION_MODE != "stream":
+            return None
+        if self._stream_service is None:
+            from app.services.stream_service import StreamService
+            self._stream_service = StreamService(
+                self.twitter_service,
+                on_tweets=self.scheduler_service.observe_tweets
+            )
+        return self._stream_service
+
+    async def startup(self):
+        self.scheduler_service.start()
+        if self.stream_service:
+            await self.stream_service.start()
+
+    async def shutdown(self):
+        """Stop background work and close shared clients; only touches services that were created."""
+        if self._stream_service:
+            await self._stream_service.stop()
+        if self._scheduler_service and self._scheduler_service.scheduler.running:
+            self._scheduler_service.shutdown()
+        if self._llm_service:
+            await self._llm_service.aclose()
+        if self._twitter_service:
+            await self._twitter_service.aclose()
+
+services = ServiceContainer()
+
+def get_services() -> ServiceContainer:
+    """FastAPI dependency returning the shared container."""
+    return services
@@ -1,8 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from typing import List, Optional
-from app.models import MonitoredTerm, Result
-from app.schemas import MonitoredTermCreate, MonitoredTermUpdate, ResultCreate
+from sqlalchemy import desc, func, select
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.models import MonitoredTerm, Result, SearchDocument, TermMetric, TermMetricTweet, Anomaly, StreamedTweet, JobRun, normalize_keyword
+from app.schemas import MonitoredTermCreate, MonitoredTermUpdate, MonitoredTermBulkUpdateItem, ResultCreate, AnomalyCreate, JobRunCreate
+from app import search, analytics, instrumentation, http_cache, events, term_registry
+
+# Bound on bind parameters per IN (...) query; SQLite builds before 3.32 allow 999
+_IN_CHUNK_SIZE = 500
+
+def _terms_changed():
+    http_cache.response_cache.invalidate()
+    term_registry.registry.invalidate()
 
 def get_monitored_terms(db: Session, skip: int = 0, limit: int = 100) -> List[MonitoredTerm]:
     return db.query(MonitoredTerm).offset(skip).limit(limit).all()
@@ -17,6 +26,7 @@ def create_monitored_term(db: Session, term: MonitoredTermCreate) -> MonitoredTe
     db_term = MonitoredTerm(**term.dict())
     db.add(db_term)
     db.commit()
+    _terms_changed()
     db.refresh(db_term)
     return db_term
 
@@ -27,17 +37,114 @@ def update_monitored_term(db: Session, term_id: int, term_update: MonitoredTermU
         for field, value in update_data.items():
             setattr(db_term, field, value)
         db.commit()
+        _terms_changed()
         db.refresh(db_term)
     return db_term
 
+def _delete_terms(db: Session, term_ids: List[int]):
+    """Delete terms with their results and everything derived from them, without committing."""
+    # Children first: the ORM would otherwise null out results.keyword_id
+    for start in range(0, len(term_ids), _IN_CHUNK_SIZE):
+        chunk = term_ids[start:start + _IN_CHUNK_SIZE]
+        for model in (StreamedTweet, SearchDocument, TermMetric, TermMetricTweet, Anomaly, Result):
+            db.query(model).filter(model.keyword_id.in_(chunk)).delete(synchronize_session=False)
+        db.query(MonitoredTerm).filter(MonitoredTerm.id.in_(chunk)).delete(synchronize_session=False)
+    db.expire_all()
+
 def delete_monitored_term(db: Session, term_id: int) -> bool:
     db_term = db.query(MonitoredTerm).filter(MonitoredTerm.id == term_id).first()
     if db_term:
-        db.delete(db_term)
+        _delete_terms(db, [term_id])
         db.commit()
+        _terms_changed()
         return True
     return False
 
+def _terms_where_in(db: Session, column, values: Iterable[Any]) -> List[MonitoredTerm]:
+    values = list(values)
+    terms: List[MonitoredTerm] = []
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        terms.extend(db.query(MonitoredTerm).filter(column.in_(values[start:start + _IN_CHUNK_SIZE])))
+    return terms
+
+def bulk_import_monitored_terms(db: Session, terms: List[MonitoredTermCreate], update_existing: bool = False) -> Dict[str, int]:
+    """
+    Create many terms in one transaction.
+
+    Keywords are matched up to case and whitespace. A keyword that is already
+    monitored is skipped, or with ``update_existing`` takes the imported
+    settings; a keyword repeated within ``terms`` is imported once (the last
+    occurrence wins).
+
+    Returns:
+        Counts of created, updated and skipped terms
+    """
+    incoming: Dict[str, MonitoredTermCreate] = {}
+    for term in terms:
+        incoming[normalize_keyword(term.keyword)] = term
+    counts = {"created": 0, "updated": 0, "skipped": len(terms) - len(incoming)}
+
+    existing = {term.keyword_normalized: term for term in _terms_where_in(db, MonitoredTerm.keyword_normalized, incoming)}
+
+    with instrumentation.DB_WRITE_SECONDS.labels(operation="bulk_import_terms").time():
+        new_terms = []
+        for key, term in incoming.items():
+            values = term.dict()
+            db_term = existing.get(key)
+            if db_term is None:
+                new_terms.append(MonitoredTerm(**values))
+                continue
+            changes = {field: value for field, value in values.items() if getattr(db_term, field) != value}
+            if update_existing and changes:
+                for field, value in changes.items():
+                    setattr(db_term, field, value)
+                counts["updated"] += 1
+            else:
+                counts["skipped"] += 1
+        db.add_all(new_terms)
+        counts["created"] = len(new_terms)
+        db.commit()
+    _terms_changed()
+    return counts
+
+def bulk_update_monitored_terms(db: Session, updates: List[MonitoredTermBulkUpdateItem]) -> Tuple[int, List[int]]:
+    """
+    Apply per-term updates in one transaction. Nothing is written if any id
+    is unknown.
+
+    Returns:
+        Tuple of (terms updated, unknown ids)
+    """
+    terms = {term.id: term for term in _terms_where_in(db, MonitoredTerm.id, {update.id for update in updates})}
+    missing = sorted({update.id for update in updates} - terms.keys())
+    if missing:
+        return 0, missing
+    with instrumentation.DB_WRITE_SECONDS.labels(operation="bulk_update_terms").time():
+        for update in updates:
+            for field, value in update.dict(exclude_unset=True, exclude={"id"}).items():
+                setattr(terms[update.id], field, value)
+        db.commit()
+    _terms_changed()
+    return len(terms), []
+
+def bulk_delete_monitored_terms(db: Session, term_ids: List[int]) -> Tuple[int, List[int]]:
+    """
+    Delete many terms, with their results, in one transaction. Nothing is
+    deleted if any id is unknown.
+
+    Returns:
+        Tuple of (terms deleted, unknown ids)
+    """
+    terms = {term.id: term for term in _terms_where_in(db, MonitoredTerm.id, set(term_ids))}
+    missing = sorted(set(term_ids) - terms.keys())
+    if missing:
+        return 0, missing
+    with instrumentation.DB_WRITE_SECONDS.labels(operation="bulk_delete_terms").time():
+        _delete_terms(db, list(terms))
+        db.commit()
+    _terms_changed()
+    return len(terms), []
+
 def get_results(db: Session, skip: int = 0, limit: int = 100) -> List[Result]:
     return db.query(Result).order_by(desc(Result.created_at)).offset(skip).limit(limit).all()
 
@@ -57,8 +164,123 @@ def get_latest_results_per_term(db: Session) -> List[Result]:
     ).all()
 
 def create_result(db: Session, result: ResultCreate) -> Result:
-    db_result = Result(**result.dict())
-    db.add(db_result)
-    db.commit()
+    with instrumentation.DB_WRITE_SECONDS.labels(operation="create_result").time():
+        db_result = Result(**result.dict())
+        db.add(db_result)
+        db.flush()
+        search.index_result(db, db_result)
+        analytics.record_result(db, db_result)
+        db.commit()
+    http_cache.response_cache.invalidate()
     db.refresh(db_result)
-    return db_result
\ No newline at end of file
+    events.publish_result(db_result)
+    return db_result
+
+def get_previous_results(db: Session, keyword_ids: List[int]) -> Dict[int, Result]:
+    """
+    Each term's latest result with a generated (complete, not reused)
+    summary, the baseline for summary diffing.
+    """
+    if not keyword_ids:
+        return {}
+    latest = select(func.max(Result.id)).where(
+        Result.keyword_id.in_(keyword_ids),
+        Result.summary_status == "complete",
+        Result.summary_mode != "reuse"
+    ).group_by(Result.keyword_id)
+    return {result.keyword_id: result for result in db.query(Result).filter(Result.id.in_(latest))}
+
+def get_pending_results(db: Session, limit: int = 20) -> List[Result]:
+    """Oldest results still waiting for a summary."""
+    return db.query(Result).filter(Result.summary_status == "pending").order_by(Result.id).limit(limit).all()
+
+def expire_pending_results(db: Session, created_before: datetime) -> int:
+    """Stop retrying summaries for results pending since before ``created_before``."""
+    expired = db.query(Result).filter(
+        Result.summary_status == "pending",
+        Result.created_at < created_before
+    ).update({Result.summary_status: "failed"}, synchronize_session=False)
+    db.commit()
+    if expired:
+        http_cache.response_cache.invalidate()
+    return expired
+
+def complete_result_summary(db: Session, result: Result, summary: str) -> Result:
+    """Fill in a pending result's summary and re-index it."""
+    with instrumentation.DB_WRITE_SECONDS.labels(operation="complete_result_summary").time():
+        result.summary = summary
+        result.summary_status = "complete"
+        result.summary_mode = "full"
+        db.flush()
+        search.update_summary_document(db, result)
+        db.commit()
+    http_cache.response_cache.invalidate()
+    db.refresh(result)
+    events.publish_result(result, event_type="result_updated")
+    return result
+
+def create_anomaly(db: Session, anomaly: AnomalyCreate) -> Anomaly:
+    db_anomaly = Anomaly(**anomaly.dict())
+    db.add(db_anomaly)
+    db.commit()
+    db.refresh(db_anomaly)
+    return db_anomaly
+
+def get_anomalies(db: Session, keyword_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Anomaly]:
+    query = db.query(Anomaly)
+    if keyword_id is not None:
+        query = query.filter(Anomaly.keyword_id == keyword_id)
+    return query.order_by(desc(Anomaly.id)).offset(skip).limit(limit).all()
+
+def create_streamed_tweets(db: Session, tweets: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """
+    Insert a micro-batch of (keyword_id, tweet) pairs in one statement,
+    skipping pairs that are already stored.
+    """
+    rows = {(keyword_id, str(tweet["id"])): tweet for keyword_id, tweet in tweets}
+    if not rows:
+        return 0
+    with instrumentation.DB_WRITE_SECONDS.labels(operation="create_streamed_tweets").time():
+        existing = db.query(StreamedTweet.keyword_id, StreamedTweet.tweet_id).filter(
+            StreamedTweet.keyword_id.in_({keyword_id for keyword_id, _ in rows}),
+            StreamedTweet.tweet_id.in_({tweet_id for _, tweet_id in rows}),
+        ).all()
+        for key in existing:
+            rows.pop(tuple(key), None)
+        if rows:
+            db.execute(StreamedTweet.__table__.insert(), [
+                {"keyword_id": keyword_id, "tweet_id": tweet_id, "tweet": tweet}
+                for (keyword_id, tweet_id), tweet in rows.items()
+            ])
+        db.commit()
+    return len(rows)
+
+def get_pending_streamed_tweets(db: Session, keyword_id: int, limit: int = 50) -> List[StreamedTweet]:
+    """The oldest ``limit`` unsummarised tweets of a term; later ones wait for the next run."""
+    return db.query(StreamedTweet).filter(
+        StreamedTweet.keyword_id == keyword_id,
+        StreamedTweet.result_id == None
+    ).order_by(StreamedTweet.id).limit(limit).all()
+
+def mark_streamed_tweets_processed(db: Session, result_id: int, ids: List[int]) -> int:
+    """Attach the given streamed-tweet rows to the result that summarised them."""
+    updated = 0
+    for start in range(0, len(ids), _IN_CHUNK_SIZE):
+        updated += db.query(StreamedTweet).filter(
+            StreamedTweet.id.in_(ids[start:start + _IN_CHUNK_SIZE])
+        ).update({StreamedTweet.result_id: result_id}, synchronize_session=False)
+    db.commit()
+    return updated
+
+def create_job_run(db: Session, run: JobRunCreate) -> JobRun:
+    db_run = JobRun(**run.dict())
+    db.add(db_run)
+    db.commit()
+    db.refresh(db_run)
+    return db_run
+
+def get_job_runs(db: Session, job: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[JobRun]:
+    query = db.query(JobRun)
+    if job is not None:
+        query = query.filter(JobRun.job == job)
+    return query.order_by(desc(JobRun.id)).offset(skip).limit(limit).all()
@@ -0,0 +1,144 @@
+"""
+In-process pub/sub for pushing new results to connected dashboards.
+
+Writers call ``broker.publish`` from any thread (request threadpool,
+scheduler, CLI); each subscriber has a bounded queue on its own event loop.
+A subscriber that falls behind loses its backlog and gets a single
+``resync`` event telling it to refetch, so one slow client can never grow
+server memory or hold up the others.
+"""
+import asyncio
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set
+
+import orjson
+
+from app.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREVIEW_CHARS = 280
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def _offer(self, event: Dict[str, Any]):
+        # Runs on the subscriber's loop
+        if self.queue.full():
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "id": event["id"]})
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+class EventBroker:
+    def __init__(self, max_queue: int, replay_size: int):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=replay_size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Register a subscriber on the running loop.
+
+        Args:
+            last_event_id: Id of the last event the client saw (SSE
+                ``Last-Event-ID``); newer buffered events are queued first,
+                or a ``resync`` if the gap is no longer buffered
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is not None:
+                missed = [event for event in self._recent if event["id"] > last_event_id]
+                latest = self._recent[-1]["id"] if self._recent else 0
+                # Gap older than the buffer, or ids restarted with the process
+                if latest < last_event_id or (self._recent and self._recent[0]["id"] > last_event_id + 1):
+                    missed = [{"type": "resync", "id": latest}]
+                for event in missed:
+                    subscription._offer(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, **data: Any) -> Dict[str, Any]:
+        """Broadcast an event to every subscriber; safe to call from any thread."""
+        with self._lock:
+            event = {"type": event_type, "id": next(self._ids), **data}
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:  # loop closed; the stream's finally will unsubscribe
+                self.unsubscribe(subscription)
+        return event
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+broker = EventBroker(Config.EVENTS_CLIENT_QUEUE_SIZE, Config.EVENTS_REPLAY_SIZE)
+
+def publish_result(result, event_type: str = "result") -> Dict[str, Any]:
+    """
+    Announce a stored Result with a compact preview rather than the full
+    payload; ``result_updated`` when an existing result's summary was filled in.
+    """
+    tweets = result.tweets_raw if isinstance(result.tweets_raw, list) else []
+    summary = result.summary or ""
+    created_at = result.created_at.isoformat() if isinstance(result.created_at, datetime) else None
+    return broker.publish(
+        event_type,
+        result_id=result.id,
+        keyword_id=result.keyword_id,
+        keyword=result.monitored_term.keyword if result.monitored_term else None,
+        tweet_count=len(tweets),
+        summary_preview=summary[:SUMMARY_PREVIEW_CHARS],
+        summary_status=result.summary_status,
+        created_at=created_at,
+    )
+
+def format_sse(event: Dict[str, Any]) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event["id"], event["type"].encode(), orjson.dumps(event))
+
+async def event_stream(
+    last_event_id: Optional[int],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    heartbeat: float,
+) -> AsyncIterator[bytes]:
+    """
+    Server-sent events for one client, with a comment line as heartbeat
+    whenever nothing was sent for ``heartbeat`` seconds.
+    """
+    # Subscribing here rather than in the endpoint ties the subscription's
+    # lifetime to the response actually being streamed
+    subscription = broker.subscribe(last_event_id)
+    try:
+        # Tells EventSource how long to wait before reconnecting
+        yield b"retry: 3000\n\n"
+        while not await is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+        if subscription.dropped:
+            logger.info(f"Event subscriber disconnected after dropping {subscription.dropped} events")
@@ -0,0 +1,230 @@
+"""
+Streaming export of stored results and the tweets behind them.
+
+Results are read in id order through a server-side cursor (``yield_per``)
+and written out as they arrive, so memory stays flat however large the
+export: NDJSON is flushed every EXPORT_FETCH_SIZE rows, Parquet one row
+group of EXPORT_ROW_GROUP_SIZE rows at a time.
+
+Two datasets:
+- ``results``: one row per result with its summary and insights (tweets
+  are counted in the database, not loaded)
+- ``tweets``: one row per stored tweet, with its result and term
+"""
+import io
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.models import MonitoredTerm, Result
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # NDJSON only
+    pa = pq = None
+
+KINDS = ("results", "tweets")
+FORMATS = ("ndjson", "parquet")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+# Columns holding nested JSON; Parquet stores them as JSON text
+_JSON_COLUMNS = ("insights",)
+
+def _schema(kind: str) -> "pa.Schema":
+    timestamp = pa.timestamp("us", tz="UTC")
+    if kind == "results":
+        return pa.schema([
+            ("result_id", pa.int64()),
+            ("term_id", pa.int64()),
+            ("keyword", pa.string()),
+            ("created_at", timestamp),
+            ("tweet_count", pa.int64()),
+            ("summary", pa.string()),
+            ("summary_status", pa.string()),
+            ("summary_mode", pa.string()),
+            ("insights", pa.string()),
+        ])
+    return pa.schema([
+        ("result_id", pa.int64()),
+        ("term_id", pa.int64()),
+        ("keyword", pa.string()),
+        ("fetched_at", timestamp),
+        ("tweet_id", pa.string()),
+        ("created_at", pa.string()),
+        ("author_id", pa.string()),
+        ("author_username", pa.string()),
+        ("text", pa.string()),
+        ("like_count", pa.int64()),
+        ("retweet_count", pa.int64()),
+        ("reply_count", pa.int64()),
+        ("quote_count", pa.int64()),
+        ("url", pa.string()),
+    ])
+
+def check_export(kind: str, fmt: str):
+    """
+    Raises:
+        ValueError: For an unknown dataset or format, or Parquet without pyarrow
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown export kind '{kind}'; expected one of {', '.join(KINDS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'; expected one of {', '.join(FORMATS)}")
+    if fmt == "parquet" and pa is None:
+        raise ValueError("Parquet export requires pyarrow")
+
+def _optional_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+def iter_rows(
+    db: Session,
+    kind: str,
+    term_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield export rows for results created in [since, until), oldest first.
+
+    Args:
+        db: Database session; held for the whole iteration
+        kind: "results" or "tweets"
+        term_id: Only this term's results
+        since: Inclusive lower bound on result creation time
+        until: Exclusive upper bound on result creation time
+    """
+    if kind == "results":
+        columns = (
+            Result.id, Result.keyword_id, MonitoredTerm.keyword, Result.created_at,
+            func.json_array_length(Result.tweets_raw), Result.summary,
+            Result.summary_status, Result.summary_mode, Result.insights
+        )
+    else:
+        columns = (Result.id, Result.keyword_id, MonitoredTerm.keyword, Result.created_at, Result.tweets_raw)
+    query = db.query(*columns).join(MonitoredTerm, Result.keyword_id == MonitoredTerm.id)
+    if term_id is not None:
+        query = query.filter(Result.keyword_id == term_id)
+    if since is not None:
+        query = query.filter(Result.created_at >= since)
+    if until is not None:
+        query = query.filter(Result.created_at < until)
+    # yield_per streams rows from a server-side cursor instead of buffering the result set
+    query = query.order_by(Result.id).execution_options(yield_per=Config.EXPORT_FETCH_SIZE)
+
+    if kind == "results":
+        for result_id, keyword_id, keyword, created_at, tweet_count, summary, status, mode, insights in query:
+            yield {
+                "result_id": result_id,
+                "term_id": keyword_id,
+                "keyword": keyword,
+                "created_at": created_at,
+                "tweet_count": tweet_count or 0,
+                "summary": summary,
+                "summary_status": status,
+                "summary_mode": mode,
+                "insights": insights,
+            }
+        return
+
+    for result_id, keyword_id, keyword, created_at, tweets in query:
+        for tweet in tweets or []:
+            metrics = tweet.get("public_metrics") or {}
+            author = tweet.get("author") or {}
+            yield {
+                "result_id": result_id,
+                "term_id": keyword_id,
+                "keyword": keyword,
+                "fetched_at": created_at,
+                "tweet_id": _optional_str(tweet.get("id")),
+                "created_at": tweet.get("created_at"),
+                "author_id": _optional_str(tweet.get("author_id")),
+                "author_username": author.get("username"),
+                "text": tweet.get("text"),
+                "like_count": metrics.get("like_count"),
+                "retweet_count": metrics.get("retweet_count"),
+                "reply_count": metrics.get("reply_count"),
+                "quote_count": metrics.get("quote_count"),
+                "url": tweet.get("url"),
+            }
+
+def ndjson_chunks(rows: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """One JSON object per line, flushed every EXPORT_FETCH_SIZE rows."""
+    buffer: List[bytes] = []
+    for row in rows:
+        buffer.append(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC))
+        if len(buffer) >= Config.EXPORT_FETCH_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+def parquet_chunks(rows: Iterator[Dict[str, Any]], kind: str) -> Iterator[bytes]:
+    """A Parquet file, yielded one row group at a time and then the footer."""
+    schema = _schema(kind)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def row_group(batch: List[Dict[str, Any]]) -> bytes:
+        for row in batch:
+            for column in _JSON_COLUMNS:
+                if row.get(column) is not None:
+                    row[column] = orjson.dumps(row[column]).decode()
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        return sink.drain()
+
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= Config.EXPORT_ROW_GROUP_SIZE:
+            yield row_group(batch)
+            batch = []
+    if batch:
+        yield row_group(batch)
+    writer.close()
+    yield sink.drain()
+
+def export_chunks(
+    db: Session,
+    kind: str,
+    fmt: str,
+    term_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Iterator[bytes]:
+    """
+    The encoded export, as a stream of byte chunks.
+
+    Raises:
+        ValueError: See check_export; raised before anything is read
+    """
+    check_export(kind, fmt)
+    rows = iter_rows(db, kind, term_id=term_id, since=since, until=until)
+    return ndjson_chunks(rows) if fmt == "ndjson" else parquet_chunks(rows, kind)
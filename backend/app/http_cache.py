@@ -0,0 +1,194 @@
+"""
+Conditional GET and response caching for the dashboard's polled endpoints.
+
+Responses are validated by a data version built from the newest result id,
+the number of pending summaries and the monitored terms' update stamps, so
+an unchanged poll costs a couple of small queries (or none while the cached
+entry is fresh) and returns 304.
+Bodies are serialised once with orjson and compressed once per encoding.
+"""
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.models import MonitoredTerm, Result
+from app import instrumentation
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "last_modified", "expires", "_encoded", "_lock")
+
+    def __init__(self, body: bytes, etag: str, last_modified: Optional[datetime], expires: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        """The body compressed with ``encoding``, computed once per entry."""
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == "br":
+                    self._encoded[encoding] = brotli.compress(self.body, quality=5)
+                else:
+                    self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+            return self._encoded[encoding]
+
+class ResponseCache:
+    """Small LRU of serialised responses with a TTL, cleared on every write."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.last_write = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            # Deletes don't move any data timestamp forward; this does
+            self.last_write = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+response_cache = ResponseCache(Config.RESPONSE_CACHE_TTL_SECONDS, Config.RESPONSE_CACHE_MAX_ENTRIES)
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+def data_version(db: Session) -> Tuple[str, Optional[datetime]]:
+    """
+    Current version of the term and result data.
+
+    Returns:
+        Tuple of (opaque version string, last-modified time)
+    """
+    term_count, terms_updated = db.query(
+        func.count(MonitoredTerm.id),
+        func.max(func.coalesce(MonitoredTerm.updated_at, MonitoredTerm.created_at))
+    ).one()
+    latest = db.query(Result.id, Result.created_at).order_by(Result.id.desc()).first()
+    result_id, result_created = latest if latest else (0, None)
+    # Results are only rewritten when a pending summary is filled in or given
+    # up on, which always lowers this count (new pending results raise the id)
+    pending = db.query(func.count(Result.id)).filter(Result.summary_status == "pending").scalar()
+
+    stamps = [s for s in (_as_utc(terms_updated), _as_utc(result_created), response_cache.last_write) if s]
+    version = f"{term_count}:{terms_updated}:{result_id}:{pending}"
+    return version, max(stamps) if stamps else None
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison: W/"x" and "x" match
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+def _not_modified(request: Request, entry: CachedResponse) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, entry.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified:
+        try:
+            return entry.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _choose_encoding(request: Request, size: int) -> Optional[str]:
+    if size < Config.COMPRESSION_MIN_BYTES:
+        return None
+    accepted = {part.split(";")[0].strip() for part in request.headers.get("accept-encoding", "").split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def _validator_headers(entry: CachedResponse) -> Dict[str, str]:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if entry.last_modified:
+        headers["Last-Modified"] = format_datetime(entry.last_modified, usegmt=True)
+    return headers
+
+def cached_json(request: Request, db: Session, build: Callable[[], Any]) -> Response:
+    """
+    Serve a GET endpoint's JSON with ETag/Last-Modified validation.
+
+    Args:
+        request: The incoming request; its path and query form the cache key
+        db: Session used for the version check on a cache miss
+        build: Returns the JSON-serialisable payload; only called when the
+            client's copy is stale and no fresh cached body exists
+
+    Returns:
+        A 304, or a 200 with the (possibly compressed) orjson body
+    """
+    key = f"{request.url.path}?{'&'.join(sorted(f'{k}={v}' for k, v in request.query_params.multi_items()))}"
+    entry = response_cache.get(key)
+    if entry is not None:
+        instrumentation.CACHE_HITS.labels(cache="response").inc()
+    else:
+        instrumentation.CACHE_MISSES.labels(cache="response").inc()
+        version, last_modified = data_version(db)
+        etag = 'W/"' + hashlib.sha1(f"{key}|{version}".encode()).hexdigest()[:20] + '"'
+        entry = CachedResponse(b"", etag, last_modified, 0.0)
+        if _not_modified(request, entry):
+            return Response(status_code=304, headers=_validator_headers(entry))
+        entry.body = orjson.dumps(build())
+        entry.expires = time.monotonic() + response_cache.ttl
+        response_cache.put(key, entry)
+
+    headers = _validator_headers(entry)
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    body = entry.body
+    encoding = _choose_encoding(request, len(body))
+    if encoding:
+        body = entry.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,113 @@
+"""
+Prometheus metrics for the API, scheduler and external clients.
+
+Metric objects are module-level singletons; recording a sample is a lock and
+an add, cheap enough to leave on in production. Label values are kept to
+bounded sets (route templates, monitored term keywords, fixed stage names);
+see ``term_label`` for keywords reaching the X and DeepSeek clients.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# Latency buckets in seconds, from fast DB writes up to slow LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "xmonitor_http_request_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+X_SEARCH_PAGE_SECONDS = Histogram(
+    "xmonitor_x_search_page_seconds", "Latency of one X recent-search page request",
+    buckets=LATENCY_BUCKETS,
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "xmonitor_llm_request_seconds", "Latency of one DeepSeek chat completion",
+    ["model"], buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "xmonitor_llm_tokens_total", "DeepSeek tokens used", ["model", "kind"],
+)
+LLM_BATCH_FALLBACKS = Counter(
+    "xmonitor_llm_batch_fallbacks_total", "Terms from a batched summary that needed their own LLM call",
+    ["reason"],
+)
+HEDGED_REQUESTS = Counter(
+    "xmonitor_hedged_requests_total", "Requests that fired a hedge, by which attempt answered",
+    ["dependency", "winner"],
+)
+CIRCUIT_STATE = Gauge(
+    "xmonitor_circuit_state", "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+    ["dependency"],
+)
+DB_WRITE_SECONDS = Histogram(
+    "xmonitor_db_write_seconds", "Latency of database write transactions",
+    ["operation"], buckets=LATENCY_BUCKETS,
+)
+TWEETS_FETCHED = Counter(
+    "xmonitor_tweets_fetched_total", "Tweets fetched per term", ["term"],
+)
+RATE_LIMIT_WAITS = Counter(
+    "xmonitor_rate_limit_waits_total", "Times an X client waited on a rate limit", ["source"],
+)
+SUMMARY_MODES = Counter(
+    "xmonitor_summary_modes_total", "Summaries by how they were produced (full, incremental, reuse)", ["mode"],
+)
+LLM_PROMPT_TOKENS_SAVED = Counter(
+    "xmonitor_llm_prompt_tokens_saved_total", "Estimated prompt tokens not sent thanks to summary diffing",
+)
+SUMMARIES_PENDING = Counter(
+    "xmonitor_summaries_pending_total", "Results stored without a summary, to be filled by the retry sweep",
+)
+CACHE_HITS = Counter(
+    "xmonitor_cache_hits_total", "Cache hits", ["cache"],
+)
+CACHE_MISSES = Counter(
+    "xmonitor_cache_misses_total", "Cache misses", ["cache"],
+)
+ERRORS = Counter(
+    "xmonitor_errors_total", "Errors per term and pipeline stage", ["term", "stage"],
+)
+SCHEDULER_QUEUE_DEPTH = Gauge(
+    "xmonitor_scheduler_queue_depth", "Terms still waiting to be processed in the current run",
+)
+LAST_SUCCESS_TIMESTAMP = Gauge(
+    "xmonitor_term_last_success_timestamp_seconds", "Unix time of the last successful run per term", ["term"],
+)
+
+# Term label for keywords that are not monitored terms (e.g. POST /api/run)
+ADHOC_TERM = "adhoc"
+
+_monitored: ContextVar[bool] = ContextVar("metrics_monitored_terms", default=False)
+
+@contextmanager
+def monitored_terms() -> Iterator[None]:
+    """Mark the block as working on monitored terms, whose keywords may label metrics."""
+    token = _monitored.set(True)
+    try:
+        yield
+    finally:
+        _monitored.reset(token)
+
+def term_label(keyword: str) -> str:
+    """``keyword`` inside ``monitored_terms()``, otherwise ADHOC_TERM."""
+    return keyword if _monitored.get() else ADHOC_TERM
+
+def timed(histogram, func: Callable) -> Callable:
+    """Wrap a synchronous callable so every call is observed in ``histogram``."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+def render_latest():
+    """Return (body, content_type) for the /metrics endpoint."""
+    return generate_latest(), CONTENT_TYPE_LATEST
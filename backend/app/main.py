@@ -1,18 +1,50 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 import uvicorn
+import asyncio
+import hmac
+import logging
+import time
 
-from app.database import SessionLocal, engine, get_db, Base, test_database_connection
-from app import crud, schemas
-from app.services.twitter_service import TwitterService
-from app.services.llm_service import LLMService
-from app.services.scheduler_service import SchedulerService
+from app.database import get_db, test_database_connection
+from app import crud, schemas, search, analytics, instrumentation, http_cache, events, resilience, term_registry, profiling
+from app.container import ServiceContainer, get_services, services
+from app.config import Config
 
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="X Monitor API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is managed by Alembic (`alembic upgrade head` runs before the
+    # server in every deployment). A failed check is reported by /health
+    # instead of killing the process.
+    if not test_database_connection():
+        logger.error("Database connection failed on startup")
+    try:
+        await services.startup()
+    except Exception as e:
+        logger.error(f"Error starting background services: {str(e)}")
+    yield
+    await services.shutdown()
+
+class ProfiledRoute(APIRoute):
+    """Route whose sync endpoint is followed into the threadpool by request profiles."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = profiling.follow_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+app = FastAPI(title="X Monitor API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+app.router.route_class = ProfiledRoute
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,22 +53,53 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Bodies from http_cache arrive already compressed and are passed through
+app.add_middleware(GZipMiddleware, minimum_size=Config.COMPRESSION_MIN_BYTES, compresslevel=6)
 
-twitter_service = TwitterService()
-llm_service = LLMService()
-scheduler_service = SchedulerService()
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so /api/results/1 and /api/results/2 share a series
+        route = request.scope.get("route")
+        instrumentation.HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=str(status)
+        ).observe(time.perf_counter() - start)
 
-@app.on_event("startup")
-async def startup_event():
-    # Test database connection
-    if not test_database_connection():
-        raise RuntimeError("Database connection failed on startup")
-    
-    scheduler_service.start()
+def is_admin(token: Optional[str]) -> bool:
+    return bool(Config.ADMIN_TOKEN and token and hmac.compare_digest(token, Config.ADMIN_TOKEN))
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, and then need it in X-Admin-Token."""
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profile a request when armed through /api/admin/profiling, or when it sends X-Profile with the admin token."""
+    path = request.url.path
+    requested = bool(request.headers.get("x-profile")) and is_admin(request.headers.get("x-admin-token"))
+    if path.startswith("/api/admin") or not (requested or profiling.control.armed(profiling.REQUEST)):
+        return await call_next(request)
+    with profiling.Trace(profiling.REQUEST, f"{request.method} {path}", profile=True if requested else None) as trace:
+        response = await call_next(request)
+    if trace.profile_id:
+        response.headers["X-Profile-Id"] = trace.profile_id
+    return response
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    scheduler_service.shutdown()
+def sync_stream_terms(background_tasks: BackgroundTasks, container: ServiceContainer):
+    """Refresh stream rules and the term matcher after a term write."""
+    if container.stream_service:
+        background_tasks.add_task(container.stream_service.refresh_terms)
 
 @app.get("/")
 def read_root():
@@ -59,43 +122,235 @@ def health_check():
             "version": "1.0.0"
         }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = instrumentation.render_latest()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/api/terms", response_model=List[schemas.MonitoredTerm])
-def get_terms(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_monitored_terms(db, skip=skip, limit=limit)
+def get_terms(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return http_cache.cached_json(request, db, lambda: [
+        schemas.MonitoredTerm.model_validate(term).model_dump()
+        for term in crud.get_monitored_terms(db, skip=skip, limit=limit)
+    ])
+
+def keyword_conflict(db: Session) -> HTTPException:
+    """Roll back a write that hit the unique keyword index."""
+    db.rollback()
+    return HTTPException(status_code=409, detail="A term with this keyword already exists")
+
+def check_bulk_size(count: int):
+    if count > Config.TERM_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {Config.TERM_BULK_MAX_ITEMS} terms per request")
 
 @app.post("/api/terms", response_model=schemas.MonitoredTerm)
-def create_term(term: schemas.MonitoredTermCreate, db: Session = Depends(get_db)):
-    return crud.create_monitored_term(db=db, term=term)
+def create_term(term: schemas.MonitoredTermCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), container: ServiceContainer = Depends(get_services)):
+    try:
+        db_term = crud.create_monitored_term(db=db, term=term)
+    except IntegrityError:
+        raise keyword_conflict(db)
+    sync_stream_terms(background_tasks, container)
+    return db_term
+
+# Bulk routes are registered before /api/terms/{term_id} so "bulk" isn't parsed as an id
+@app.post("/api/terms/bulk", response_model=schemas.MonitoredTermBulkResult)
+def import_terms(request: schemas.MonitoredTermBulkImport, background_tasks: BackgroundTasks, db: Session = Depends(get_db), container: ServiceContainer = Depends(get_services)):
+    check_bulk_size(len(request.terms))
+    try:
+        counts = crud.bulk_import_monitored_terms(db, request.terms, update_existing=request.on_conflict == "update")
+    except IntegrityError:
+        raise keyword_conflict(db)
+    sync_stream_terms(background_tasks, container)
+    return schemas.MonitoredTermBulkResult(**counts)
+
+@app.put("/api/terms/bulk", response_model=schemas.MonitoredTermBulkResult)
+def update_terms(request: schemas.MonitoredTermBulkUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), container: ServiceContainer = Depends(get_services)):
+    check_bulk_size(len(request.terms))
+    try:
+        updated, missing = crud.bulk_update_monitored_terms(db, request.terms)
+    except IntegrityError:
+        raise keyword_conflict(db)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Terms not found: {missing}")
+    sync_stream_terms(background_tasks, container)
+    return schemas.MonitoredTermBulkResult(updated=updated)
+
+@app.post("/api/terms/bulk/delete", response_model=schemas.MonitoredTermBulkResult)
+def delete_terms(request: schemas.MonitoredTermBulkDelete, background_tasks: BackgroundTasks, db: Session = Depends(get_db), container: ServiceContainer = Depends(get_services)):
+    check_bulk_size(len(request.ids))
+    deleted, missing = crud.bulk_delete_monitored_terms(db, request.ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Terms not found: {missing}")
+    sync_stream_terms(background_tasks, container)
+    return schemas.MonitoredTermBulkResult(deleted=deleted)
 
 @app.put("/api/terms/{term_id}", response_model=schemas.MonitoredTerm)
-def update_term(term_id: int, term_update: schemas.MonitoredTermUpdate, db: Session = Depends(get_db)):
-    db_term = crud.update_monitored_term(db, term_id=term_id, term_update=term_update)
+def update_term(term_id: int, term_update: schemas.MonitoredTermUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), container: ServiceContainer = Depends(get_services)):
+    try:
+        db_term = crud.update_monitored_term(db, term_id=term_id, term_update=term_update)
+    except IntegrityError:
+        raise keyword_conflict(db)
     if db_term is None:
         raise HTTPException(status_code=404, detail="Term not found")
+    sync_stream_terms(background_tasks, container)
     return db_term
 
 @app.delete("/api/terms/{term_id}")
-def delete_term(term_id: int, db: Session = Depends(get_db)):
+def delete_term(term_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), container: ServiceContainer = Depends(get_services)):
     success = crud.delete_monitored_term(db, term_id=term_id)
     if not success:
         raise HTTPException(status_code=404, detail="Term not found")
+    sync_stream_terms(background_tasks, container)
     return {"message": "Term deleted successfully"}
 
+@app.get("/api/terms/{term_id}/timeseries", response_model=schemas.TimeseriesResponse)
+def get_term_timeseries(
+    term_id: int,
+    granularity: str = Query("hour", pattern="^(hour|day)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    if crud.get_monitored_term(db, term_id=term_id) is None:
+        raise HTTPException(status_code=404, detail="Term not found")
+    rows = analytics.get_timeseries(db, term_id, granularity=granularity, since=since, until=until)
+    points = [
+        schemas.TimeseriesPoint(
+            bucket_start=row.bucket_start,
+            tweet_count=row.tweet_count,
+            unique_authors=row.unique_authors,
+            like_count=row.like_count,
+            retweet_count=row.retweet_count,
+            reply_count=row.reply_count,
+            top_tweet_ids=[str(t["id"]) for t in row.top_tweets or []]
+        )
+        for row in rows
+    ]
+    return schemas.TimeseriesResponse(keyword_id=term_id, granularity=granularity, points=points)
+
 @app.get("/api/results", response_model=List[schemas.Result])
-def get_results(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_results(db, skip=skip, limit=limit)
+def get_results(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return http_cache.cached_json(request, db, lambda: [
+        schemas.Result.model_validate(result).model_dump()
+        for result in crud.get_results(db, skip=skip, limit=limit)
+    ])
 
 @app.get("/api/results/{result_id}", response_model=schemas.Result)
-def get_result(result_id: int, db: Session = Depends(get_db)):
-    result = crud.get_result(db, result_id=result_id)
-    if result is None:
-        raise HTTPException(status_code=404, detail="Result not found")
-    return result
+def get_result(request: Request, result_id: int, db: Session = Depends(get_db)):
+    def build():
+        result = crud.get_result(db, result_id=result_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Result not found")
+        return schemas.Result.model_validate(result).model_dump()
+    return http_cache.cached_json(request, db, build)
+
+@app.get("/api/search", response_model=schemas.SearchResponse)
+def search_results(
+    q: str = Query(..., min_length=1),
+    term_id: Optional[int] = None,
+    kind: Optional[str] = Query(None, pattern="^(tweet|summary)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    try:
+        hits, next_cursor = search.search_documents(
+            db, q, keyword_id=term_id, kind=kind, since=since, until=until,
+            cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.SearchResponse(hits=hits, next_cursor=next_cursor)
+
+@app.get("/api/export")
+def export_results(
+    kind: str = Query("results", pattern="^(results|tweets)$"),
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|parquet)$"),
+    term_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Stream results or their tweets as NDJSON or Parquet, in constant memory."""
+    # pyarrow (and numpy with it) load on first export, not at startup
+    from app import export
+    try:
+        chunks = export.export_chunks(db, kind, fmt, term_id=term_id, since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # The session stays open until the response has been sent
+    return StreamingResponse(
+        chunks,
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{fmt}"'}
+    )
+
+@app.get("/api/anomalies", response_model=List[schemas.Anomaly])
+def get_anomalies(term_id: Optional[int] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return crud.get_anomalies(db, keyword_id=term_id, skip=skip, limit=limit)
+
+@app.get("/api/events", include_in_schema=False)
+async def stream_events(request: Request, last_event_id: Optional[int] = Query(None)):
+    """Server-sent events: new results, job completions, and resync hints."""
+    header = request.headers.get("last-event-id")
+    if header and header.isdigit():
+        last_event_id = int(header)
+    return StreamingResponse(
+        events.event_stream(last_event_id, request.is_disconnected, Config.EVENTS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        # identity keeps GZipMiddleware from buffering the stream
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/runs", response_model=List[schemas.JobRun])
+def get_runs(job: Optional[str] = Query(None, pattern="^(daily|term)$"), skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """Recent scheduled runs with their stats and per-stage timings."""
+    return crud.get_job_runs(db, job=job, skip=skip, limit=limit)
+
+@app.get("/api/admin/profiling", response_model=schemas.ProfilingState, dependencies=[Depends(require_admin)])
+def get_profiling():
+    return profiling.control.state()
+
+@app.post("/api/admin/profiling", response_model=schemas.ProfilingState, dependencies=[Depends(require_admin)])
+def arm_profiling(settings: schemas.ProfilingSettings):
+    """Profile the next ``runs`` scheduled runs and ``requests`` API requests."""
+    profiling.control.arm(runs=settings.runs, requests=settings.requests, route_prefix=settings.route_prefix)
+    return profiling.control.state()
+
+@app.delete("/api/admin/profiling", response_model=schemas.ProfilingState, dependencies=[Depends(require_admin)])
+def disarm_profiling():
+    profiling.control.disarm()
+    return profiling.control.state()
+
+@app.get("/api/admin/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    return profiling.store.list()
+
+@app.get("/api/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def get_profile(profile_id: str):
+    """A profile's summary: stage breakdown, sample count and top allocations."""
+    summary = profiling.store.get(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
+
+@app.get("/api/admin/profiles/{profile_id}/{fmt}", dependencies=[Depends(require_admin)])
+def download_profile(profile_id: str, fmt: str):
+    """Download a profile as speedscope JSON (https://www.speedscope.app) or pstats."""
+    path = profiling.store.file(profile_id, fmt)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if fmt == "speedscope" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=f"{profile_id}{profiling.FORMATS[fmt]}")
 
 @app.post("/api/run", response_model=schemas.TweetSummaryResponse)
-async def manual_run(request: schemas.TweetSummaryRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def manual_run(request: schemas.TweetSummaryRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db), container: ServiceContainer = Depends(get_services)):
+    if not container.llm_service.available:
+        raise HTTPException(status_code=503, detail="Summaries are unavailable: DEEPSEEK_API_KEY is not configured")
     try:
-        tweets = await twitter_service.search_tweets(
+        tweets = await container.twitter_service.search_tweets(
             keyword=request.keyword,
             restrict_following=request.restrict_following
         )
@@ -107,15 +362,23 @@ async def manual_run(request: schemas.TweetSummaryRequest, background_tasks: Bac
                 keyword=request.keyword
             )
         
-        summary = await llm_service.summarize_tweets(tweets, request.keyword)
+        insights = None
+        if Config.LOCAL_ANALYTICS_ENABLED:
+            # numpy/scipy load on first use, not at startup
+            from app.services import tweet_analytics
+            insights = tweet_analytics.analyze_tweets(request.keyword, tweets)
+            digest = tweet_analytics.format_digest(insights) or None
+        else:
+            digest = None
+        summary = await container.llm_service.summarize_tweets(tweets, request.keyword, digest=digest)
         
-        term = crud.get_monitored_terms(db)
-        matching_term = next((t for t in term if t.keyword == request.keyword), None)
+        matching_term = term_registry.registry.lookup(db, request.keyword)
         if matching_term:
             result_data = schemas.ResultCreate(
                 keyword_id=matching_term.id,
                 tweets_raw=tweets,
-                summary=summary
+                summary=summary,
+                insights=insights
             )
             crud.create_result(db=db, result=result_data)
         
@@ -124,6 +387,8 @@ async def manual_run(request: schemas.TweetSummaryRequest, background_tasks: Bac
             tweet_count=len(tweets),
             keyword=request.keyword
         )
+    except resilience.Unavailable as e:
+        raise HTTPException(status_code=503, detail=f"Temporarily unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
@@ -1,19 +1,37 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, JSON, Index, DDL, event, UniqueConstraint, Float, LargeBinary
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.database import Base
+from datetime import datetime, timezone
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def normalize_keyword(keyword: str) -> str:
+    """Case- and whitespace-insensitive form of a keyword; X search ignores both."""
+    return " ".join((keyword or "").split()).lower()
 
 class MonitoredTerm(Base):
     __tablename__ = "monitored_terms"
     
     id = Column(Integer, primary_key=True, index=True)
     keyword = Column(String, nullable=False, index=True)
+    # normalize_keyword(keyword), kept in sync by the validator below; one
+    # term per normalised keyword
+    keyword_normalized = Column(String, nullable=False, unique=True, index=True)
     restrict_following = Column(Boolean, default=False)
     active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python for sub-second precision on SQLite; feeds the API's ETags
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     results = relationship("Result", back_populates="monitored_term")
 
+    @validates("keyword")
+    def _normalize(self, key, keyword):
+        self.keyword_normalized = normalize_keyword(keyword)
+        return keyword
+
 class Result(Base):
     __tablename__ = "results"
     
@@ -21,6 +39,136 @@ class Result(Base):
     keyword_id = Column(Integer, ForeignKey("monitored_terms.id"), nullable=False)
     tweets_raw = Column(JSON)
     summary = Column(Text)
+    # Local sentiment/entity/top-term analytics computed before summarising
+    insights = Column(JSON, nullable=True)
+    # "complete", "pending" (DeepSeek unavailable; filled in by the retry
+    # sweep) or "failed" (still pending after SUMMARY_RETRY_MAX_AGE_HOURS)
+    summary_status = Column(String(16), nullable=False, default="complete", server_default="complete", index=True)
+    # "full", "incremental" (previous summary updated with new tweets only)
+    # or "reuse" (previous summary kept; most tweets were already summarised)
+    summary_mode = Column(String(16), nullable=False, default="full", server_default="full")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    monitored_term = relationship("MonitoredTerm", back_populates="results")
\ No newline at end of file
+    monitored_term = relationship("MonitoredTerm", back_populates="results")
+
+class SearchDocument(Base):
+    """One searchable unit: a stored tweet or a result summary."""
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True)
+    result_id = Column(Integer, ForeignKey("results.id"), nullable=False, index=True)
+    keyword_id = Column(Integer, ForeignKey("monitored_terms.id"), nullable=False)
+    kind = Column(String(16), nullable=False)  # "tweet" or "summary"
+    tweet_id = Column(String, nullable=True)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_search_documents_keyword_created", "keyword_id", "created_at"),
+    )
+
+# Full-text index DDL. SQLite gets an external-content FTS5 table kept in sync
+# by triggers; Postgres gets a generated tsvector column with a GIN index.
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5("
+    "body, content='search_documents', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+]
+
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS body_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', body)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_body_tsv ON search_documents USING GIN (body_tsv)",
+]
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    SearchDocument.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS search_documents_fts").execute_if(dialect="sqlite"),
+)
+
+class TermMetric(Base):
+    """Pre-aggregated tweet activity for one term in one hour or day bucket."""
+    __tablename__ = "term_metrics"
+
+    id = Column(Integer, primary_key=True)
+    keyword_id = Column(Integer, ForeignKey("monitored_terms.id"), nullable=False)
+    granularity = Column(String(8), nullable=False)  # "hour" or "day"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    tweet_count = Column(Integer, nullable=False, default=0)
+    unique_authors = Column(Integer, nullable=False, default=0)
+    like_count = Column(Integer, nullable=False, default=0)
+    retweet_count = Column(Integer, nullable=False, default=0)
+    reply_count = Column(Integer, nullable=False, default=0)
+    top_tweets = Column(JSON)  # [{"id": ..., "engagement": ...}], best first
+    # HyperLogLog registers behind unique_authors; fixed size however busy the bucket
+    author_sketch = Column(LargeBinary)
+
+    __table_args__ = (
+        UniqueConstraint("keyword_id", "granularity", "bucket_start", name="uq_term_metrics_bucket"),
+    )
+
+class TermMetricTweet(Base):
+    """A tweet already counted in a term's metrics, so re-fetches are skipped."""
+    __tablename__ = "term_metric_tweets"
+
+    id = Column(Integer, primary_key=True)
+    keyword_id = Column(Integer, ForeignKey("monitored_terms.id"), nullable=False)
+    tweet_id = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("keyword_id", "tweet_id", name="uq_term_metric_tweets_term_tweet"),
+    )
+
+class Anomaly(Base):
+    """A detected spike in a term's tweet volume."""
+    __tablename__ = "anomalies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    keyword_id = Column(Integer, ForeignKey("monitored_terms.id"), nullable=False, index=True)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    tweet_count = Column(Integer, nullable=False)
+    baseline_mean = Column(Float, nullable=False)
+    zscore = Column(Float, nullable=False)
+    top_tags = Column(JSON)  # co-occurring hashtags/cashtags at detection time
+    detected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class StreamedTweet(Base):
+    """A tweet received from the filtered stream, waiting to be summarised."""
+    __tablename__ = "streamed_tweets"
+
+    id = Column(Integer, primary_key=True)
+    keyword_id = Column(Integer, ForeignKey("monitored_terms.id"), nullable=False)
+    tweet_id = Column(String, nullable=False)
+    tweet = Column(JSON, nullable=False)
+    result_id = Column(Integer, ForeignKey("results.id"), nullable=True)  # set once summarised
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("keyword_id", "tweet_id", name="uq_streamed_tweets_term_tweet"),
+        Index("ix_streamed_tweets_pending", "keyword_id", "result_id"),
+    )
+
+class JobRun(Base):
+    """One scheduled run (daily job or single-term run) with its stats and stage timings."""
+    __tablename__ = "job_runs"
+
+    id = Column(Integer, primary_key=True)
+    job = Column(String(32), nullable=False)  # "daily" or "term"
+    started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    duration_seconds = Column(Float, nullable=False)
+    stats = Column(JSON, nullable=True)
+    # profiling.Stages.breakdown(): per-stage count, total and self seconds
+    stages = Column(JSON, nullable=True)
+    # Set when the run was profiled; see GET /api/admin/profiles/{id}
+    profile_id = Column(String(64), nullable=True)
@@ -0,0 +1,444 @@
+"""
+Opt-in profiling of scheduled runs and API requests.
+
+- ``span(stage)`` / ``@spanned(stage)``: times a pipeline stage (X requests, tweet parsing, prompt
+  assembly, DeepSeek, DB writes, ...). Spans only record inside a
+  ``Trace``; elsewhere they cost a context-variable lookup.
+- ``Trace``: collects the stage breakdown of one run or request. When
+  profiling has been armed for it (see ``control``) it also runs a sampling
+  profiler over the threads doing the work and diffs tracemalloc snapshots
+  taken at either end.
+- Profiles are written to PROFILE_DIR as speedscope JSON, pstats (built
+  from the samples, so call counts are sample counts) and a JSON summary.
+
+At most one profile runs at a time; a run or request that finds the
+profiler busy is only timed, and does not use up an armed slot.
+"""
+import asyncio
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from app.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+RUN, REQUEST = "run", "request"
+FORMATS = {"speedscope": ".speedscope.json", "pstats": ".pstats"}
+PROFILE_ID = re.compile(r"^\d{8}T\d{6}-(run|request)-[0-9a-f]{8}$")
+
+class Stages:
+    """Per-stage call counts, total time and self time (excluding nested spans)."""
+
+    def __init__(self):
+        self._stages: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, self_seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += self_seconds
+
+    def breakdown(self, wall_seconds: float) -> Dict[str, Any]:
+        """
+        The stages with their share of the wall time. Stages running
+        concurrently (e.g. hedged requests) can add up to more than the wall
+        time; ``unaccounted_seconds`` is the rest for sequential work.
+        """
+        with self._lock:
+            stages = {
+                stage: {"count": int(count), "seconds": round(total, 6), "self_seconds": round(own, 6)}
+                for stage, (count, total, own) in sorted(self._stages.items(), key=lambda item: -item[1][2])
+            }
+        accounted = sum(stage["self_seconds"] for stage in stages.values())
+        return {
+            "wall_seconds": round(wall_seconds, 6),
+            "stages": stages,
+            "unaccounted_seconds": round(max(wall_seconds - accounted, 0.0), 6),
+        }
+
+class _Span:
+    __slots__ = ("children",)
+
+    def __init__(self):
+        self.children = 0.0
+
+_stages: ContextVar[Optional[Stages]] = ContextVar("profiling_stages", default=None)
+_current_span: ContextVar[Optional[_Span]] = ContextVar("profiling_span", default=None)
+_active_profile: ContextVar[Optional["_Profile"]] = ContextVar("profiling_profile", default=None)
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the block as ``stage`` in the current trace, if any."""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    parent = _current_span.get()
+    current = _Span()
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_span.reset(token)
+        if parent is not None:
+            parent.children += elapsed
+        stages.add(stage, elapsed, max(elapsed - current.children, 0.0))
+
+def spanned(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator form of ``span`` for sync and async functions."""
+    def decorate(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class _Sampler:
+    """Background thread recording the call stacks of registered threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.thread_names: Dict[int, str] = {}
+        self._attached: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def attach(self, ident: int):
+        with self._lock:
+            self._attached[ident] += 1
+            self.thread_names.setdefault(ident, threading.current_thread().name)
+
+    def detach(self, ident: int):
+        with self._lock:
+            self._attached[ident] -= 1
+            if self._attached[ident] <= 0:
+                del self._attached[ident]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = list(self._attached)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[(ident, tuple(reversed(stack)))] += 1
+            self.samples += 1
+
+def _frame_key(code) -> Tuple[str, int, str]:
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+def _speedscope(name: str, sampler: _Sampler) -> Dict[str, Any]:
+    frames: List[Dict[str, Any]] = []
+    index: Dict[Any, int] = {}
+    profiles: Dict[int, Dict[str, Any]] = {}
+    for (ident, stack), count in sampler.stacks.items():
+        for code in stack:
+            if code not in index:
+                index[code] = len(frames)
+                filename, line, function = _frame_key(code)
+                frames.append({"name": function, "file": filename, "line": line})
+        profile = profiles.setdefault(ident, {
+            "type": "sampled", "name": sampler.thread_names.get(ident, str(ident)), "unit": "seconds",
+            "startValue": 0, "endValue": 0.0, "samples": [], "weights": [],
+        })
+        profile["samples"].append([index[code] for code in stack])
+        profile["weights"].append(count * sampler.interval)
+        profile["endValue"] += count * sampler.interval
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "xmonitor",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": list(profiles.values()),
+    }
+
+def _pstats(sampler: _Sampler) -> Dict[Tuple[str, int, str], Tuple]:
+    """
+    pstats-format stats built from samples: self and cumulative time per
+    function, with callers. Loadable with ``pstats.Stats(path)``.
+    """
+    own: Counter = Counter()
+    cumulative: Counter = Counter()
+    callers: Dict[Any, Counter] = {}
+    for (_, stack), count in sampler.stacks.items():
+        keys = [_frame_key(code) for code in stack]
+        own[keys[-1]] += count
+        for key in set(keys):
+            cumulative[key] += count
+        for caller, callee in set(zip(keys, keys[1:])):
+            callers.setdefault(callee, Counter())[caller] += count
+    interval = sampler.interval
+    return {
+        key: (
+            count, count, own[key] * interval, count * interval,
+            {caller: (n, n, 0.0, n * interval) for caller, n in callers.get(key, {}).items()}
+        )
+        for key, count in cumulative.items()
+    }
+
+class _Profile:
+    def __init__(self, kind: str, name: str):
+        self.started_at = datetime.now(timezone.utc)
+        self.id = f"{self.started_at:%Y%m%dT%H%M%S}-{kind}-{uuid.uuid4().hex[:8]}"
+        self.kind = kind
+        self.name = name
+        self.sampler = _Sampler(Config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        self._started_tracing = False
+        self._snapshot = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._snapshot = tracemalloc.take_snapshot()
+        self.sampler.attach(threading.get_ident())
+        self.sampler.start()
+
+    def finish(self, stages: Dict[str, Any], duration: float) -> str:
+        self.sampler.stop()
+        _, peak = tracemalloc.get_traced_memory()
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+        diff = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(self._snapshot.filter_traces(ignore), "lineno")
+        if self._started_tracing:
+            tracemalloc.stop()
+        top = [
+            {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in diff[:Config.PROFILE_TOP_ALLOCATIONS] if stat.size_diff
+        ]
+        summary = {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": round(duration, 6),
+            "samples": self.sampler.samples,
+            "sample_interval_ms": Config.PROFILE_SAMPLE_INTERVAL_MS,
+            "threads": sorted(set(self.sampler.thread_names.values())),
+            "stages": stages,
+            "memory": {"peak_bytes": peak, "top_allocations": top},
+        }
+        store.save(self.id, summary, _speedscope(f"{self.kind} {self.name}", self.sampler), _pstats(self.sampler))
+        return self.id
+
+# Held while a profile is running
+_busy = threading.Lock()
+
+class ProfilingControl:
+    """How many upcoming runs and requests to profile; set through the admin API."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.requests = 0
+        self.route_prefix: Optional[str] = None
+
+    def arm(self, runs: int = 0, requests: int = 0, route_prefix: Optional[str] = None):
+        with self._lock:
+            self.runs, self.requests, self.route_prefix = runs, requests, route_prefix
+
+    def disarm(self):
+        self.arm()
+
+    def armed(self, kind: str) -> bool:
+        """Cheap unlocked check, so unprofiled requests skip the rest."""
+        return (self.runs if kind == RUN else self.requests) > 0
+
+    def claim(self, kind: str, name: str) -> bool:
+        with self._lock:
+            if kind == RUN and self.runs > 0:
+                self.runs -= 1
+                return True
+            if kind == REQUEST and self.requests > 0:
+                path = name.split(" ", 1)[-1]
+                if self.route_prefix is None or path.startswith(self.route_prefix):
+                    self.requests -= 1
+                    return True
+            return False
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "requests": self.requests,
+            "route_prefix": self.route_prefix,
+            "active": _busy.locked(),
+        }
+
+control = ProfilingControl()
+
+class Trace:
+    """
+    Stage timings for one run or request, plus a profile if ``profile`` is
+    True or profiling is armed for it (``profile`` False never profiles).
+    After the block: ``breakdown`` and, if profiled, ``profile_id``.
+    """
+
+    def __init__(self, kind: str, name: str, profile: Optional[bool] = None):
+        self.kind = kind
+        self.name = name
+        self.stages = Stages()
+        self.started_at: Optional[datetime] = None
+        self.duration = 0.0
+        self.breakdown: Dict[str, Any] = {}
+        self.profile_id: Optional[str] = None
+        self._want_profile = profile
+        self._profile: Optional[_Profile] = None
+
+    def __enter__(self) -> "Trace":
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._tokens = (_stages.set(self.stages), _current_span.set(None))
+        if self._want_profile or (self._want_profile is None and control.armed(self.kind)):
+            self._profile = self._start_profile()
+        self._profile_token = _active_profile.set(self._profile)
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.duration = time.perf_counter() - self._start
+        _active_profile.reset(self._profile_token)
+        _current_span.reset(self._tokens[1])
+        _stages.reset(self._tokens[0])
+        self.breakdown = self.stages.breakdown(self.duration)
+        if self._profile is not None:
+            try:
+                self.profile_id = self._profile.finish(self.breakdown, self.duration)
+                logger.info(f"Saved profile {self.profile_id} of {self.kind} {self.name}")
+            except Exception as e:
+                logger.error(f"Error saving profile of {self.kind} {self.name}: {str(e)}")
+            finally:
+                _busy.release()
+        return False
+
+    def _start_profile(self) -> Optional[_Profile]:
+        if not _busy.acquire(blocking=False):
+            return None
+        if not self._want_profile and not control.claim(self.kind, self.name):
+            _busy.release()
+            return None
+        profile = _Profile(self.kind, self.name)
+        try:
+            profile.start()
+        except Exception as e:
+            logger.error(f"Error starting profiler: {str(e)}")
+            _busy.release()
+            return None
+        return profile
+
+def follow_thread(func: Callable) -> Callable:
+    """
+    Wrap a sync callable so that, when it runs in a worker thread on behalf
+    of a profiled request, that thread is sampled too.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        ident = threading.get_ident()
+        profile.sampler.attach(ident)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.sampler.detach(ident)
+    return wrapper
+
+class ProfileStore:
+    """Profiles on disk under PROFILE_DIR, newest PROFILE_KEEP kept."""
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(Config.PROFILE_DIR, profile_id + suffix)
+
+    def save(self, profile_id: str, summary: Dict[str, Any], speedscope: Dict[str, Any], stats: Dict):
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        with open(self._path(profile_id, FORMATS["speedscope"]), "wb") as f:
+            f.write(orjson.dumps(speedscope))
+        with open(self._path(profile_id, FORMATS["pstats"]), "wb") as f:
+            marshal.dump(stats, f)
+        # The summary goes last: a profile is listed once it is complete
+        with open(self._path(profile_id, ".json"), "wb") as f:
+            f.write(orjson.dumps(summary))
+        for stale in self._ids()[Config.PROFILE_KEEP:]:
+            for suffix in (".json", *FORMATS.values()):
+                try:
+                    os.remove(self._path(stale, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _ids(self) -> List[str]:
+        """Profile ids, newest first (ids start with their UTC start time)."""
+        try:
+            names = os.listdir(Config.PROFILE_DIR)
+        except FileNotFoundError:
+            return []
+        ids = (name[:-len(".json")] for name in names if name.endswith(".json") and not name.endswith(FORMATS["speedscope"]))
+        return sorted((i for i in ids if PROFILE_ID.match(i)), reverse=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        summaries = []
+        for profile_id in self._ids():
+            summary = self.get(profile_id)
+            if summary is not None:
+                summaries.append({key: value for key, value in summary.items() if key not in ("stages", "memory")})
+        return summaries
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, ".json"), "rb") as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def file(self, profile_id: str, fmt: str) -> Optional[str]:
+        """Path of a stored profile in ``fmt`` ("speedscope" or "pstats"), if it exists."""
+        if fmt not in FORMATS or not PROFILE_ID.match(profile_id):
+            return None
+        path = self._path(profile_id, FORMATS[fmt])
+        return path if os.path.exists(path) else None
+
+store = ProfileStore()
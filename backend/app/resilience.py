@@ -0,0 +1,235 @@
+"""
+Failure isolation for the X and DeepSeek clients.
+
+- ``CircuitBreaker``: after repeated failures a dependency is skipped
+  outright for a cool-down, then a single half-open probe decides whether
+  it is back.
+- ``deadline``: a per-run time budget carried in a context variable, so
+  every client call underneath can size its timeout to what is left.
+- ``hedged``: fire a second identical request when the first is slower
+  than usual and take whichever answers first.
+
+Anything that means "try again later" raises ``Unavailable``; callers store
+a degraded result instead of failing the run.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Iterator, Optional
+
+from app import instrumentation
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Unavailable(Exception):
+    """A dependency can't be used right now; the work should be retried later."""
+
+class DependencyError(Unavailable):
+    """A call failed in a way that counts against the dependency's health."""
+
+class CircuitOpenError(Unavailable):
+    pass
+
+class DeadlineExceeded(Unavailable):
+    pass
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitBreaker:
+    """
+    Closed -> open after ``failure_threshold`` consecutive failures; open ->
+    half-open after ``reset_timeout`` seconds, when exactly one call is let
+    through as a probe. The probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_until = 0.0
+        self._state = CLOSED
+        self._probing = False
+        self._lock = threading.Lock()
+        instrumentation.CIRCUIT_STATE.labels(dependency=name).set(0)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() >= self._opened_until:
+                return HALF_OPEN
+            return self._state
+
+    def allows(self) -> bool:
+        """Whether a call would be let through right now (without claiming the probe)."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            return self._clock() >= self._opened_until and not self._probing
+
+    def acquire(self):
+        """
+        Claim permission for one call.
+
+        Raises:
+            CircuitOpenError: While open, or while another call is probing
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._clock() < self._opened_until or self._probing:
+                retry_in = max(self._opened_until - self._clock(), 0.0)
+                raise CircuitOpenError(f"{self.name} circuit is open; retry in {retry_in:.0f}s")
+            self._set_state(HALF_OPEN)
+            self._probing = True
+
+    def release(self, error: Optional[BaseException] = None):
+        """
+        Record the outcome of an acquired call. Only ``DependencyError`` is a
+        failure; a deadline or cancellation says nothing about the dependency.
+        """
+        with self._lock:
+            probing, self._probing = self._probing, False
+            if isinstance(error, (DeadlineExceeded, asyncio.CancelledError)):
+                return
+            if isinstance(error, DependencyError):
+                self._failures += 1
+                if probing or self._failures >= self.failure_threshold:
+                    self._open(self.reset_timeout)
+                return
+            self._failures = 0
+            if self._state != CLOSED:
+                logger.info(f"{self.name} circuit closed")
+                self._set_state(CLOSED)
+
+    def open_for(self, seconds: float):
+        """Open the circuit for a known period, e.g. until a rate-limit window resets."""
+        with self._lock:
+            self._probing = False
+            self._open(seconds)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        except BaseException as e:
+            self.release(e)
+            raise
+        self.release()
+
+    def _open(self, seconds: float):
+        # Caller holds the lock
+        self._opened_until = max(self._opened_until, self._clock() + seconds)
+        if self._state != OPEN:
+            logger.warning(f"{self.name} circuit opened for {seconds:.0f}s after {self._failures} failures")
+        self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        self._state = state
+        instrumentation.CIRCUIT_STATE.labels(dependency=self.name).set(_STATE_VALUES[state])
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound the calls made inside the block to ``seconds`` from now, or to an
+    enclosing deadline if that is sooner. Tasks created inside inherit it.
+    """
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left on the current deadline, or None when there is none."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+def timeout_for(default: float) -> float:
+    """
+    A request timeout capped by the current deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("Run deadline exceeded")
+    return min(default, left)
+
+def dependency_error(name: str, error: Exception) -> Unavailable:
+    """Classify a failed call: a timeout cut short by the deadline is not the dependency's fault."""
+    left = remaining()
+    if left is not None and left <= 0:
+        return DeadlineExceeded(f"Run deadline exceeded during {name} call")
+    return DependencyError(f"{name} request failed: {error}")
+
+class LatencyWindow:
+    """Recent successful call latencies, for picking a hedging delay."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int) -> Optional[float]:
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+async def hedged(name: str, call: Callable[[], Awaitable[Any]], delay: Optional[float]) -> Any:
+    """
+    Await ``call()``; if it hasn't finished after ``delay`` seconds, start a
+    second identical call and return whichever succeeds first. The loser is
+    cancelled. With ``delay`` None this is just ``await call()``.
+    """
+    if delay is None:
+        return await call()
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return tasks[0].result()
+        left = remaining()
+        if left is not None and left <= delay:
+            return await tasks[0]  # no budget for a second attempt
+        tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = "hedge" if task is tasks[1] else "primary"
+                    instrumentation.HEDGED_REQUESTS.labels(dependency=name, winner=winner).inc()
+                    return task.result()
+                error = task.exception()
+        instrumentation.HEDGED_REQUESTS.labels(dependency=name, winner="none").inc()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
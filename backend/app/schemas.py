@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional, Any
+from typing import List, Literal, Optional, Any
 
 class MonitoredTermBase(BaseModel):
     keyword: str
@@ -15,9 +15,30 @@ class MonitoredTermUpdate(BaseModel):
     restrict_following: Optional[bool] = None
     active: Optional[bool] = None
 
+class MonitoredTermBulkImport(BaseModel):
+    terms: List[MonitoredTermCreate]
+    # Keywords that are already monitored are skipped, or updated in place
+    on_conflict: Literal["skip", "update"] = "skip"
+
+class MonitoredTermBulkUpdateItem(MonitoredTermUpdate):
+    id: int
+
+class MonitoredTermBulkUpdate(BaseModel):
+    terms: List[MonitoredTermBulkUpdateItem]
+
+class MonitoredTermBulkDelete(BaseModel):
+    ids: List[int]
+
+class MonitoredTermBulkResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    deleted: int = 0
+
 class MonitoredTerm(MonitoredTermBase):
     id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -25,6 +46,9 @@ class MonitoredTerm(MonitoredTermBase):
 class ResultBase(BaseModel):
     tweets_raw: Any
     summary: str
+    insights: Optional[Any] = None
+    summary_status: str = "complete"
+    summary_mode: str = "full"
 
 class ResultCreate(ResultBase):
     keyword_id: int
@@ -45,4 +69,77 @@ class TweetSummaryRequest(BaseModel):
 class TweetSummaryResponse(BaseModel):
     summary: str
     tweet_count: int
-    keyword: str
\ No newline at end of file
+    keyword: str
+
+class SearchHit(BaseModel):
+    id: int
+    result_id: int
+    keyword_id: int
+    kind: str
+    tweet_id: Optional[str] = None
+    created_at: datetime
+    score: float
+    snippet: str
+
+class SearchResponse(BaseModel):
+    hits: List[SearchHit]
+    next_cursor: Optional[str] = None
+
+class TimeseriesPoint(BaseModel):
+    bucket_start: datetime
+    tweet_count: int
+    unique_authors: int
+    like_count: int
+    retweet_count: int
+    reply_count: int
+    top_tweet_ids: List[str]
+
+class TimeseriesResponse(BaseModel):
+    keyword_id: int
+    granularity: str
+    points: List[TimeseriesPoint]
+
+class AnomalyBase(BaseModel):
+    keyword_id: int
+    bucket_start: datetime
+    tweet_count: int
+    baseline_mean: float
+    zscore: float
+    top_tags: Any = None
+
+class AnomalyCreate(AnomalyBase):
+    pass
+
+class Anomaly(AnomalyBase):
+    id: int
+    detected_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class JobRunBase(BaseModel):
+    job: str
+    started_at: datetime
+    duration_seconds: float
+    stats: Optional[Any] = None
+    stages: Optional[Any] = None
+    profile_id: Optional[str] = None
+
+class JobRunCreate(JobRunBase):
+    pass
+
+class JobRun(JobRunBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+class ProfilingSettings(BaseModel):
+    # Profile the next ``runs`` scheduled runs and ``requests`` API requests
+    # (only paths starting with ``route_prefix``, if set)
+    runs: int = Field(0, ge=0)
+    requests: int = Field(0, ge=0)
+    route_prefix: Optional[str] = None
+
+class ProfilingState(ProfilingSettings):
+    active: bool = False
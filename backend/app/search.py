@@ -0,0 +1,205 @@
+import base64
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Float, Integer, String, Text, bindparam, text
+from sqlalchemy.orm import Session
+
+from app.models import Result, SearchDocument
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def parse_tweet_time(value: Any, fallback: datetime) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return fallback
+    else:
+        return fallback
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def build_documents(result: Result, created_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Build search document rows for a stored result: one per tweet plus one for the summary.
+    """
+    created_at = created_at or result.created_at or datetime.now(timezone.utc)
+    documents = []
+    for tweet in result.tweets_raw or []:
+        if not isinstance(tweet, dict) or not tweet.get("text"):
+            continue
+        documents.append({
+            "result_id": result.id,
+            "keyword_id": result.keyword_id,
+            "kind": "tweet",
+            "tweet_id": str(tweet["id"]) if tweet.get("id") is not None else None,
+            "body": tweet["text"],
+            "created_at": parse_tweet_time(tweet.get("created_at"), created_at),
+        })
+    if result.summary:
+        documents.append({
+            "result_id": result.id,
+            "keyword_id": result.keyword_id,
+            "kind": "summary",
+            "tweet_id": None,
+            "body": result.summary,
+            "created_at": created_at,
+        })
+    return documents
+
+def index_result(db: Session, result: Result) -> int:
+    """
+    Add a flushed result to the search index. The caller owns the transaction,
+    so the result and its documents are committed together.
+    """
+    documents = build_documents(result)
+    if documents:
+        db.execute(SearchDocument.__table__.insert(), documents)
+    return len(documents)
+
+def update_summary_document(db: Session, result: Result) -> None:
+    """Replace a result's summary document after its summary changed (same transaction rules as index_result)."""
+    db.query(SearchDocument).filter(
+        SearchDocument.result_id == result.id,
+        SearchDocument.kind == "summary"
+    ).delete(synchronize_session=False)
+    documents = [doc for doc in build_documents(result) if doc["kind"] == "summary"]
+    if documents:
+        db.execute(SearchDocument.__table__.insert(), documents)
+
+def rebuild_search_index(db: Session, chunk_size: int = 500) -> int:
+    """
+    Drop and rebuild every search document from stored results.
+    Used to backfill results written before the index existed.
+    """
+    db.query(SearchDocument).delete(synchronize_session=False)
+    indexed = 0
+    last_id = 0
+    while True:
+        chunk = (
+            db.query(Result)
+            .filter(Result.id > last_id)
+            .order_by(Result.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not chunk:
+            break
+        rows = []
+        for result in chunk:
+            rows.extend(build_documents(result))
+        if rows:
+            db.execute(SearchDocument.__table__.insert(), rows)
+        indexed += len(rows)
+        last_id = chunk[-1].id
+        db.expunge_all()
+    db.commit()
+    return indexed
+
+def encode_cursor(score: float, doc_id: int) -> str:
+    raw = json.dumps([score, doc_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, doc_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), int(doc_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid search cursor")
+
+def _sqlite_match_expression(query: str) -> str:
+    # Quote every word so user input can never be parsed as FTS5 syntax
+    # ("$ORCL", "AND", unbalanced quotes); words are implicitly ANDed.
+    return " ".join(f'"{token}"' for token in _TOKEN_RE.findall(query))
+
+def search_documents(
+    db: Session,
+    query: str,
+    keyword_id: Optional[int] = None,
+    kind: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Ranked full-text search over stored tweets and summaries.
+
+    Results are ordered by relevance (higher score first) and paginated with an
+    opaque keyset cursor, so deep pages cost the same as the first one.
+
+    Returns:
+        Tuple of (hits, next_cursor); next_cursor is None on the last page
+    """
+    dialect = db.get_bind().dialect.name
+    params: Dict[str, Any] = {"limit": limit}
+
+    if dialect == "sqlite":
+        match = _sqlite_match_expression(query)
+        if not match:
+            return [], None
+        params["match"] = match
+        score_expr = "-bm25(search_documents_fts)"
+        snippet_expr = "snippet(search_documents_fts, 0, '[', ']', '…', 16)"
+        from_clause = (
+            "FROM search_documents_fts "
+            "JOIN search_documents d ON d.id = search_documents_fts.rowid"
+        )
+        conditions = ["search_documents_fts MATCH :match"]
+    elif dialect == "postgresql":
+        if not _TOKEN_RE.search(query):
+            return [], None
+        params["query"] = query
+        score_expr = "ts_rank_cd(d.body_tsv, q)::float8"
+        snippet_expr = "ts_headline('english', d.body, q, 'StartSel=[, StopSel=], MaxWords=32')"
+        from_clause = "FROM search_documents d, plainto_tsquery('english', :query) q"
+        conditions = ["d.body_tsv @@ q"]
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    bind_types = [bindparam("limit", type_=Integer)]
+    if keyword_id is not None:
+        conditions.append("d.keyword_id = :keyword_id")
+        params["keyword_id"] = keyword_id
+    if kind is not None:
+        conditions.append("d.kind = :kind")
+        params["kind"] = kind
+    if since is not None:
+        conditions.append("d.created_at >= :since")
+        params["since"] = since
+        bind_types.append(bindparam("since", type_=DateTime(timezone=True)))
+    if until is not None:
+        conditions.append("d.created_at < :until")
+        params["until"] = until
+        bind_types.append(bindparam("until", type_=DateTime(timezone=True)))
+    if cursor:
+        last_score, last_id = decode_cursor(cursor)
+        conditions.append(
+            f"({score_expr} < :last_score OR ({score_expr} = :last_score AND d.id < :last_id))"
+        )
+        params["last_score"] = last_score
+        params["last_id"] = last_id
+        bind_types.append(bindparam("last_score", type_=Float))
+
+    statement = text(
+        f"SELECT d.id, d.result_id, d.keyword_id, d.kind, d.tweet_id, d.created_at, "
+        f"{score_expr} AS score, {snippet_expr} AS snippet "
+        f"{from_clause} WHERE {' AND '.join(conditions)} "
+        f"ORDER BY score DESC, d.id DESC LIMIT :limit"
+    ).bindparams(*bind_types).columns(
+        id=Integer, result_id=Integer, keyword_id=Integer, kind=String,
+        tweet_id=String, created_at=DateTime(timezone=True), score=Float, snippet=Text,
+    )
+
+    hits = [dict(row._mapping) for row in db.execute(statement, params)]
+    next_cursor = None
+    if len(hits) == limit:
+        next_cursor = encode_cursor(hits[-1]["score"], hits[-1]["id"])
+    return hits, next_cursor
@@ -0,0 +1,212 @@
+"""
+Transport-level record/replay for the X and DeepSeek clients.
+
+In record mode every HTTP exchange made by tweepy (via a requests adapter)
+and by httpx (via an async transport) is appended to a gzip'd JSON-lines
+cassette, including response headers and latency. In replay mode the same
+transports answer from the cassette without touching the network, either at
+the recorded pace or as fast as possible.
+"""
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from app.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Recorded bodies are already decoded, so these headers would be wrong on replay
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when no recorded interaction matches a request."""
+
+def request_key(method: str, url: str, body: Optional[bytes]) -> str:
+    """
+    Identify a request independently of host, query-parameter order and
+    credentials (which live in headers and are never recorded).
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    digest = hashlib.sha1(body or b"").hexdigest()[:16]
+    return f"{method.upper()} {parts.path}?{query} {digest}"
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(content).decode("ascii")}
+
+def _decode_body(interaction: Dict[str, Any]) -> bytes:
+    if "body_b64" in interaction:
+        return base64.b64decode(interaction["body_b64"])
+    return interaction.get("body", "").encode("utf-8")
+
+class Cassette:
+    """
+    A recorded sequence of HTTP interactions.
+
+    Interactions with the same request key are replayed in recorded order, so
+    repeated identical requests (e.g. polling) get successive responses.
+    """
+
+    def __init__(self, path: str, mode: str, speed: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _load(self):
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._queues[interaction["key"]].append(interaction)
+                    count += 1
+        logger.info(f"Loaded {count} interactions from cassette {self.path}")
+
+    def record(self, service: str, key: str, status: int, reason: str,
+               headers: Dict[str, str], content: bytes, elapsed: float):
+        interaction = {
+            "service": service,
+            "key": key,
+            "status": status,
+            "reason": reason,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "elapsed": round(elapsed, 6),
+            **_encode_body(content),
+        }
+        line = json.dumps(interaction, separators=(",", ":")) + "\n"
+        with self._lock:
+            # Each write is its own gzip member, so a crash never loses earlier interactions
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+
+    def next(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise CassetteMissError(f"No recorded interaction for {key}")
+            return queue.popleft()
+
+    def delay(self, interaction: Dict[str, Any]) -> float:
+        return interaction.get("elapsed", 0.0) * self.speed
+
+    def remaining(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+class CassetteAdapter(HTTPAdapter):
+    """requests adapter (used by tweepy) that records to or replays from a cassette."""
+
+    def __init__(self, cassette: Cassette, service: str, inner: Optional[HTTPAdapter] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.service = service
+        self.inner = inner or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        key = request_key(request.method, request.url, body)
+
+        if self.cassette.mode == "replay":
+            interaction = self.cassette.next(key)
+            if self.cassette.delay(interaction):
+                time.sleep(self.cassette.delay(interaction))
+            response = requests.Response()
+            response.status_code = interaction["status"]
+            response.reason = interaction.get("reason", "")
+            response.headers = CaseInsensitiveDict(interaction["headers"])
+            response._content = _decode_body(interaction)
+            response.url = request.url
+            response.request = request
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            return response
+
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        content = response.content
+        self.cassette.record(self.service, key, response.status_code, response.reason or "",
+                             dict(response.headers), content, time.perf_counter() - start)
+        return response
+
+    def close(self):
+        self.inner.close()
+        super().close()
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport (used by the LLM client and X stream rules) backed by a cassette."""
+
+    # Long-lived streams cannot be captured as one response; they bypass the cassette
+    PASSTHROUGH_PATHS: Tuple[str, ...] = ("/2/tweets/search/stream",)
+
+    def __init__(self, cassette: Cassette, service: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.service = service
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path in self.PASSTHROUGH_PATHS:
+            if self.cassette.mode == "replay":
+                raise CassetteMissError(f"{request.url.path} is a live stream and is never recorded")
+            return await self.inner.handle_async_request(request)
+
+        body = await request.aread()
+        key = request_key(request.method, str(request.url), body)
+
+        if self.cassette.mode == "replay":
+            interaction = self.cassette.next(key)
+            if self.cassette.delay(interaction):
+                await asyncio.sleep(self.cassette.delay(interaction))
+            return httpx.Response(
+                status_code=interaction["status"],
+                headers=interaction["headers"],
+                content=_decode_body(interaction),
+                request=request,
+            )
+
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        self.cassette.record(self.service, key, response.status_code,
+                             response.extensions.get("reason_phrase", b"").decode("ascii", "replace"),
+                             dict(response.headers), content, time.perf_counter() - start)
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS]
+        return httpx.Response(status_code=response.status_code, headers=headers, content=content,
+                              request=request, extensions=response.extensions)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+_cassette: Optional[Cassette] = None
+
+def get_cassette() -> Optional[Cassette]:
+    """Process-wide cassette configured by CASSETTE_MODE/CASSETTE_PATH, or None when off."""
+    global _cassette
+    if Config.CASSETTE_MODE in ("", "off"):
+        return None
+    if _cassette is None or _cassette.path != Config.CASSETTE_PATH or _cassette.mode != Config.CASSETTE_MODE:
+        _cassette = Cassette(Config.CASSETTE_PATH, Config.CASSETTE_MODE, speed=Config.CASSETTE_REPLAY_SPEED)
+    return _cassette
@@ -1,52 +1,306 @@
 import httpx
-from typing import List, Dict, Any
+import json
+import re
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from app.config import Config
+from app import instrumentation, profiling, resilience
+from app.services.cassette import CassetteTransport, get_cassette
+import logging
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a helpful assistant that analyzes social media content and provides structured summaries using bullet points. Always format your responses with clear section headers and bullet points (•) for easy reading."
+
+SUMMARY_SECTIONS = """1. Main themes / repeated ideas
+2. Positive sentiment (if any)
+3. Negative sentiment (if any)
+4. Notable quotes or insights"""
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Summaries starting with these were not written by the LLM
+ERROR_PREFIX = "Error generating summary"
+FALLBACK_PREFIX = "Automated summary"
+
+def is_llm_summary(summary: Optional[str]) -> bool:
+    return bool(summary) and not summary.startswith((ERROR_PREFIX, FALLBACK_PREFIX))
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) for savings stats."""
+    return (len(text) + 3) // 4
+
+def format_tweets(tweets: List[Dict[str, Any]], limit: int = 20) -> str:
+    """Render tweets as prompt text, one "@author: text" block per tweet."""
+    tweet_texts = []
+    for tweet in tweets[:limit]:
+        author_info = ""
+        if tweet.get('author'):
+            username = tweet['author'].get('username', 'Unknown')
+            verified = " ✓" if tweet['author'].get('verified') else ""
+            author_info = f"@{username}{verified}: "
+        
+        tweet_texts.append(f"{author_info}{tweet['text']}")
+    return "\n\n".join(tweet_texts)
+
+def parse_batch_response(content: str, keys: List[str]) -> Dict[str, str]:
+    """
+    Extract per-term summaries from a batched JSON completion.
+    
+    Args:
+        content: Model output, expected to be a JSON object keyed by term key
+        keys: The term keys sent in the prompt
+        
+    Returns:
+        Summaries for every key that has a usable (non-empty) value
+        
+    Raises:
+        ValueError: If the output is not a JSON object
+    """
+    data = json.loads(_JSON_FENCE.sub("", content.strip()))
+    if not isinstance(data, dict):
+        raise ValueError("Batched summary is not a JSON object")
+    summaries = {}
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            value = "\n".join(value)
+        if isinstance(value, str) and value.strip():
+            summaries[key] = value.strip()
+    return summaries
 
 class LLMService:
-    def __init__(self):
-        if not Config.DEEPSEEK_API_KEY:
-            raise ValueError("DEEPSEEK_API_KEY must be provided")
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        # A missing key is reported per call rather than here, so the API can
+        # start (and serve stored results) without LLM credentials.
         self.api_key = Config.DEEPSEEK_API_KEY
-        self.base_url = "https://api.deepseek.com"
+        self.base_url = Config.DEEPSEEK_BASE_URL
+        cassette = get_cassette()
+        if cassette:
+            transport = CassetteTransport(cassette, "deepseek", inner=transport)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.breaker = resilience.CircuitBreaker("deepseek", Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_SECONDS)
+        # Recent latencies per request kind (single / batched JSON), for hedging
+        self._latency = {False: resilience.LatencyWindow(), True: resilience.LatencyWindow()}
+    
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """One pooled client per service, so calls reuse connections."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, transport=self._transport,
+                                         timeout=Config.LLM_TIMEOUT_SECONDS)
+        return self._client
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
-    async def summarize_tweets(self, tweets: List[Dict[str, Any]], keyword: str) -> str:
+    async def summarize_tweets(self, tweets: List[Dict[str, Any]], keyword: str, digest: Optional[str] = None) -> str:
+        """
+        Summarize one term's tweets.
+        
+        Args:
+            tweets: Tweet dictionaries
+            keyword: The monitored term
+            digest: Optional local analytics digest (see tweet_analytics.format_digest);
+                sent instead of most sample tweets, and returned as the
+                summary if the LLM call fails
+        
+        Raises:
+            resilience.Unavailable: If DeepSeek is down, its circuit is open or
+                the run deadline has passed; the summary should be retried later
+        """
         if not tweets:
             return "No tweets found for analysis."
+        with profiling.span("prompt"):
+            prompt = self._full_prompt(tweets, keyword, digest)
+        return await self._summarize(prompt, keyword, digest)
+    
+    async def summarize_incremental(
+        self,
+        new_tweets: List[Dict[str, Any]],
+        keyword: str,
+        previous_summary: str,
+        digest: Optional[str] = None
+    ) -> str:
+        """
+        Update a term's previous summary with only the tweets posted since.
         
-        tweet_texts = []
-        for tweet in tweets:
-            author_info = ""
-            if tweet.get('author'):
-                username = tweet['author'].get('username', 'Unknown')
-                verified = " ✓" if tweet['author'].get('verified') else ""
-                author_info = f"@{username}{verified}: "
-            
-            tweet_texts.append(f"{author_info}{tweet['text']}")
-        
-        tweets_text = "\n\n".join(tweet_texts[:20])
+        Args:
+            new_tweets: Tweets not covered by the previous summary
+            keyword: The monitored term
+            previous_summary: Summary of the term's previous result
+            digest: Local analytics digest over all of this run's tweets;
+                only used as the fallback summary
         
-        prompt = f"""Summarize the following tweets about "{keyword}" into:
-1. Main themes / repeated ideas
-2. Positive sentiment (if any)
-3. Negative sentiment (if any)
-4. Notable quotes or insights
+        Raises:
+            resilience.Unavailable: As for summarize_tweets
+        """
+        with profiling.span("prompt"):
+            prompt = self._incremental_prompt(new_tweets, keyword, previous_summary)
+        return await self._summarize(prompt, keyword, digest)
+    
+    def estimate_prompt_tokens(
+        self,
+        tweets: List[Dict[str, Any]],
+        keyword: str,
+        digest: Optional[str] = None,
+        previous_summary: Optional[str] = None
+    ) -> int:
+        """Approximate prompt size of a full summary, or of an incremental one if ``previous_summary`` is given."""
+        if previous_summary is not None:
+            prompt = self._incremental_prompt(tweets, keyword, previous_summary)
+        else:
+            prompt = self._full_prompt(tweets, keyword, digest)
+        return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt)
+    
+    # Not spanned: estimate_prompt_tokens builds prompts that are never sent
+    def _full_prompt(self, tweets: List[Dict[str, Any]], keyword: str, digest: Optional[str]) -> str:
+        return f"""Summarize the following tweets about "{keyword}" into:
+{SUMMARY_SECTIONS}
 
 Return a concise summary (5–10 bullet points).
 
 Use bullet points (•) for each item within sections.
 
-Tweets:
-{tweets_text}
+{self._tweets_section(tweets, digest)}
 
 Format your response with clear section headers and bullet points."""
+    
+    def _incremental_prompt(self, new_tweets: List[Dict[str, Any]], keyword: str, previous_summary: str) -> str:
+        return f"""Below is the previous summary of tweets about "{keyword}", followed by {len(new_tweets)} new tweets posted since.
 
+Update the summary. Start with a "What's new" section covering only the new tweets, then give the previous sections, revised only where the new tweets change them:
+{SUMMARY_SECTIONS}
+
+Use bullet points (•) for each item within sections.
+
+Previous summary:
+{previous_summary}
+
+New tweets:
+{format_tweets(new_tweets)}
+
+Format your response with clear section headers and bullet points."""
+    
+    async def _summarize(self, prompt: str, keyword: str, digest: Optional[str]) -> str:
         try:
             response = await self._deepseek_summarize(prompt)
             return response
+        except resilience.Unavailable:
+            instrumentation.ERRORS.labels(term=instrumentation.term_label(keyword), stage="llm").inc()
+            raise
+        except Exception as e:
+            instrumentation.ERRORS.labels(term=instrumentation.term_label(keyword), stage="llm").inc()
+            if digest:
+                return f"{FALLBACK_PREFIX} (LLM unavailable: {str(e)})\n\n{digest}"
+            return f"{ERROR_PREFIX}: {str(e)}"
+    
+    def _tweets_section(self, tweets: List[Dict[str, Any]], digest: Optional[str]) -> str:
+        if digest and Config.LLM_INCLUDE_DIGEST:
+            return (f"Precomputed analytics over all {len(tweets)} tweets (use for sentiment and themes):\n{digest}\n\n"
+                    f"Sample tweets:\n{format_tweets(tweets, limit=Config.LLM_DIGEST_TWEET_LIMIT)}")
+        return f"Tweets:\n{format_tweets(tweets)}"
+    
+    async def summarize_batch(
+        self,
+        batch: List[Tuple[str, List[Dict[str, Any]]]],
+        digests: Optional[List[Optional[str]]] = None
+    ) -> List[Optional[str]]:
+        """
+        Summarize several low-volume terms in one completion.
+        
+        The model is asked for a JSON object keyed by term; any term whose
+        summary is missing or unusable, or every term if the request or
+        parse fails, is summarized with its own summarize_tweets call.
+        
+        Args:
+            batch: (keyword, tweets) pairs
+            digests: Optional local analytics digest per pair
+            
+        Returns:
+            Summaries in the same order as ``batch``; None for terms that
+            could not be summarized because DeepSeek is unavailable
+        """
+        digests = digests or [None] * len(batch)
+        if len(batch) == 1:
+            keyword, tweets = batch[0]
+            try:
+                return [await self.summarize_tweets(tweets, keyword, digest=digests[0])]
+            except resilience.Unavailable:
+                return [None]
+        
+        keys = [f"T{index}" for index in range(1, len(batch) + 1)]
+        prompt = self._batch_prompt(keys, batch, digests)
+        
+        summaries: Dict[str, str] = {}
+        try:
+            content = await self._chat_completion(
+                prompt,
+                max_tokens=min(Config.LLM_BATCH_TOKENS_PER_TERM * len(batch), 8000),
+                json_output=True
+            )
+        except resilience.Unavailable as e:
+            # Splitting into single calls would only hit the same outage
+            logger.warning(f"Batched summary for {len(batch)} terms deferred: {str(e)}")
+            return [None] * len(batch)
         except Exception as e:
-            return f"Error generating summary: {str(e)}"
+            logger.warning(f"Batched summary request for {len(batch)} terms failed, falling back: {str(e)}")
+            instrumentation.LLM_BATCH_FALLBACKS.labels(reason="request").inc(len(keys))
+        else:
+            try:
+                summaries = parse_batch_response(content, keys)
+            except ValueError as e:  # includes json.JSONDecodeError
+                logger.warning(f"Unparseable batched summary for {len(batch)} terms, falling back: {str(e)}")
+                instrumentation.LLM_BATCH_FALLBACKS.labels(reason="parse").inc(len(keys))
+            else:
+                if len(summaries) < len(keys):
+                    instrumentation.LLM_BATCH_FALLBACKS.labels(reason="missing_term").inc(len(keys) - len(summaries))
+        
+        results: List[Optional[str]] = []
+        unavailable = False
+        for key, (keyword, tweets), digest in zip(keys, batch, digests):
+            if key in summaries:
+                results.append(summaries[key])
+            elif unavailable:
+                results.append(None)
+            else:
+                try:
+                    results.append(await self.summarize_tweets(tweets, keyword, digest=digest))
+                except resilience.Unavailable:
+                    unavailable = True
+                    results.append(None)
+        return results
+    
+    @profiling.spanned("prompt")
+    def _batch_prompt(self, keys: List[str], batch: List[Tuple[str, List[Dict[str, Any]]]],
+                      digests: List[Optional[str]]) -> str:
+        sections = "\n\n".join(
+            f'### {key}: "{keyword}"\n{self._tweets_section(tweets, digest)}'
+            for key, (keyword, tweets), digest in zip(keys, batch, digests)
+        )
+        return f"""Summarize the tweets for each of the {len(batch)} terms below separately. For each term cover:
+{SUMMARY_SECTIONS}
+
+Keep each summary concise (3–6 bullet points), with clear section headers and bullet points (•).
+
+Return only a JSON object whose keys are the term ids ({", ".join(keys)}) and whose values are that term's summary as a single string.
+
+{sections}"""
     
     async def _deepseek_summarize(self, prompt: str) -> str:
+        return await self._chat_completion(prompt, max_tokens=500)
+    
+    @profiling.spanned("llm_request")
+    async def _chat_completion(self, prompt: str, max_tokens: int, json_output: bool = False) -> str:
+        if not self.available:
+            raise ValueError("DEEPSEEK_API_KEY must be provided")
+        
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -55,21 +309,50 @@ Format your response with clear section headers and bullet points."""
         payload = {
             "model": Config.DEEPSEEK_MODEL,
             "messages": [
-                {"role": "system", "content": "You are a helpful assistant that analyzes social media content and provides structured summaries using bullet points. Always format your responses with clear section headers and bullet points (•) for easy reading."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            "max_tokens": 500,
+            "max_tokens": max_tokens,
             "temperature": 0.7,
             "stream": False
         }
+        if json_output:
+            payload["response_format"] = {"type": "json_object"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
+        with self.breaker.guard():
+            try:
+                response = await resilience.hedged(
+                    "deepseek", lambda: self._post(headers, payload, json_output), self._hedge_delay(json_output)
+                )
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500 and e.response.status_code != 429:
+                    raise
+                raise resilience.dependency_error("DeepSeek", e) from e
+        result = response.json()
+        usage = result.get("usage") or {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                instrumentation.LLM_TOKENS.labels(model=Config.DEEPSEEK_MODEL, kind=kind.split("_")[0]).inc(usage[kind])
+        return result["choices"][0]["message"]["content"].strip()
+    
+    async def _post(self, headers: Dict[str, str], payload: Dict[str, Any], json_output: bool) -> httpx.Response:
+        timeout = resilience.timeout_for(Config.LLM_TIMEOUT_SECONDS)
+        start = time.perf_counter()
+        try:
+            response = await self._get_client().post(
+                "/chat/completions",
                 headers=headers,
                 json=payload,
-                timeout=30.0
+                timeout=timeout
             )
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
\ No newline at end of file
+        finally:
+            elapsed = time.perf_counter() - start
+            instrumentation.LLM_REQUEST_SECONDS.labels(model=Config.DEEPSEEK_MODEL).observe(elapsed)
+        response.raise_for_status()
+        self._latency[json_output].add(elapsed)
+        return response
+    
+    def _hedge_delay(self, json_output: bool) -> Optional[float]:
+        if not Config.LLM_HEDGE_ENABLED:
+            return None
+        return self._latency[json_output].percentile(Config.LLM_HEDGE_PERCENTILE, Config.LLM_HEDGE_MIN_SAMPLES)
\ No newline at end of file
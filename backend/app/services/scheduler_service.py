@@ -4,19 +4,30 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app import crud, schemas
 from app.services.twitter_service import TwitterService
-from app.services.llm_service import LLMService
+from app.services.llm_service import LLMService, is_llm_summary
+from app.services.trend_service import TrendDetector
+from app.services import tweet_analytics, summary_diff
 from app.config import Config
+from app import instrumentation, events, resilience, profiling
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 import asyncio
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PENDING_SUMMARY = "Summary pending: DeepSeek was unavailable during this run. It will be generated automatically."
+
 class SchedulerService:
-    def __init__(self):
+    def __init__(self, twitter_service: Optional[TwitterService] = None, llm_service: Optional[LLMService] = None):
         self.scheduler = AsyncIOScheduler()
-        self.twitter_service = TwitterService()
-        self.llm_service = LLMService()
+        self.twitter_service = twitter_service or TwitterService()
+        self.llm_service = llm_service or LLMService()
+        self.trend_detector = TrendDetector()
+        self._last_term_run: Dict[int, datetime] = {}
+        # Stats of the last scheduled run (see _new_run_stats)
+        self.run_stats: Dict[str, Any] = {}
     
     def start(self):
         self.scheduler.add_job(
@@ -29,6 +40,13 @@ class SchedulerService:
             id='daily_tweet_summary',
             replace_existing=True
         )
+        self.scheduler.add_job(
+            self.retry_pending_summaries,
+            'interval',
+            minutes=Config.SUMMARY_RETRY_INTERVAL_MINUTES,
+            id='summary_retry_sweep',
+            replace_existing=True
+        )
         self.scheduler.start()
         logger.info(f"Scheduler started. Daily job will run at {Config.DAILY_RUN_HOUR}:{Config.DAILY_RUN_MINUTE:02d} {Config.SCHEDULER_TIMEZONE}")
     
@@ -39,47 +57,361 @@ class SchedulerService:
     async def run_daily_job(self):
         logger.info("Starting daily tweet monitoring job")
         db: Session = SessionLocal()
+        trace = profiling.Trace(profiling.RUN, "daily")
+        stats = None
         
         try:
-            active_terms = crud.get_active_monitored_terms(db)
-            logger.info(f"Processing {len(active_terms)} active terms")
+            with trace, resilience.deadline(Config.RUN_DEADLINE_SECONDS), instrumentation.monitored_terms():
+                active_terms = crud.get_active_monitored_terms(db)
+                logger.info(f"Processing {len(active_terms)} active terms")
+                stats = self.run_stats = self._new_run_stats(len(active_terms))
+                instrumentation.SCHEDULER_QUEUE_DEPTH.set(len(active_terms))
             
-            for term in active_terms:
-                await self.process_term(db, term)
+                collected: List[Tuple[Any, List[Dict[str, Any]], list]] = []
+                for term in active_terms:
+                    tweets_and_pending = await self.collect_term(db, term)
+                    instrumentation.SCHEDULER_QUEUE_DEPTH.dec()
+                    if tweets_and_pending is not None:
+                        collected.append((term, *tweets_and_pending))
+            
+                # One vectorised pass over every tweet of the run
+                insights = self.analyze(collected)
+                previous = self.previous_results(db, [term.id for term, _, _ in collected])
+            
+                # Low-volume terms wait here and share one LLM request
+                batch: List[Tuple[Any, List[Dict[str, Any]], list, Optional[Dict[str, Any]]]] = []
+                for (term, tweets, pending), term_insights in zip(collected, insights):
+                    if await self.diff_against_previous(db, term, tweets, pending, term_insights, previous.get(term.id), stats):
+                        continue
+                    if Config.LLM_BATCH_ENABLED and len(tweets) <= Config.LLM_BATCH_MAX_TWEETS_PER_TERM:
+                        batch.append((term, tweets, pending, term_insights))
+                        if len(batch) >= Config.LLM_BATCH_MAX_TERMS:
+                            await self.summarize_batch(db, batch)
+                            batch = []
+                    else:
+                        await self.summarize_term(db, term, tweets, pending, term_insights)
+                if batch:
+                    await self.summarize_batch(db, batch)
+            
+                self._finish_run_stats(stats)
+                logger.info(f"Run stats: {stats}")
+                events.broker.publish("job_completed", terms=len(active_terms), stats=stats)
                 
         except Exception as e:
             logger.error(f"Error in daily job: {str(e)}")
         finally:
+            instrumentation.SCHEDULER_QUEUE_DEPTH.set(0)
+            self.record_run(db, "daily", trace, stats)
             db.close()
             logger.info("Daily job completed")
     
     async def process_term(self, db: Session, term):
+        collected = await self.collect_term(db, term)
+        if collected is not None:
+            tweets, pending = collected
+            insights = self.analyze([(term, tweets, pending)])[0]
+            previous = self.previous_results(db, [term.id]).get(term.id)
+            if not await self.diff_against_previous(db, term, tweets, pending, insights, previous, self._new_run_stats(1)):
+                await self.summarize_term(db, term, tweets, pending, insights)
+    
+    async def collect_term(self, db: Session, term) -> Optional[Tuple[List[Dict[str, Any]], list]]:
+        """
+        Fetch (or, in stream mode, dequeue) a term's tweets and feed the spike detector.
+        
+        Returns:
+            Tuple of (tweets, pending streamed-tweet rows), or None when
+            there is nothing to summarise
+        """
+        started_at = datetime.now(timezone.utc)
         try:
             logger.info(f"Processing term: {term.keyword}")
             
-            tweets = await self.twitter_service.search_tweets(
-                keyword=term.keyword,
-                restrict_following=term.restrict_following,
-                max_results=50
-            )
+            pending = []
+            if Config.INGESTION_MODE == "stream":
+                # Tweets were already collected by StreamService
+                pending = crud.get_pending_streamed_tweets(db, keyword_id=term.id, limit=50)
+                tweets = [row.tweet for row in pending]
+            else:
+                tweets = await self.twitter_service.search_tweets(
+                    keyword=term.keyword,
+                    restrict_following=term.restrict_following,
+                    max_results=50
+                )
             
+            instrumentation.TWEETS_FETCHED.labels(term=term.keyword).inc(len(tweets))
             if not tweets:
                 logger.info(f"No tweets found for {term.keyword}")
-                return
-            
-            summary = await self.llm_service.summarize_tweets(tweets, term.keyword)
-            
-            result_data = schemas.ResultCreate(
-                keyword_id=term.id,
-                tweets_raw=tweets,
-                summary=summary
-            )
+                return None
             
-            crud.create_result(db=db, result=result_data)
-            logger.info(f"Processed {len(tweets)} tweets for {term.keyword}")
+            self.observe_tweets(db, term, tweets)
+            return tweets, pending
             
+        except resilience.Unavailable as e:
+            logger.warning(f"Skipping term {term.keyword}: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Error processing term {term.keyword}: {str(e)}")
+            instrumentation.ERRORS.labels(term=term.keyword, stage="process_term").inc()
+            return None
+        finally:
+            # Stamped after observe_tweets, so a spike's rerun cooldown is
+            # measured from the previous run rather than this one
+            self._last_term_run[term.id] = started_at
+    
+    def analyze(self, collected: List[Tuple[Any, List[Dict[str, Any]], list]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Local analytics for collected terms; analytics are an extra, so a
+        failure (or the feature being off) yields None for every term.
+        """
+        if not Config.LOCAL_ANALYTICS_ENABLED or not collected:
+            return [None] * len(collected)
+        try:
+            with profiling.span("analytics"):
+                return tweet_analytics.analyze_batch([(term.keyword, tweets) for term, tweets, _ in collected])
+        except Exception as e:
+            logger.error(f"Error computing local analytics for {len(collected)} terms: {str(e)}")
+            instrumentation.ERRORS.labels(term="", stage="analytics").inc()
+            return [None] * len(collected)
+    
+    def previous_results(self, db: Session, keyword_ids: List[int]) -> Dict[int, Any]:
+        if not Config.SUMMARY_DIFF_ENABLED:
+            return {}
+        try:
+            return crud.get_previous_results(db, keyword_ids)
+        except Exception as e:
+            logger.error(f"Error loading previous results for summary diffing: {str(e)}")
+            return {}
+    
+    async def diff_against_previous(self, db: Session, term, tweets: List[Dict[str, Any]], pending: list,
+                                    insights: Optional[Dict[str, Any]], previous, stats: Dict[str, Any]) -> bool:
+        """
+        Compare a term's tweets with its previous result and, when most of
+        them were already summarised, reuse or incrementally update that
+        summary instead of summarising from scratch.
+        
+        Returns:
+            True if the result was stored here, False if it needs a full summary
+        """
+        digest = tweet_analytics.format_digest(insights) or None
+        usable = previous is not None and is_llm_summary(previous.summary)
+        with profiling.span("diff"):
+            mode, new_tweets, overlap = summary_diff.plan_summary(tweets, previous.tweets_raw if usable else None)
+        
+        full_tokens = self.llm_service.estimate_prompt_tokens(tweets, term.keyword, digest)
+        if mode == summary_diff.FULL:
+            sent_tokens = full_tokens
+        elif mode == summary_diff.REUSE:
+            sent_tokens = 0
+        else:
+            sent_tokens = self.llm_service.estimate_prompt_tokens(new_tweets, term.keyword, previous_summary=previous.summary)
+        stats["summaries"][mode] += 1
+        stats["prompt_tokens_estimated"] += full_tokens
+        stats["prompt_tokens_sent"] += sent_tokens
+        instrumentation.SUMMARY_MODES.labels(mode=mode).inc()
+        instrumentation.LLM_PROMPT_TOKENS_SAVED.inc(max(full_tokens - sent_tokens, 0))
+        if mode == summary_diff.FULL:
+            return False
+        
+        logger.info(f"{term.keyword}: {overlap:.0%} of tweets already summarised, {len(new_tweets)} new; mode {mode}")
+        try:
+            if mode == summary_diff.REUSE:
+                summary = previous.summary
+            else:
+                try:
+                    summary = await self.llm_service.summarize_incremental(
+                        new_tweets, term.keyword, previous.summary, digest=digest
+                    )
+                except resilience.Unavailable as e:
+                    logger.warning(f"Summary for {term.keyword} deferred: {str(e)}")
+                    summary = None
+            self.store_result(db, term, tweets, pending, summary, insights, mode=mode)
         except Exception as e:
             logger.error(f"Error processing term {term.keyword}: {str(e)}")
+            instrumentation.ERRORS.labels(term=term.keyword, stage="process_term").inc()
+        return True
+    
+    def _new_run_stats(self, terms: int) -> Dict[str, Any]:
+        return {
+            "terms": terms,
+            "summaries": {summary_diff.FULL: 0, summary_diff.INCREMENTAL: 0, summary_diff.REUSE: 0},
+            "prompt_tokens_estimated": 0,
+            "prompt_tokens_sent": 0,
+        }
+    
+    def _finish_run_stats(self, stats: Dict[str, Any]):
+        """Add the skipped-summary and token-saved ratios."""
+        summarised = sum(stats["summaries"].values())
+        stats["skipped_ratio"] = round(stats["summaries"][summary_diff.REUSE] / summarised, 3) if summarised else 0.0
+        estimated = stats["prompt_tokens_estimated"]
+        stats["tokens_saved_ratio"] = round(1 - stats["prompt_tokens_sent"] / estimated, 3) if estimated else 0.0
+    
+    async def summarize_term(self, db: Session, term, tweets: List[Dict[str, Any]], pending: list,
+                             insights: Optional[Dict[str, Any]] = None):
+        try:
+            try:
+                summary = await self.llm_service.summarize_tweets(
+                    tweets, term.keyword, digest=tweet_analytics.format_digest(insights) or None
+                )
+            except resilience.Unavailable as e:
+                logger.warning(f"Summary for {term.keyword} deferred: {str(e)}")
+                summary = None
+            self.store_result(db, term, tweets, pending, summary, insights)
+        except Exception as e:
+            logger.error(f"Error processing term {term.keyword}: {str(e)}")
+            instrumentation.ERRORS.labels(term=term.keyword, stage="process_term").inc()
+    
+    async def summarize_batch(self, db: Session, batch: List[Tuple[Any, List[Dict[str, Any]], list, Optional[Dict[str, Any]]]]):
+        """Summarise several collected terms with one LLM request and store each result."""
+        try:
+            summaries = await self.llm_service.summarize_batch(
+                [(term.keyword, tweets) for term, tweets, _, _ in batch],
+                digests=[tweet_analytics.format_digest(insights) or None for _, _, _, insights in batch]
+            )
+        except Exception as e:
+            logger.error(f"Error summarising batch of {len(batch)} terms: {str(e)}")
+            for term, _, _, _ in batch:
+                instrumentation.ERRORS.labels(term=term.keyword, stage="process_term").inc()
+            return
+        
+        for (term, tweets, pending, insights), summary in zip(batch, summaries):
+            try:
+                self.store_result(db, term, tweets, pending, summary, insights)
+            except Exception as e:
+                logger.error(f"Error processing term {term.keyword}: {str(e)}")
+                instrumentation.ERRORS.labels(term=term.keyword, stage="process_term").inc()
+    
+    def store_result(self, db: Session, term, tweets: List[Dict[str, Any]], pending: list, summary: Optional[str],
+                     insights: Optional[Dict[str, Any]] = None, mode: str = summary_diff.FULL):
+        """Store a term's result; a None summary is stored as pending for the retry sweep."""
+        status = "complete"
+        if summary is None:
+            mode = summary_diff.FULL  # the sweep writes a full summary
+            digest = tweet_analytics.format_digest(insights)
+            summary = f"{PENDING_SUMMARY}\n\n{digest}" if digest else PENDING_SUMMARY
+            status = "pending"
+            instrumentation.SUMMARIES_PENDING.inc()
+        result_data = schemas.ResultCreate(
+            keyword_id=term.id,
+            tweets_raw=tweets,
+            summary=summary,
+            insights=insights,
+            summary_status=status,
+            summary_mode=mode
+        )
+        
+        with profiling.span("db_write"):
+            db_result = crud.create_result(db=db, result=result_data)
+            if pending:
+                crud.mark_streamed_tweets_processed(db, result_id=db_result.id, ids=[row.id for row in pending])
+        instrumentation.LAST_SUCCESS_TIMESTAMP.labels(term=term.keyword).set_to_current_time()
+        logger.info(f"Processed {len(tweets)} tweets for {term.keyword}")
+    
+    async def retry_pending_summaries(self) -> int:
+        """
+        Fill in results stored as "summary pending". Runs on an interval,
+        within its own deadline, and stops at the first sign DeepSeek is
+        still unavailable. Results pending too long are marked failed.
+        
+        Returns:
+            Number of summaries completed
+        """
+        if not self.llm_service.breaker.allows():
+            logger.info("Skipping summary retry sweep: DeepSeek circuit is open")
+            return 0
+        db: Session = SessionLocal()
+        completed = 0
+        try:
+            with resilience.deadline(Config.SUMMARY_RETRY_DEADLINE_SECONDS), instrumentation.monitored_terms():
+                cutoff = datetime.now(timezone.utc) - timedelta(hours=Config.SUMMARY_RETRY_MAX_AGE_HOURS)
+                expired = crud.expire_pending_results(db, created_before=cutoff)
+                if expired:
+                    logger.warning(f"Gave up on {expired} summaries pending for over {Config.SUMMARY_RETRY_MAX_AGE_HOURS}h")
+                for result in crud.get_pending_results(db, limit=Config.SUMMARY_RETRY_BATCH_SIZE):
+                    keyword = result.monitored_term.keyword if result.monitored_term else ""
+                    try:
+                        summary = await self.llm_service.summarize_tweets(
+                            result.tweets_raw or [], keyword,
+                            digest=tweet_analytics.format_digest(result.insights) or None
+                        )
+                    except resilience.Unavailable as e:
+                        logger.warning(f"Summary retry sweep stopped: {str(e)}")
+                        break
+                    crud.complete_result_summary(db, result, summary)
+                    completed += 1
+        except Exception as e:
+            logger.error(f"Error in summary retry sweep: {str(e)}")
+        finally:
+            db.close()
+        if completed:
+            logger.info(f"Summary retry sweep completed {completed} pending summaries")
+        return completed
+    
+    def observe_tweets(self, db: Session, term, tweets: List[Dict[str, Any]]):
+        """
+        Feed fetched tweets to the spike detector, store any anomalies and,
+        if enabled, schedule an immediate run for a spiking term.
+        """
+        try:
+            with profiling.span("spike_detection"):
+                anomalies = self.trend_detector.observe(term.id, tweets)
+                for anomaly in anomalies:
+                    crud.create_anomaly(db=db, anomaly=schemas.AnomalyCreate(**anomaly))
+            if anomalies and Config.SPIKE_TRIGGER_RUN:
+                self.trigger_term_run(term.id)
+        except Exception as e:
+            logger.error(f"Error detecting spikes for {term.keyword}: {str(e)}")
+    
+    def trigger_term_run(self, term_id: int) -> bool:
+        """
+        Schedule an out-of-schedule process_term run, unless the term already
+        ran within the cooldown window.
+        """
+        last_run = self._last_term_run.get(term_id)
+        cooldown = timedelta(minutes=Config.SPIKE_RERUN_COOLDOWN_MINUTES)
+        if last_run and datetime.now(timezone.utc) - last_run < cooldown:
+            logger.info(f"Skipping spike run for term {term_id}: ran at {last_run.isoformat()}")
+            return False
+        if not self.scheduler.running:
+            logger.warning(f"Scheduler not running; cannot trigger spike run for term {term_id}")
+            return False
+        self.scheduler.add_job(
+            self.run_term_job,
+            'date',
+            args=[term_id],
+            id=f'spike_run_{term_id}',
+            replace_existing=True
+        )
+        logger.info(f"Scheduled spike run for term {term_id}")
+        return True
+    
+    async def run_term_job(self, term_id: int):
+        db: Session = SessionLocal()
+        try:
+            term = crud.get_monitored_term(db, term_id=term_id)
+            if term and term.active:
+                trace = profiling.Trace(profiling.RUN, f"term {term.keyword}")
+                try:
+                    with trace, resilience.deadline(Config.RUN_DEADLINE_SECONDS), instrumentation.monitored_terms():
+                        await self.process_term(db, term)
+                finally:
+                    self.record_run(db, "term", trace, {"term_id": term.id, "keyword": term.keyword})
+        finally:
+            db.close()
+    
+    def record_run(self, db: Session, job: str, trace: profiling.Trace, stats: Optional[Dict[str, Any]]):
+        """Save a run's stats and stage breakdown (and profile id, if it was profiled)."""
+        try:
+            logger.info(f"Run stages: {trace.breakdown}")
+            crud.create_job_run(db, schemas.JobRunCreate(
+                job=job,
+                started_at=trace.started_at,
+                duration_seconds=trace.duration,
+                stats=stats,
+                stages=trace.breakdown,
+                profile_id=trace.profile_id
+            ))
+        except Exception as e:
+            logger.error(f"Error recording {job} run: {str(e)}")
     
     async def run_manual_job(self):
         logger.info("Starting manual job")
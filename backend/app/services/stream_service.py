@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app import crud
+from app.config import Config
+from app.services.twitter_service import TwitterService
+from app.services.term_matcher import TermMatcher
+import logging
+
+logger = logging.getLogger(__name__)
+
+class StreamService:
+    """
+    Filtered-stream ingestion: keeps X stream rules in sync with the active
+    terms, routes each incoming tweet to its terms and writes them to
+    ``streamed_tweets`` in micro-batches for the scheduled summary run.
+    """
+
+    def __init__(
+        self,
+        twitter_service: TwitterService,
+        on_tweets: Optional[Callable[[Session, Any, List[Dict[str, Any]]], None]] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.twitter_service = twitter_service
+        self.on_tweets = on_tweets
+        self.session_factory = session_factory
+        self.matcher = TermMatcher([])
+        self._terms: Dict[int, SimpleNamespace] = {}
+        self._buffer: List[Tuple[int, Dict[str, Any]]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"received": 0, "unmatched": 0, "routed": 0, "written": 0}
+
+    def load_terms(self, terms) -> None:
+        """Rebuild the term matcher from MonitoredTerm rows."""
+        self._terms = {
+            term.id: SimpleNamespace(id=term.id, keyword=term.keyword, restrict_following=term.restrict_following)
+            for term in terms
+        }
+        self.matcher = TermMatcher((term.id, term.keyword) for term in self._terms.values())
+        logger.info(f"Stream matcher compiled for {len(self.matcher)} terms")
+
+    async def refresh_terms(self) -> None:
+        """Reload active terms and sync stream rules; called after term CRUD."""
+        db = self.session_factory()
+        try:
+            terms = crud.get_active_monitored_terms(db)
+            self.load_terms(terms)
+        finally:
+            db.close()
+        try:
+            await self.twitter_service.sync_stream_rules([term.keyword for term in self._terms.values()])
+        except Exception as e:
+            logger.error(f"Error syncing stream rules: {str(e)}")
+
+    async def start(self):
+        await self.refresh_terms()
+        self._task = asyncio.create_task(self.run())
+        logger.info("Stream ingestion started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        logger.info("Stream ingestion stopped")
+
+    async def run(self, max_connections: Optional[int] = None):
+        flush_task = asyncio.create_task(self._flush_periodically())
+        try:
+            async for tweet in self.twitter_service.stream_tweets(max_connections=max_connections):
+                await self.route(tweet)
+        finally:
+            flush_task.cancel()
+            await self.flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(Config.STREAM_FLUSH_SECONDS)
+            await self.flush()
+
+    async def route(self, tweet: Dict[str, Any]) -> List[int]:
+        """Buffer a tweet under every term it matches; returns the term ids."""
+        self.stats["received"] += 1
+        term_ids = self.matcher.match(tweet.get("text", ""))
+        if not term_ids:
+            self.stats["unmatched"] += 1
+            return []
+
+        routed = []
+        for term_id in term_ids:
+            if self._terms[term_id].restrict_following:
+                following = await self.twitter_service.get_following_user_ids()
+                if following and str(tweet.get("author_id")) not in following:
+                    continue
+            self._buffer.append((term_id, tweet))
+            routed.append(term_id)
+        self.stats["routed"] += len(routed)
+
+        if len(self._buffer) >= Config.STREAM_BATCH_SIZE:
+            await self.flush()
+        return routed
+
+    async def flush(self) -> int:
+        """
+        Write buffered tweets in one transaction and notify the spike
+        detector, in a worker thread so the stream reader keeps going.
+        """
+        if not self._buffer:
+            return 0
+        batch, self._buffer = self._buffer, []
+        return await asyncio.to_thread(self._write, batch, self._terms)
+
+    def _write(self, batch: List[Tuple[int, Dict[str, Any]]], terms: Dict[int, SimpleNamespace]) -> int:
+        db = self.session_factory()
+        try:
+            try:
+                written = crud.create_streamed_tweets(db, batch)
+            except Exception as e:
+                logger.error(f"Error writing streamed tweets: {str(e)}")
+                return 0
+            self.stats["written"] += written
+            if self.on_tweets:
+                by_term: Dict[int, List[Dict[str, Any]]] = {}
+                for term_id, tweet in batch:
+                    by_term.setdefault(term_id, []).append(tweet)
+                for term_id, tweets in by_term.items():
+                    term = terms.get(term_id)
+                    if term is None:
+                        continue  # removed since the tweets were buffered
+                    try:
+                        self.on_tweets(db, term, tweets)
+                    except Exception as e:
+                        logger.error(f"Error observing streamed tweets for {term.keyword}: {str(e)}")
+            return written
+        finally:
+            db.close()
@@ -0,0 +1,57 @@
+"""
+Decide how much of a term's summary needs regenerating, by comparing the
+new tweets with those behind the term's previous result.
+
+A tweet counts as already summarised if its id was in the previous result,
+or if its normalised text was (retweets and copy-pasted posts get new ids).
+"""
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import Config
+
+FULL, INCREMENTAL, REUSE = "full", "incremental", "reuse"
+
+_RT_PREFIX = re.compile(r"^rt @\w+:\s*")
+_URL = re.compile(r"https?://\S+")
+_SPACE = re.compile(r"\s+")
+
+def _normalise(text: str) -> str:
+    text = _URL.sub("", (text or "").lower())
+    return _SPACE.sub(" ", _RT_PREFIX.sub("", text)).strip()
+
+def fingerprints(tweets: List[Dict[str, Any]]) -> Tuple[Set[str], Set[str]]:
+    """(ids, normalised texts) of a tweet list."""
+    ids = {str(tweet["id"]) for tweet in tweets if tweet.get("id") is not None}
+    texts = {_normalise(tweet.get("text", "")) for tweet in tweets}
+    texts.discard("")
+    return ids, texts
+
+def plan_summary(
+    tweets: List[Dict[str, Any]],
+    previous_tweets: Optional[List[Dict[str, Any]]],
+) -> Tuple[str, List[Dict[str, Any]], float]:
+    """
+    Choose between a full summary, an incremental update and reusing the
+    previous summary.
+
+    Args:
+        tweets: The term's tweets for this run
+        previous_tweets: tweets_raw of the term's previous result, if any
+
+    Returns:
+        Tuple of (mode, tweets not seen before, overlap ratio in [0, 1])
+    """
+    if not Config.SUMMARY_DIFF_ENABLED or not previous_tweets or not tweets:
+        return FULL, tweets, 0.0
+    seen_ids, seen_texts = fingerprints(previous_tweets)
+    new_tweets = [
+        tweet for tweet in tweets
+        if str(tweet.get("id")) not in seen_ids and _normalise(tweet.get("text", "")) not in seen_texts
+    ]
+    overlap = 1.0 - len(new_tweets) / len(tweets)
+    if overlap >= Config.SUMMARY_REUSE_THRESHOLD:
+        return REUSE, new_tweets, overlap
+    if overlap >= Config.SUMMARY_INCREMENTAL_THRESHOLD:
+        return INCREMENTAL, new_tweets, overlap
+    return FULL, tweets, overlap
@@ -0,0 +1,106 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+def keyword_tokens(keyword: str) -> List[str]:
+    """
+    Split a monitored keyword into the tokens a tweet must contain.
+
+    Whitespace-separated words are ANDed, like X search. Operator tokens
+    (``OR``, ``-exclusions``, ``from:``/``lang:`` style filters) are dropped
+    because they cannot be checked against tweet text.
+    """
+    tokens = []
+    for raw in keyword.split():
+        token = raw.strip('"()').lower()
+        if not token or token == "or" or token.startswith("-") or ":" in token:
+            continue
+        tokens.append(token)
+    return tokens
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class TermMatcher:
+    """
+    Routes tweet text to monitored terms with a compiled Aho-Corasick automaton.
+
+    All tokens of all terms are matched in a single pass over the lower-cased
+    text; a term matches when every one of its tokens occurs at word
+    boundaries. Cost is linear in the text length regardless of term count.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[int, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self._required: Dict[int, Set[str]] = {}
+        self._terms_by_token: Dict[str, List[int]] = {}
+
+        for term_id, keyword in terms:
+            tokens = set(keyword_tokens(keyword))
+            if not tokens:
+                logger.warning(f"Term {term_id} ({keyword!r}) has no matchable tokens")
+                continue
+            self._required[term_id] = tokens
+            for token in tokens:
+                if token not in self._terms_by_token:
+                    self._add_pattern(token)
+                self._terms_by_token.setdefault(token, []).append(term_id)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._required)
+
+    def _add_pattern(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _find_tokens(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern in self._output[state]:
+                start = end - len(pattern) + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1] if end + 1 < len(text) else " "
+                if _is_word_char(pattern[0]) and (_is_word_char(before) or before in "#$"):
+                    continue
+                if _is_word_char(pattern[-1]) and _is_word_char(after):
+                    continue
+                found.add(pattern)
+        return found
+
+    def match(self, text: str) -> List[int]:
+        """Return the ids of every term whose tokens all occur in the text."""
+        found = self._find_tokens(text.lower())
+        candidates = {term_id for token in found for term_id in self._terms_by_token[token]}
+        return sorted(term_id for term_id in candidates if self._required[term_id] <= found)
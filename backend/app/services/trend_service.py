@@ -0,0 +1,213 @@
+import hashlib
+import math
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import Config
+from app.search import parse_tweet_time
+import logging
+
+logger = logging.getLogger(__name__)
+
+TAG_RE = re.compile(r"(?<![\w$#])[#$][A-Za-z_][A-Za-z0-9_]*")
+
+def extract_tags(text: str) -> List[str]:
+    """Return the distinct lower-cased hashtags and cashtags in a tweet."""
+    return sorted({tag.lower() for tag in TAG_RE.findall(text or "")})
+
+class CountMinSketch:
+    """
+    Fixed-size frequency sketch. Estimates never undercount and overcount by
+    at most ~e/width of the total with probability 1 - e^-depth.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, key: str) -> np.ndarray:
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * self.depth).digest()
+        hashes = np.frombuffer(digest, dtype=np.uint64)
+        return (hashes % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, key: str, count: int = 1) -> int:
+        columns = self._columns(key)
+        rows = np.arange(self.depth)
+        self.table[rows, columns] += count
+        self.total += count
+        return int(self.table[rows, columns].min())
+
+    def estimate(self, key: str) -> int:
+        return int(self.table[np.arange(self.depth), self._columns(key)].min())
+
+class TermTrendState:
+    """Constant-size rolling statistics for one term's bucketed tweet volume."""
+
+    __slots__ = (
+        "mean", "variance", "buckets_seen", "open_bucket", "open_count",
+        "open_alerted", "last_tweet_id", "top_tags",
+    )
+
+    def __init__(self):
+        self.mean = 0.0
+        self.variance = 0.0
+        self.buckets_seen = 0
+        self.open_bucket: Optional[int] = None
+        self.open_count = 0
+        self.open_alerted = False
+        # Tweet ids are time-ordered snowflakes, so one high-water mark is
+        # enough to skip tweets that an earlier fetch already counted.
+        self.last_tweet_id = 0
+        # Heavy-hitter candidates for co-occurring tags, bounded in size
+        self.top_tags: Dict[str, int] = {}
+
+class TrendDetector:
+    """
+    Online spike detector fed with the tweets of each fetch.
+
+    Tweet volume per term is counted in fixed-width time buckets; when a bucket
+    closes its count updates an EWMA of the mean and variance. A bucket whose
+    count exceeds the EWMA mean by ``zscore_threshold`` standard deviations is
+    reported as an anomaly, once per bucket. Stretches with no fetched tweets
+    are treated as unobserved rather than as zero-volume buckets.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = Config.SPIKE_BUCKET_MINUTES * 60,
+        alpha: float = Config.SPIKE_EWMA_ALPHA,
+        zscore_threshold: float = Config.SPIKE_ZSCORE_THRESHOLD,
+        min_count: int = Config.SPIKE_MIN_COUNT,
+        warmup_buckets: int = Config.SPIKE_WARMUP_BUCKETS,
+        top_tags: int = 10,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.alpha = alpha
+        self.zscore_threshold = zscore_threshold
+        self.min_count = min_count
+        self.warmup_buckets = warmup_buckets
+        self.top_tags_size = top_tags
+        self.tag_sketch = CountMinSketch()
+        self._states: Dict[int, TermTrendState] = {}
+        # Fed from both the scheduler and the stream writer's worker thread
+        self._lock = threading.Lock()
+
+    def state(self, term_id: int) -> TermTrendState:
+        state = self._states.get(term_id)
+        if state is None:
+            state = self._states[term_id] = TermTrendState()
+        return state
+
+    def observe(self, term_id: int, tweets: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Feed one fetch's tweets for a term.
+
+        Returns:
+            List of anomaly dicts detected by this fetch (usually empty)
+        """
+        with self._lock:
+            return self._observe(term_id, tweets, now)
+
+    def _observe(self, term_id: int, tweets: List[Dict[str, Any]], now: Optional[datetime]) -> List[Dict[str, Any]]:
+        state = self.state(term_id)
+        fallback = now or datetime.now(timezone.utc)
+
+        fresh: List[Tuple[int, Dict[str, Any]]] = []
+        high_water = state.last_tweet_id
+        for tweet in tweets:
+            try:
+                tweet_id = int(tweet.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if tweet_id <= state.last_tweet_id:
+                continue
+            high_water = max(high_water, tweet_id)
+            timestamp = int(parse_tweet_time(tweet.get("created_at"), fallback).timestamp())
+            fresh.append((timestamp - timestamp % self.bucket_seconds, tweet))
+        state.last_tweet_id = high_water
+        fresh.sort(key=lambda item: item[0])
+
+        anomalies = []
+        for bucket, tweet in fresh:
+            self._count_tags(term_id, state, tweet.get("text", ""))
+            if state.open_bucket is None:
+                state.open_bucket = bucket
+            elif bucket < state.open_bucket:
+                continue  # late arrival for a bucket that is already closed
+            elif bucket > state.open_bucket:
+                anomaly = self._close_bucket(term_id, state)
+                if anomaly:
+                    anomalies.append(anomaly)
+                state.open_bucket = bucket
+            state.open_count += 1
+
+        # Check the still-open bucket too, so a spike in progress is reported
+        # now rather than when the next fetch closes the bucket.
+        if state.open_bucket is not None and not state.open_alerted:
+            anomaly = self._check(term_id, state, state.open_bucket, state.open_count)
+            if anomaly:
+                state.open_alerted = True
+                anomalies.append(anomaly)
+        return anomalies
+
+    def _close_bucket(self, term_id: int, state: TermTrendState) -> Optional[Dict[str, Any]]:
+        anomaly = None
+        if not state.open_alerted:
+            anomaly = self._check(term_id, state, state.open_bucket, state.open_count)
+
+        count = float(state.open_count)
+        if state.buckets_seen == 0:
+            state.mean = count
+            state.variance = 0.0
+        else:
+            delta = count - state.mean
+            state.mean += self.alpha * delta
+            state.variance = (1 - self.alpha) * (state.variance + self.alpha * delta * delta)
+        state.buckets_seen += 1
+        state.open_count = 0
+        state.open_alerted = False
+        return anomaly
+
+    def _check(self, term_id: int, state: TermTrendState, bucket: int, count: int) -> Optional[Dict[str, Any]]:
+        if state.buckets_seen < self.warmup_buckets or count < self.min_count:
+            return None
+        # Floor the deviation at Poisson noise so a perfectly flat history
+        # does not turn every extra tweet into an infinite z-score.
+        std = math.sqrt(max(state.variance, state.mean, 1.0))
+        zscore = (count - state.mean) / std
+        if zscore < self.zscore_threshold:
+            return None
+        logger.info(f"Spike detected for term {term_id}: {count} tweets vs baseline {state.mean:.1f} (z={zscore:.1f})")
+        return {
+            "keyword_id": term_id,
+            "bucket_start": datetime.fromtimestamp(bucket, timezone.utc),
+            "tweet_count": count,
+            "baseline_mean": state.mean,
+            "zscore": zscore,
+            "top_tags": self.top_tags(term_id),
+        }
+
+    def _count_tags(self, term_id: int, state: TermTrendState, text: str):
+        for tag in extract_tags(text):
+            estimate = self.tag_sketch.add(f"{term_id}:{tag}")
+            if tag in state.top_tags or len(state.top_tags) < self.top_tags_size:
+                state.top_tags[tag] = estimate
+                continue
+            weakest = min(state.top_tags, key=state.top_tags.get)
+            if estimate > state.top_tags[weakest]:
+                del state.top_tags[weakest]
+                state.top_tags[tag] = estimate
+
+    def top_tags(self, term_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+        """Most frequent hashtags/cashtags seen alongside a term, best first."""
+        state = self._states.get(term_id)
+        if state is None:
+            return []
+        ranked = sorted(state.top_tags.items(), key=lambda item: item[1], reverse=True)
+        return [{"tag": tag, "count": count} for tag, count in ranked[:limit]]
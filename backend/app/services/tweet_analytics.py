@@ -0,0 +1,206 @@
+"""
+Local, CPU-only analytics over fetched tweets.
+
+All tweets of a run are tokenised once into a sparse tweet x vocabulary
+matrix. Lexicon sentiment is a sparse matrix-vector product. Each term's
+TF-IDF is a sparse group-by (terms x tweets indicator times the count
+matrix), with IDF taken across the run's terms, so top terms are the words
+that set a term apart from the others in the same run.
+"""
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.term_matcher import keyword_tokens
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 10
+NEUTRAL_BAND = 0.05
+
+URL_RE = re.compile(r"https?://\S+")
+ENTITY_RE = re.compile(r"(?<![\w$#@])([#$@])([A-Za-z_][A-Za-z0-9_]*)")
+WORD_RE = re.compile(r"[a-z][a-z0-9']*[a-z0-9]|[a-z]")
+
+NEGATORS = frozenset({"not", "no", "never", "none", "nobody", "nothing", "neither", "nor",
+                      "cannot", "can't", "don't", "doesn't", "didn't", "isn't", "aren't",
+                      "wasn't", "weren't", "won't", "wouldn't", "shouldn't", "couldn't", "ain't"})
+# Words after a negator (within this many tokens) have their polarity flipped
+NEGATION_WINDOW = 3
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself now of off on once only or other our ours ourselves out over own
+same she should so some such than that the their theirs them themselves then there these they
+this those through to too under until up very was we were what when where which while who whom
+why will with would you your yours yourself yourselves rt amp via im it's i'm you're that's
+get got go going gonna one like also still really today new
+""".split()) | NEGATORS
+
+# Compact general + market lexicon, scores in [-3, 3]
+LEXICON: Dict[str, float] = {
+    "good": 1.9, "great": 3.0, "excellent": 3.0, "amazing": 2.8, "awesome": 2.8, "love": 3.0,
+    "nice": 1.8, "best": 3.0, "better": 1.9, "happy": 2.7, "excited": 2.2,
+    "impressive": 2.4, "strong": 2.2, "win": 2.8, "winning": 2.5, "success": 2.7, "solid": 1.8,
+    "positive": 2.3, "optimistic": 2.2, "confident": 2.2, "beat": 1.6, "beats": 1.6, "gain": 2.0,
+    "gains": 2.0, "growth": 1.8, "profit": 1.9, "profits": 1.9, "rally": 2.0, "surge": 1.9,
+    "soar": 2.2, "soaring": 2.2, "bullish": 2.5, "moon": 1.8, "upgrade": 2.0, "upgraded": 2.0,
+    "outperform": 2.0, "record": 1.0, "breakthrough": 2.3, "innovative": 2.0, "recommend": 1.5,
+    "thanks": 1.9, "thank": 1.5, "wow": 2.0, "fantastic": 2.6, "beautiful": 2.9, "fun": 2.3,
+    "up": 0.5, "higher": 1.0, "rise": 1.2, "rising": 1.2, "recover": 1.5, "recovery": 1.5,
+    "bad": -2.5, "terrible": -3.0, "awful": -3.0, "worst": -3.0, "worse": -2.1, "hate": -2.7,
+    "poor": -2.1, "weak": -1.9, "fail": -2.5, "failed": -2.3, "failure": -2.6, "loss": -1.9,
+    "losses": -1.9, "lose": -1.9, "losing": -1.9, "negative": -2.3, "concern": -1.2,
+    "concerns": -1.2, "worried": -1.7, "fear": -2.2, "scared": -2.0, "risk": -1.1, "risky": -1.4,
+    "crash": -2.7, "crashing": -2.7, "dump": -1.9, "plunge": -2.4, "plunges": -2.4,
+    "drop": -1.1, "drops": -1.1, "fall": -1.2, "falling": -1.4, "down": -0.6, "lower": -0.9,
+    "miss": -1.5, "missed": -1.7, "misses": -1.5, "downgrade": -2.0, "downgraded": -2.0,
+    "bearish": -2.5, "sell": -0.8, "selloff": -2.2, "scam": -2.8, "fraud": -3.0, "lawsuit": -1.6,
+    "bankrupt": -2.9, "bankruptcy": -2.9, "layoffs": -2.0, "recession": -2.3, "bubble": -1.5,
+    "overvalued": -1.6, "disappointing": -2.2, "disappointed": -2.2, "angry": -2.3, "sad": -2.1,
+    "broken": -2.0, "bug": -1.2, "bugs": -1.2, "outage": -2.0, "problem": -1.7, "problems": -1.7,
+    "wrong": -2.1, "ugly": -2.3, "useless": -2.5, "hype": -0.8, "delay": -1.3, "delayed": -1.4,
+}
+
+def _tokenize(text: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Split a tweet into word tokens (negation-marked as ``not_<word>``) and entities."""
+    text = URL_RE.sub(" ", text or "")
+    entities = [(sigil, name.lower()) for sigil, name in ENTITY_RE.findall(text)]
+    words = WORD_RE.findall(ENTITY_RE.sub(" ", text).lower())
+    tokens = []
+    negate_left = 0
+    for word in words:
+        if word in NEGATORS:
+            negate_left = NEGATION_WINDOW
+            continue
+        if negate_left:
+            negate_left -= 1
+            if word in LEXICON:
+                tokens.append(f"not_{word}")
+                continue
+        tokens.append(word)
+    return tokens, entities
+
+def _top(counter: Counter, prefix: str) -> List[List[Any]]:
+    return [[f"{prefix}{name}", count] for name, count in counter.most_common(TOP_N)]
+
+def analyze_batch(groups: Sequence[Tuple[str, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Compute sentiment, entities and top terms for every term of a run.
+
+    Args:
+        groups: (keyword, tweets) pairs, one per term
+
+    Returns:
+        One insights dict per group, in order
+    """
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    tweet_group: List[int] = []
+    tweet_ids: List[Any] = []
+    entity_counts = [{"#": Counter(), "$": Counter(), "@": Counter()} for _ in groups]
+
+    for group_index, (_, tweets) in enumerate(groups):
+        for tweet in tweets:
+            tokens, entities = _tokenize(tweet.get("text", ""))
+            row = len(tweet_group)
+            tweet_group.append(group_index)
+            tweet_ids.append(tweet.get("id"))
+            rows.extend([row] * len(tokens))
+            cols.extend([vocabulary.setdefault(token, len(vocabulary)) for token in tokens])
+            for sigil, name in entities:
+                entity_counts[group_index][sigil][name] += 1
+
+    n_tweets, n_groups = len(tweet_group), len(groups)
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(n_tweets, len(vocabulary))
+    )  # duplicate (row, col) pairs are summed
+    terms = np.empty(len(vocabulary), dtype=object)
+    for token, index in vocabulary.items():
+        terms[index] = token
+
+    # Sentiment: one sparse mat-vec for every tweet of the run
+    polarity = np.array([
+        -LEXICON[token[4:]] if token.startswith("not_") else LEXICON.get(token, 0.0)
+        for token in terms
+    ], dtype=np.float64)
+    raw = counts @ polarity
+    scores = raw / np.sqrt(raw * raw + 15.0)  # squash to (-1, 1)
+
+    # TF-IDF per term: group-by via an indicator matrix, IDF across terms
+    group_of_tweet = np.asarray(tweet_group, dtype=np.int64)
+    indicator = sparse.csr_matrix(
+        (np.ones(n_tweets), (group_of_tweet, np.arange(n_tweets))), shape=(n_groups, n_tweets)
+    )
+    group_counts = (indicator @ counts).tocsr()
+    document_freq = np.bincount(group_counts.indices, minlength=len(vocabulary))
+    idf = np.log((1 + n_groups) / (1 + document_freq)) + 1.0
+    informative = np.array([
+        not token.startswith("not_") and token not in STOPWORDS and len(token) > 2
+        for token in terms
+    ], dtype=bool)
+
+    # Tweets were appended group by group, so each group's rows are contiguous
+    offsets = np.searchsorted(group_of_tweet, np.arange(n_groups + 1))
+    insights = []
+    for group_index, (keyword, _) in enumerate(groups):
+        members = np.arange(offsets[group_index], offsets[group_index + 1])
+        group_scores = scores[members]
+
+        start, end = group_counts.indptr[group_index], group_counts.indptr[group_index + 1]
+        indices = group_counts.indices[start:end]
+        weights = group_counts.data[start:end] * idf[indices]
+        own = {token.lstrip("$#@") for token in keyword_tokens(keyword)}
+        keep = informative[indices] & np.array([terms[i] not in own for i in indices], dtype=bool)
+        indices, weights = indices[keep], weights[keep]
+        order = np.argsort(-weights, kind="stable")[:TOP_N]
+        total = weights.sum() or 1.0
+
+        entry: Dict[str, Any] = {
+            "tweet_count": int(len(members)),
+            "sentiment": {
+                "mean": round(float(group_scores.mean()), 3) if len(members) else 0.0,
+                "positive": int((group_scores > NEUTRAL_BAND).sum()),
+                "negative": int((group_scores < -NEUTRAL_BAND).sum()),
+                "neutral": int((np.abs(group_scores) <= NEUTRAL_BAND).sum()),
+            },
+            "top_terms": [[str(terms[i]), round(float(w / total), 4)] for i, w in zip(indices[order], weights[order])],
+            "cashtags": _top(entity_counts[group_index]["$"], "$"),
+            "hashtags": _top(entity_counts[group_index]["#"], "#"),
+            "mentions": _top(entity_counts[group_index]["@"], "@"),
+        }
+        if len(members):
+            best, worst = members[int(group_scores.argmax())], members[int(group_scores.argmin())]
+            entry["most_positive_id"] = str(tweet_ids[best]) if scores[best] > NEUTRAL_BAND else None
+            entry["most_negative_id"] = str(tweet_ids[worst]) if scores[worst] < -NEUTRAL_BAND else None
+        insights.append(entry)
+    return insights
+
+def analyze_tweets(keyword: str, tweets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Insights for a single term (IDF degenerates to 1, so top terms are by frequency)."""
+    return analyze_batch([(keyword, tweets)])[0]
+
+def format_digest(insights: Optional[Dict[str, Any]]) -> str:
+    """Render insights as a few compact lines for an LLM prompt or a fallback summary."""
+    if not insights or not insights.get("tweet_count"):
+        return ""
+    sentiment = insights["sentiment"]
+    lines = [
+        f"• Tweets analysed: {insights['tweet_count']}",
+        f"• Sentiment: {sentiment['mean']:+.2f} ({sentiment['positive']} positive, "
+        f"{sentiment['negative']} negative, {sentiment['neutral']} neutral)",
+    ]
+    if insights.get("top_terms"):
+        lines.append("• Top terms: " + ", ".join(term for term, _ in insights["top_terms"]))
+    for key, label in (("cashtags", "Cashtags"), ("hashtags", "Hashtags"), ("mentions", "Mentions")):
+        if insights.get(key):
+            lines.append(f"• {label}: " + ", ".join(f"{name} ({count})" for name, count in insights[key][:5]))
+    return "\n".join(lines)
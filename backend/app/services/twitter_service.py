@@ -1,22 +1,74 @@
 import tweepy
-from typing import List, Dict, Any, Optional, Set
+import httpx
+import requests
+import asyncio
+import json
+import time
+from typing import List, Dict, Any, Optional, Set, AsyncIterator
 from app.config import Config
+from app import instrumentation, profiling, resilience
+from app.services.cassette import CassetteAdapter, CassetteTransport, get_cassette
 import logging
 
 logger = logging.getLogger(__name__)
 
+STREAM_RULE_TAG = "x-monitor"
+STREAM_PARAMS = {
+    "tweet.fields": "created_at,author_id,public_metrics",
+    "expansions": "author_id",
+    "user.fields": "username,name,verified",
+}
+# X sends a keep-alive newline every 20 seconds; anything much longer is a stall
+STREAM_READ_TIMEOUT = 90.0
+# tweepy.Client always calls this host; other X_API_BASE_URL values are
+# reached by rewriting requests at the transport adapter.
+TWEEPY_HOST = "https://api.twitter.com"
+
+class DeadlineAdapter(requests.adapters.HTTPAdapter):
+    """requests adapter giving tweepy's calls (which set no timeout) one capped by the run deadline."""
+
+    def send(self, request, **kwargs):
+        kwargs["timeout"] = resilience.timeout_for(Config.X_REQUEST_TIMEOUT_SECONDS)
+        return super().send(request, **kwargs)
+
+class BaseUrlAdapter(DeadlineAdapter):
+    """requests adapter that sends tweepy's api.twitter.com calls to another base URL."""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        if request.url.startswith(TWEEPY_HOST):
+            request.url = self.base_url + request.url[len(TWEEPY_HOST):]
+        return super().send(request, **kwargs)
+
 class TwitterService:
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.client = tweepy.Client(
             bearer_token=Config.X_BEARER_TOKEN,
             consumer_key=Config.X_API_KEY,
             consumer_secret=Config.X_API_SECRET,
             access_token=Config.X_ACCESS_TOKEN,
             access_token_secret=Config.X_ACCESS_TOKEN_SECRET,
-            wait_on_rate_limit=True
+            # Rate limits are handled in _search_page, within the run deadline
+            wait_on_rate_limit=False
         )
+        adapter = DeadlineAdapter()
+        if Config.X_API_BASE_URL.rstrip("/") != TWEEPY_HOST:
+            adapter = BaseUrlAdapter(Config.X_API_BASE_URL)
+        cassette = get_cassette()
+        if cassette:
+            adapter = CassetteAdapter(cassette, "x", inner=adapter)
+            transport = CassetteTransport(cassette, "x", inner=transport)
+        self.client.session.mount(TWEEPY_HOST, adapter)
+        self.breaker = resilience.CircuitBreaker("x", Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_SECONDS)
         self._following_cache: Optional[Set[str]] = None
         self._following_user_ids: Optional[Set[str]] = None
+        # Transport for the httpx-based filtered-stream endpoints (tests inject a fake)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stream_backoff_scale = 1.0
     
     async def search_tweets(self, keyword: str, restrict_following: bool = False, max_results: int = 50) -> List[Dict[str, Any]]:
         """
@@ -29,6 +81,10 @@ class TwitterService:
             
         Returns:
             List of tweet dictionaries with author and engagement data
+            
+        Raises:
+            resilience.Unavailable: If X is down or rate limited beyond what
+                can be waited out, its circuit is open, or the run deadline passed
         """
         try:
             # Build the search query
@@ -55,6 +111,8 @@ class TwitterService:
                     else:
                         logger.info("from:following filter returned no results, trying fallback")
                         
+                except resilience.Unavailable:
+                    raise
                 except Exception as api_error:
                     logger.warning(f"from:following API filter failed: {str(api_error)}, using fallback")
             
@@ -69,11 +127,26 @@ class TwitterService:
             
             return tweets
             
+        except resilience.Unavailable as e:
+            logger.warning(f"X search for {keyword} skipped: {str(e)}")
+            instrumentation.ERRORS.labels(term=instrumentation.term_label(keyword), stage="x_search").inc()
+            raise
         except Exception as e:
             logger.error(f"Error in search_tweets: {str(e)}")
+            instrumentation.ERRORS.labels(term=instrumentation.term_label(keyword), stage="x_search").inc()
             return []
     
     async def _search_tweets_with_query(self, query: str, max_results: int, test_mode: bool = False) -> List[Dict[str, Any]]:
+        """
+        Execute tweet search with the given query in a worker thread: tweepy
+        is synchronous and rate-limit waits sleep, which on the event loop
+        would stall the API and SSE streams.
+        """
+        return await asyncio.to_thread(profiling.follow_thread(self._fetch_tweets), query, max_results, test_mode)
+    
+    # Self time of this stage is pagination and building the tweet dicts
+    @profiling.spanned("x_search")
+    def _fetch_tweets(self, query: str, max_results: int, test_mode: bool = False) -> List[Dict[str, Any]]:
         """
         Execute tweet search with the given query.
         
@@ -89,7 +162,7 @@ class TwitterService:
             limit = min(10, max_results) if test_mode else max_results
             
             tweets = tweepy.Paginator(
-                self.client.search_recent_tweets,
+                self._search_page,
                 query=query,
                 max_results=min(limit, 100),
                 tweet_fields=['created_at', 'author_id', 'public_metrics', 'context_annotations'],
@@ -125,10 +198,37 @@ class TwitterService:
             
             return tweet_data
             
+        except resilience.Unavailable:
+            raise
         except Exception as e:
-            logger.error(f"Error in _search_tweets_with_query: {str(e)}")
+            logger.error(f"Error in _fetch_tweets: {str(e)}")
             return []
     
+    @profiling.spanned("x_request")
+    def _search_page(self, **kwargs):
+        """
+        One recent-search page, through the X circuit breaker. A rate limit
+        that resets soon (and before the run deadline) is waited out;
+        otherwise the circuit stays open until the reset.
+        """
+        while True:
+            with self.breaker.guard():
+                try:
+                    return instrumentation.timed(instrumentation.X_SEARCH_PAGE_SECONDS, self.client.search_recent_tweets)(**kwargs)
+                except tweepy.TooManyRequests as e:
+                    reset = int(e.response.headers.get("x-rate-limit-reset", 0))
+                    wait = max(reset - time.time() + 1, 0.0)
+                except (tweepy.TwitterServerError, requests.RequestException) as e:
+                    raise resilience.dependency_error("X", e) from e
+            
+            left = resilience.remaining()
+            if wait > Config.X_RATE_LIMIT_MAX_WAIT_SECONDS or (left is not None and wait >= left):
+                self.breaker.open_for(wait)
+                raise resilience.Unavailable(f"X rate limit resets in {wait:.0f}s")
+            instrumentation.RATE_LIMIT_WAITS.labels(source="x_api").inc()
+            logger.warning(f"X rate limit exceeded; waiting {wait:.0f}s")
+            time.sleep(wait)
+    
     async def _filter_tweets_by_following(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Filter tweets to only include those from accounts the user follows.
@@ -142,7 +242,7 @@ class TwitterService:
         """
         try:
             # Get the list of followed user IDs
-            followed_user_ids = await self._get_following_user_ids()
+            followed_user_ids = await self.get_following_user_ids()
             
             if not followed_user_ids:
                 logger.warning("No following list available for filtering")
@@ -161,7 +261,7 @@ class TwitterService:
             logger.error(f"Error filtering tweets by following: {str(e)}")
             return tweets  # Return original tweets if filtering fails
     
-    async def _get_following_user_ids(self) -> Set[str]:
+    async def get_following_user_ids(self) -> Set[str]:
         """
         Get the set of user IDs that the authenticated user follows.
         Uses caching to avoid repeated API calls.
@@ -170,8 +270,10 @@ class TwitterService:
             Set of user ID strings
         """
         if self._following_user_ids is not None:
+            instrumentation.CACHE_HITS.labels(cache="following").inc()
             return self._following_user_ids
         
+        instrumentation.CACHE_MISSES.labels(cache="following").inc()
         try:
             # Get current user
             me = self.client.get_me()
@@ -234,4 +336,159 @@ class TwitterService:
             
         except Exception as e:
             logger.error(f"Error getting following list: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+    
+    def _api_client(self) -> httpx.AsyncClient:
+        """Shared httpx client for the v2 endpoints tweepy does not cover; timeouts are set per request."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=Config.X_API_BASE_URL,
+                headers={"Authorization": f"Bearer {Config.X_BEARER_TOKEN}"},
+                transport=self._transport,
+                timeout=30.0
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the httpx client and tweepy's requests session."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.client.session.close()
+    
+    def build_stream_rules(self, keywords: List[str]) -> List[str]:
+        """
+        Pack keywords into as few OR-ed filtered-stream rules as the rule
+        length limit allows. Incoming tweets are routed back to terms locally.
+        
+        Args:
+            keywords: Keywords of the active monitored terms
+            
+        Returns:
+            List of rule values, at most STREAM_MAX_RULES long
+        """
+        rules = []
+        current = ""
+        for keyword in sorted(set(keywords)):
+            clause = f"({keyword})"
+            candidate = f"{current} OR {clause}" if current else clause
+            if len(candidate) <= Config.STREAM_RULE_MAX_LENGTH:
+                current = candidate
+            else:
+                if current:
+                    rules.append(current)
+                current = clause
+        if current:
+            rules.append(current)
+        
+        if len(rules) > Config.STREAM_MAX_RULES:
+            logger.warning(f"{len(rules)} stream rules needed but only {Config.STREAM_MAX_RULES} allowed; dropping the rest")
+            rules = rules[:Config.STREAM_MAX_RULES]
+        return rules
+    
+    async def get_stream_rules(self) -> List[Dict[str, Any]]:
+        response = await self._api_client().get("/2/tweets/search/stream/rules")
+        response.raise_for_status()
+        return response.json().get("data") or []
+    
+    async def sync_stream_rules(self, keywords: List[str]) -> Dict[str, int]:
+        """
+        Make the filtered-stream rules owned by this app match the given keywords.
+        Rules with other tags are left alone.
+        
+        Returns:
+            Dict with the number of rules added and deleted
+        """
+        desired = set(self.build_stream_rules(keywords))
+        existing = [rule for rule in await self.get_stream_rules() if rule.get("tag") == STREAM_RULE_TAG]
+        stale_ids = [rule["id"] for rule in existing if rule["value"] not in desired]
+        missing = sorted(desired - {rule["value"] for rule in existing})
+        
+        client = self._api_client()
+        # Delete first so the add never exceeds the account's rule cap
+        if stale_ids:
+            response = await client.post("/2/tweets/search/stream/rules", json={"delete": {"ids": stale_ids}})
+            response.raise_for_status()
+        if missing:
+            response = await client.post(
+                "/2/tweets/search/stream/rules",
+                json={"add": [{"value": value, "tag": STREAM_RULE_TAG} for value in missing]}
+            )
+            response.raise_for_status()
+        
+        logger.info(f"Stream rules synced: {len(missing)} added, {len(stale_ids)} deleted")
+        return {"added": len(missing), "deleted": len(stale_ids)}
+    
+    def _stream_backoff(self, kind: str, attempt: int) -> float:
+        """Reconnect delays recommended by X: linear for network errors, exponential for HTTP errors."""
+        if kind == "network":
+            delay = min(0.25 * attempt, 16.0)
+        elif kind == "rate_limit":
+            delay = min(60.0 * 2 ** (attempt - 1), 960.0)
+        else:
+            delay = min(5.0 * 2 ** (attempt - 1), 320.0)
+        return delay * self.stream_backoff_scale
+    
+    async def stream_tweets(self, max_connections: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Consume the filtered stream, reconnecting with backoff whenever the
+        connection drops or errors.
+        
+        Args:
+            max_connections: Stop after this many connection attempts (None = forever)
+            
+        Yields:
+            Tweet dictionaries in the same shape as search_tweets returns
+        """
+        connections = 0
+        attempt = 0
+        while max_connections is None or connections < max_connections:
+            connections += 1
+            kind = "network"
+            try:
+                timeout = httpx.Timeout(10.0, read=STREAM_READ_TIMEOUT)
+                async with self._api_client().stream("GET", "/2/tweets/search/stream",
+                                                     params=STREAM_PARAMS, timeout=timeout) as response:
+                    response.raise_for_status()
+                    logger.info("Connected to filtered stream")
+                    attempt = 0
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue  # keep-alive
+                        for tweet in self._format_stream_payload(json.loads(line)):
+                            yield tweet
+                logger.warning("Filtered stream closed by server")
+            except httpx.HTTPStatusError as e:
+                kind = "rate_limit" if e.response.status_code == 429 else "http"
+                if kind == "rate_limit":
+                    instrumentation.RATE_LIMIT_WAITS.labels(source="x_stream").inc()
+                logger.warning(f"Filtered stream HTTP error: {e.response.status_code}")
+            except (httpx.TransportError, ValueError) as e:
+                logger.warning(f"Filtered stream connection error: {str(e)}")
+            
+            attempt += 1
+            if max_connections is None or connections < max_connections:
+                await asyncio.sleep(self._stream_backoff(kind, attempt))
+    
+    def _format_stream_payload(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        data = payload.get("data")
+        if not data:
+            if payload.get("errors"):
+                logger.warning(f"Filtered stream error payload: {payload['errors']}")
+            return []
+        
+        users = {user["id"]: user for user in payload.get("includes", {}).get("users", [])}
+        author = users.get(data.get("author_id"))
+        return [{
+            'id': int(data['id']),
+            'text': data.get('text', ''),
+            'created_at': data.get('created_at'),
+            'author_id': int(data['author_id']) if data.get('author_id') else None,
+            'author': {
+                'username': author.get('username'),
+                'name': author.get('name'),
+                'verified': author.get('verified')
+            } if author else None,
+            'public_metrics': data.get('public_metrics', {}),
+            'url': f"https://twitter.com/i/status/{data['id']}"
+        }]
@@ -0,0 +1,75 @@
+"""
+In-process keyword -> term lookup.
+
+The term table is small per row and read far more often than it is
+written, so a snapshot of it is kept in a dict keyed by normalised
+keyword. Every term write in this process drops the snapshot (see crud);
+the next lookup reloads it with one query. Writes made by other processes
+are picked up within TERM_REGISTRY_TTL_SECONDS.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.models import MonitoredTerm, normalize_keyword
+from app import instrumentation
+
+class TermEntry:
+    """Detached copy of a term's columns; safe to share across sessions."""
+    __slots__ = ("id", "keyword", "restrict_following", "active")
+
+    def __init__(self, id: int, keyword: str, restrict_following: bool, active: bool):
+        self.id = id
+        self.keyword = keyword
+        self.restrict_following = bool(restrict_following)
+        self.active = bool(active)
+
+class TermRegistry:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._by_keyword: Dict[str, TermEntry] = {}
+        self._expires = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._expires = 0.0
+            self._generation += 1
+
+    def lookup(self, db: Session, keyword: str) -> Optional[TermEntry]:
+        """The term whose keyword matches ``keyword`` up to case and whitespace."""
+        return self._snapshot(db).get(normalize_keyword(keyword))
+
+    def _snapshot(self, db: Session) -> Dict[str, TermEntry]:
+        with self._lock:
+            if time.monotonic() < self._expires:
+                instrumentation.CACHE_HITS.labels(cache="term_registry").inc()
+                return self._by_keyword
+            generation = self._generation
+        instrumentation.CACHE_MISSES.labels(cache="term_registry").inc()
+
+        rows = db.query(
+            MonitoredTerm.id,
+            MonitoredTerm.keyword_normalized,
+            MonitoredTerm.keyword,
+            MonitoredTerm.restrict_following,
+            MonitoredTerm.active
+        ).all()
+        by_keyword = {
+            normalized: TermEntry(term_id, keyword, restrict_following, active)
+            for term_id, normalized, keyword, restrict_following, active in rows
+        }
+
+        with self._lock:
+            # A write that landed while we were loading may not be in these
+            # rows; serve them to this caller but don't keep them
+            if generation == self._generation:
+                self._by_keyword = by_keyword
+                self._expires = time.monotonic() + self.ttl
+        return by_keyword
+
+registry = TermRegistry(Config.TERM_REGISTRY_TTL_SECONDS)
@@ -0,0 +1,160 @@
+"""
+Local fake X and DeepSeek HTTP servers for benchmarks.
+
+Both servers are FastAPI apps served by uvicorn on a background thread, with
+configurable latency, error rate and 429 rate so slow or flaky upstreams can
+be reproduced without touching the real APIs.
+"""
+import asyncio
+import json
+import random
+import re
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FaultProfile:
+    """Latency and failure behaviour for one fake upstream."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    async def apply(self) -> Optional[JSONResponse]:
+        """Sleep for the simulated latency; return an error response if one is drawn."""
+        self.requests += 1
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        draw = self._random.random()
+        if draw < self.rate_limit_rate:
+            self.rate_limited += 1
+            return JSONResponse(
+                {"title": "Too Many Requests"}, status_code=429,
+                # tweepy sleeps until this reset time before retrying
+                headers={"x-rate-limit-reset": str(int(time.time()) + 1)},
+            )
+        if draw < self.rate_limit_rate + self.error_rate:
+            self.errors += 1
+            return JSONResponse({"title": "Service Unavailable"}, status_code=503)
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors, "rate_limited": self.rate_limited}
+
+
+def create_fake_x_app(profile: FaultProfile, tweets_per_page: int = 50) -> FastAPI:
+    """Fake X API v2: recent search, users/me and following."""
+    app = FastAPI()
+
+    @app.get("/2/tweets/search/recent")
+    async def search_recent(query: str, max_results: int = 10):
+        failure = await profile.apply()
+        if failure:
+            return failure
+        count = min(max_results, tweets_per_page)
+        base_id = random.randint(10**17, 10**18)
+        data, users = [], {}
+        for i in range(count):
+            author_id = str(1000 + (base_id + i) % 97)
+            users[author_id] = {"id": author_id, "username": f"user{author_id}", "name": f"User {author_id}", "verified": False}
+            data.append({
+                "id": str(base_id + i),
+                "text": f"{query} update {i}: #markets $SPY looking {'strong' if i % 3 else 'weak'} today",
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(time.time() - i * 60)),
+                "author_id": author_id,
+                "public_metrics": {"like_count": i % 11, "retweet_count": i % 5, "reply_count": i % 3, "quote_count": 0},
+            })
+        return {
+            "data": data,
+            "includes": {"users": list(users.values())},
+            "meta": {"result_count": count, "newest_id": data[0]["id"] if data else None},
+        }
+
+    @app.get("/2/users/me")
+    async def users_me():
+        failure = await profile.apply()
+        if failure:
+            return failure
+        return {"data": {"id": "1", "name": "Bench", "username": "bench"}}
+
+    @app.get("/2/users/{user_id}/following")
+    async def following(user_id: str):
+        failure = await profile.apply()
+        if failure:
+            return failure
+        return {"data": [{"id": str(1000 + i), "name": f"u{i}", "username": f"u{i}"} for i in range(50)],
+                "meta": {"result_count": 50}}
+
+    return app
+
+
+def create_fake_deepseek_app(profile: FaultProfile) -> FastAPI:
+    """Fake DeepSeek chat completions endpoint."""
+    app = FastAPI()
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        failure = await profile.apply()
+        if failure:
+            return failure
+        body = await request.json()
+        prompt_chars = sum(len(message.get("content", "")) for message in body.get("messages", []))
+        content = "**Main themes**\n• Volume steady\n• Mixed sentiment\n\n**Notable quotes**\n• \"looking strong\""
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            # Batched prompt: answer every "### T<n>: ..." term section
+            keys = re.findall(r"^### (T\d+):", body["messages"][-1]["content"], flags=re.MULTILINE)
+            content = json.dumps({key: content for key in keys})
+        return {
+            "id": "bench",
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_chars // 4 + len(content) // 4},
+        }
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    """Runs an ASGI app with uvicorn on a daemon thread."""
+
+    def __init__(self, app, port: Optional[int] = None):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.time() + 10
+        while not self.server.started:
+            if time.time() > deadline:
+                raise RuntimeError(f"Server on port {self.port} did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
@@ -0,0 +1,278 @@
+"""
+End-to-end benchmark harness.
+
+Starts local fake X and DeepSeek servers, points the app at them, then
+measures scheduled runs over N terms and HTTP API latency under concurrent
+load. Results are written as JSON so runs can be compared across commits.
+
+Usage:
+    python -m benchmarks.run --terms 10,100,1000 --output benchmarks/results/latest.json
+    python -m benchmarks.run --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.fake_servers import (
+    FaultProfile, ServerThread, create_fake_deepseek_app, create_fake_x_app,
+)
+
+# Metrics where a larger number is a regression; everything else compared is
+# "higher is better" (throughput).
+LOWER_IS_BETTER = ("seconds", "p50_ms", "p99_ms", "peak_memory_mb")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", default="10,100,1000", help="Comma-separated term counts for run_daily_job")
+    parser.add_argument("--api-requests", type=int, default=2000, help="Requests per API endpoint")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--x-latency-ms", type=float, default=5.0)
+    parser.add_argument("--x-tweets", type=int, default=50,
+                        help="Tweets returned per search (use <= LLM_BATCH_MAX_TWEETS_PER_TERM for long-tail terms)")
+    parser.add_argument("--x-error-rate", type=float, default=0.0)
+    parser.add_argument("--x-429-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-429-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass for peak memory")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="Compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change flagged as a regression")
+    return parser.parse_args(argv)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.array(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+    }
+
+
+def reset_database():
+    from app.database import Base, engine
+    from app import models  # noqa: F401
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_terms(count: int):
+    from app.database import SessionLocal
+    from app.models import MonitoredTerm
+
+    db = SessionLocal()
+    try:
+        db.add_all([MonitoredTerm(keyword=f"$BENCH{i}", restrict_following=False, active=True) for i in range(count)])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def bench_daily_job(term_count: int, x_profile: FaultProfile, llm_profile: FaultProfile,
+                          trace_memory: bool = True) -> Dict[str, Any]:
+    from app.database import SessionLocal
+    from app.models import Result
+    from app.services.scheduler_service import SchedulerService
+
+    reset_database()
+    seed_terms(term_count)
+    x_before, llm_before = x_profile.requests, llm_profile.requests
+
+    # Timing pass without tracemalloc, which slows allocation-heavy code noticeably
+    start = time.perf_counter()
+    await SchedulerService().run_daily_job()
+    elapsed = time.perf_counter() - start
+    x_requests, llm_requests = x_profile.requests - x_before, llm_profile.requests - llm_before
+
+    peak = None
+    if trace_memory:
+        reset_database()
+        seed_terms(term_count)
+        tracemalloc.start()
+        await SchedulerService().run_daily_job()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    db = SessionLocal()
+    try:
+        results = db.query(Result).count()
+    finally:
+        db.close()
+    return {
+        "terms": term_count,
+        "seconds": elapsed,
+        "terms_per_second": term_count / elapsed,
+        "peak_memory_mb": peak / 2**20 if peak is not None else None,
+        "results_written": results,
+        "x_requests": x_requests,
+        "llm_requests": llm_requests,
+    }
+
+
+async def bench_api(base_url: str, requests_per_endpoint: int, concurrency: int) -> Dict[str, Any]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        first = (await client.get("/api/results", params={"limit": 1})).json()
+        result_id = first[0]["id"] if first else 1
+        endpoints = {
+            "health": ("/health", None),
+            "terms": ("/api/terms", None),
+            "results": ("/api/results", {"limit": 20}),
+            "result": (f"/api/results/{result_id}", None),
+            "search": ("/api/search", {"q": "update"}),
+        }
+
+        report = {}
+        for name, (path, params) in endpoints.items():
+            latencies: List[float] = []
+            errors = 0
+            queue: asyncio.Queue = asyncio.Queue()
+            for _ in range(requests_per_endpoint):
+                queue.put_nowait(None)
+
+            async def worker():
+                nonlocal errors
+                while not queue.empty():
+                    queue.get_nowait()
+                    start = time.perf_counter()
+                    response = await client.get(path, params=params)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code >= 400:
+                        errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+            report[name] = {
+                "requests": requests_per_endpoint,
+                "errors": errors,
+                "requests_per_second": requests_per_endpoint / elapsed,
+                **percentiles(latencies),
+            }
+        return report
+
+
+def run(args) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="xmonitor-bench-")
+    x_profile = FaultProfile(args.x_latency_ms, error_rate=args.x_error_rate,
+                             rate_limit_rate=args.x_429_rate, seed=args.seed)
+    llm_profile = FaultProfile(args.llm_latency_ms, error_rate=args.llm_error_rate,
+                               rate_limit_rate=args.llm_429_rate, seed=args.seed)
+
+    with ServerThread(create_fake_x_app(x_profile, tweets_per_page=args.x_tweets)) as x_server, \
+         ServerThread(create_fake_deepseek_app(llm_profile)) as llm_server:
+        os.environ.update({
+            "DB_URL": f"sqlite:///{workdir}/bench.db",
+            "X_API_BASE_URL": x_server.url,
+            "X_BEARER_TOKEN": "bench",
+            "DEEPSEEK_BASE_URL": llm_server.url,
+            "DEEPSEEK_API_KEY": "bench",
+            "INGESTION_MODE": "poll",
+        })
+
+        daily_job = []
+        for count in [int(n) for n in args.terms.split(",") if n]:
+            daily_job.append(asyncio.run(bench_daily_job(count, x_profile, llm_profile, not args.no_memory)))
+            print(f"run_daily_job terms={count}: {daily_job[-1]['seconds']:.2f}s", file=sys.stderr)
+
+        # Imported late so app.config sees the environment set above
+        from app.main import app
+
+        with ServerThread(app) as api_server:
+            api = asyncio.run(bench_api(api_server.url, args.api_requests, args.concurrency))
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        },
+        "daily_job": daily_job,
+        "api": api,
+        "upstream": {"x": x_profile.stats(), "llm": llm_profile.stats()},
+        # ru_maxrss is KiB on Linux
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float) -> List[str]:
+    """Return human-readable lines for every metric that regressed beyond the threshold."""
+    regressions = []
+
+    def check(label: str, old: Dict[str, Any], new: Dict[str, Any]):
+        for key, old_value in old.items():
+            new_value = new.get(key)
+            if not isinstance(old_value, (int, float)) or not isinstance(new_value, (int, float)) or not old_value:
+                continue
+            if key in LOWER_IS_BETTER:
+                change = (new_value - old_value) / old_value
+            elif key.endswith("per_second"):
+                change = (old_value - new_value) / old_value
+            else:
+                continue
+            if change > threshold:
+                regressions.append(f"{label}.{key}: {old_value:.3f} -> {new_value:.3f} ({change:+.0%})")
+
+    old_jobs = {run["terms"]: run for run in baseline.get("daily_job", [])}
+    for run in candidate.get("daily_job", []):
+        if run["terms"] in old_jobs:
+            check(f"daily_job[{run['terms']}]", old_jobs[run["terms"]], run)
+    for name, stats in candidate.get("api", {}).items():
+        if name in baseline.get("api", {}):
+            check(f"api.{name}", baseline["api"][name], stats)
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            candidate = json.load(f)
+        regressions = compare(baseline, candidate, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print("No regressions")
+        sys.exit(1 if regressions else 0)
+
+    report = run(args)
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", f"{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
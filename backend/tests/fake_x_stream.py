@@ -0,0 +1,74 @@
+"""
+In-process fake of the X filtered-stream API (rules + stream endpoints),
+served to httpx through ASGITransport.
+"""
+import json
+from typing import Any, Dict, List, Union
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+
+def stream_payload(tweet_id, text, author_id='1001', username='user1', created_at='2024-01-01T10:00:00.000Z'):
+    """A filtered-stream line as X sends it."""
+    return {
+        'data': {
+            'id': str(tweet_id),
+            'text': text,
+            'author_id': author_id,
+            'created_at': created_at,
+            'public_metrics': {'like_count': 1, 'retweet_count': 0, 'reply_count': 0},
+        },
+        'includes': {'users': [{'id': author_id, 'username': username, 'name': username, 'verified': False}]},
+        'matching_rules': [{'id': '1', 'tag': 'x-monitor'}],
+    }
+
+
+class FakeXStream:
+    """
+    Each stream connection consumes the next scripted entry: either an HTTP
+    status code to fail with, or a list of payloads to send before closing.
+    """
+
+    def __init__(self, connections: List[Union[int, List[Dict[str, Any]]]] = None):
+        self.connections = list(connections or [])
+        self.connection_count = 0
+        self.rules: List[Dict[str, str]] = []
+        self._next_rule_id = 1
+        self.app = FastAPI()
+        self.app.add_api_route('/2/tweets/search/stream/rules', self.get_rules, methods=['GET'])
+        self.app.add_api_route('/2/tweets/search/stream/rules', self.post_rules, methods=['POST'])
+        self.app.add_api_route('/2/tweets/search/stream', self.stream, methods=['GET'])
+
+    @property
+    def transport(self) -> httpx.ASGITransport:
+        return httpx.ASGITransport(app=self.app)
+
+    async def get_rules(self):
+        return {'data': self.rules, 'meta': {'result_count': len(self.rules)}}
+
+    async def post_rules(self, request: Request):
+        body = await request.json()
+        if 'delete' in body:
+            ids = set(body['delete']['ids'])
+            self.rules = [rule for rule in self.rules if rule['id'] not in ids]
+        for rule in body.get('add', []):
+            self.rules.append({'id': str(self._next_rule_id), **rule})
+            self._next_rule_id += 1
+        return {'meta': {'summary': {}}}
+
+    async def stream(self):
+        self.connection_count += 1
+        if not self.connections:
+            return Response(status_code=503)
+        script = self.connections.pop(0)
+        if isinstance(script, int):
+            return Response(status_code=script)
+
+        async def lines():
+            for payload in script:
+                yield '\r\n'  # keep-alive
+                yield json.dumps(payload) + '\r\n'
+
+        return StreamingResponse(lines(), media_type='application/json')
@@ -0,0 +1,110 @@
+import pytest
+from datetime import datetime, timezone
+
+from app import analytics, crud, schemas
+from app.models import TermMetric, TermMetricTweet
+
+
+def _tweet(tweet_id, author_id, created_at, likes=0, retweets=0, replies=0):
+    return {
+        'id': tweet_id,
+        'text': f'tweet {tweet_id}',
+        'created_at': created_at,
+        'author_id': author_id,
+        'public_metrics': {'like_count': likes, 'retweet_count': retweets, 'reply_count': replies},
+    }
+
+
+class TestAnalytics:
+    """Test cases for per-term time-series aggregates."""
+
+    @pytest.fixture
+    def term(self, db):
+        return crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword="$ORCL"))
+
+    def test_create_result_updates_hour_and_day_buckets(self, db, term):
+        """Each write folds tweets into both granularities."""
+        crud.create_result(db, schemas.ResultCreate(
+            keyword_id=term.id,
+            tweets_raw=[
+                _tweet(1, 'a', '2024-01-01T10:05:00+00:00', likes=5, retweets=1),
+                _tweet(2, 'b', '2024-01-01T10:45:00+00:00', likes=1, replies=2),
+                _tweet(3, 'a', '2024-01-01T11:10:00+00:00', likes=20),
+            ],
+            summary='summary'
+        ))
+
+        hours = analytics.get_timeseries(db, term.id, 'hour')
+        assert [row.tweet_count for row in hours] == [2, 1]
+        assert hours[0].unique_authors == 2
+        assert (hours[0].like_count, hours[0].retweet_count, hours[0].reply_count) == (6, 1, 2)
+        assert [t['id'] for t in hours[0].top_tweets] == ['1', '2']
+
+        days = analytics.get_timeseries(db, term.id, 'day')
+        assert len(days) == 1
+        assert days[0].tweet_count == 3
+        assert days[0].unique_authors == 2
+        assert days[0].top_tweets[0]['id'] == '3'
+
+    def test_refetched_tweets_are_not_double_counted(self, db, term):
+        """A tweet seen by a later fetch only adds to the aggregates once."""
+        first = [_tweet(1, 'a', '2024-01-01T10:05:00+00:00', likes=5)]
+        second = first + [_tweet(2, 'c', '2024-01-01T10:30:00+00:00', likes=1)]
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=first, summary='s'))
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=second, summary='s'))
+
+        hours = analytics.get_timeseries(db, term.id, 'hour')
+        assert len(hours) == 1
+        assert hours[0].tweet_count == 2
+        assert hours[0].like_count == 6
+        assert hours[0].unique_authors == 2
+        assert db.query(TermMetricTweet).filter(TermMetricTweet.keyword_id == term.id).count() == 2
+
+    def test_bucket_row_size_does_not_grow_with_tweets(self, db, term):
+        """Busy buckets keep a fixed-size author sketch and an estimated author count."""
+        tweets = [_tweet(i, f'u{i % 1500}', '2024-01-01T10:05:00+00:00') for i in range(3000)]
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=tweets[:1000], summary='s'))
+        hour = analytics.get_timeseries(db, term.id, 'hour')[0]
+        sketch_size = len(hour.author_sketch)
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=tweets, summary='s'))
+
+        db.refresh(hour)
+        assert hour.tweet_count == 3000
+        assert len(hour.author_sketch) == sketch_size == 1 << analytics.AUTHOR_SKETCH_PRECISION
+        assert hour.unique_authors == pytest.approx(1500, rel=0.1)
+
+    def test_since_until_and_unknown_granularity(self, db, term):
+        crud.create_result(db, schemas.ResultCreate(
+            keyword_id=term.id,
+            tweets_raw=[
+                _tweet(1, 'a', '2024-01-01T10:00:00+00:00'),
+                _tweet(2, 'a', '2024-01-02T10:00:00+00:00'),
+            ],
+            summary='s'
+        ))
+        rows = analytics.get_timeseries(
+            db, term.id, 'day', since=datetime(2024, 1, 2, tzinfo=timezone.utc)
+        )
+        assert len(rows) == 1
+        with pytest.raises(ValueError):
+            analytics.get_timeseries(db, term.id, 'week')
+
+    def test_backfill_matches_incremental(self, db, term):
+        """Backfilling from history reproduces the write-time aggregates."""
+        for i in range(4):
+            crud.create_result(db, schemas.ResultCreate(
+                keyword_id=term.id,
+                tweets_raw=[
+                    _tweet(i, f'u{i % 2}', f'2024-01-0{i + 1}T10:00:00+00:00', likes=i),
+                    _tweet(i + 100, 'u9', '2024-01-01T12:00:00+00:00', likes=1),
+                ],
+                summary='s'
+            ))
+        snapshot = [(r.bucket_start, r.tweet_count, r.unique_authors, r.like_count)
+                    for r in analytics.get_timeseries(db, term.id, 'day')]
+
+        assert analytics.backfill_metrics(db, chunk_size=3) == 8
+        rebuilt = [(r.bucket_start, r.tweet_count, r.unique_authors, r.like_count)
+                   for r in analytics.get_timeseries(db, term.id, 'day')]
+        assert rebuilt == snapshot
+        assert db.query(TermMetric).filter(TermMetric.granularity == 'hour').count() == 5
@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.run import compare
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestBenchmarks:
+    """Test cases for the benchmark harness."""
+
+    def test_compare_flags_regressions(self):
+        baseline = {
+            'daily_job': [{'terms': 10, 'seconds': 1.0, 'terms_per_second': 10.0, 'peak_memory_mb': 5.0}],
+            'api': {'terms': {'p50_ms': 10.0, 'p99_ms': 50.0, 'requests_per_second': 500.0, 'errors': 0}},
+        }
+        candidate = {
+            'daily_job': [{'terms': 10, 'seconds': 1.05, 'terms_per_second': 9.5, 'peak_memory_mb': 8.0}],
+            'api': {'terms': {'p50_ms': 9.0, 'p99_ms': 80.0, 'requests_per_second': 400.0, 'errors': 3}},
+        }
+        regressions = compare(baseline, candidate, threshold=0.10)
+        assert [line.split(':')[0] for line in regressions] == [
+            'daily_job[10].peak_memory_mb',
+            'api.terms.p99_ms',
+            'api.terms.requests_per_second',
+        ]
+
+    def test_harness_end_to_end(self, tmp_path):
+        """A tiny run against the fake servers writes a complete report."""
+        output = tmp_path / 'bench.json'
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.run', '--terms', '3', '--api-requests', '5',
+             '--concurrency', '2', '--x-latency-ms', '0', '--llm-latency-ms', '0',
+             '--output', str(output)],
+            cwd=BACKEND_DIR, check=True, capture_output=True, timeout=120,
+        )
+        report = json.loads(output.read_text())
+        job = report['daily_job'][0]
+        assert job['terms'] == 3
+        assert job['results_written'] == 3
+        assert job['x_requests'] == 3 and job['llm_requests'] == 3
+        assert job['peak_memory_mb'] > 0
+        assert set(report['api']) == {'health', 'terms', 'results', 'result', 'search'}
+        assert all(stats['errors'] == 0 for stats in report['api'].values())
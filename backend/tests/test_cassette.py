@@ -0,0 +1,80 @@
+import gzip
+import json
+import pytest
+import httpx
+from unittest.mock import patch
+
+from app.config import Config
+from app.services.cassette import Cassette, CassetteMissError, CassetteTransport, request_key
+from app.services.llm_service import LLMService
+from app.services.twitter_service import TwitterService
+from benchmarks.fake_servers import FaultProfile, ServerThread, create_fake_x_app
+
+
+class TestCassette:
+    """Test cases for transport-level record/replay."""
+
+    def test_request_key_ignores_host_and_param_order(self):
+        a = request_key('GET', 'https://api.twitter.com/2/tweets/search/recent?query=x&max_results=10', None)
+        b = request_key('get', 'http://127.0.0.1:9/2/tweets/search/recent?max_results=10&query=x', b'')
+        assert a == b
+        assert a != request_key('POST', 'https://api.deepseek.com/chat/completions', b'{"a": 1}')
+
+    @pytest.mark.asyncio
+    async def test_llm_record_then_replay(self, tmp_path):
+        path = str(tmp_path / 'llm.jsonl.gz')
+        calls = []
+
+        def upstream(request):
+            calls.append(request)
+            return httpx.Response(200, json={
+                'choices': [{'message': {'content': f' summary {len(calls)} '}}],
+                'usage': {'prompt_tokens': 10, 'completion_tokens': 5},
+            }, headers={'x-request-id': 'abc'})
+
+        with patch.object(Config, 'DEEPSEEK_API_KEY', 'test-key'):
+            recorder = LLMService(transport=CassetteTransport(
+                Cassette(path, 'record'), 'deepseek', inner=httpx.MockTransport(upstream)))
+            assert await recorder._deepseek_summarize('prompt one') == 'summary 1'
+            assert await recorder._deepseek_summarize('prompt one') == 'summary 2'
+
+            with gzip.open(path, 'rt') as f:
+                recorded = [json.loads(line) for line in f]
+            assert [r['service'] for r in recorded] == ['deepseek', 'deepseek']
+            assert recorded[0]['headers']['x-request-id'] == 'abc'
+            assert 'test-key' not in json.dumps(recorded)
+
+            replay = Cassette(path, 'replay', speed=0)
+            replayer = LLMService(transport=CassetteTransport(replay, 'deepseek'))
+            assert await replayer._deepseek_summarize('prompt one') == 'summary 1'
+            assert await replayer._deepseek_summarize('prompt one') == 'summary 2'
+            with pytest.raises(CassetteMissError):
+                await replayer._deepseek_summarize('prompt one')
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_twitter_search_record_then_replay_offline(self, tmp_path):
+        """tweepy traffic is recorded through the requests adapter and replays with the server gone."""
+        path = str(tmp_path / 'x.jsonl.gz')
+        with ServerThread(create_fake_x_app(FaultProfile())) as server, \
+             patch.multiple(Config, X_API_BASE_URL=server.url, X_BEARER_TOKEN='bench',
+                            CASSETTE_MODE='record', CASSETTE_PATH=path):
+            recorded = await TwitterService()._search_tweets_with_query('$ORCL', 20)
+        assert len(recorded) == 20
+
+        with patch.multiple(Config, X_API_BASE_URL='http://127.0.0.1:9', X_BEARER_TOKEN='bench',
+                            CASSETTE_MODE='replay', CASSETTE_PATH=path, CASSETTE_REPLAY_SPEED=0.0):
+            replayed = await TwitterService()._search_tweets_with_query('$ORCL', 20)
+        assert replayed == recorded
+
+    def test_record_creates_missing_directory(self, tmp_path):
+        path = str(tmp_path / 'cassettes' / 'session.jsonl.gz')
+        Cassette(path, 'record').record('x', 'GET /a? 0', 200, 'OK', {}, b'{}', elapsed=0.1)
+        assert Cassette(path, 'replay').remaining() == 1
+
+    def test_replay_speed_scales_recorded_latency(self, tmp_path):
+        path = str(tmp_path / 'c.jsonl.gz')
+        Cassette(path, 'record').record('x', 'GET /a? 0', 200, 'OK', {}, b'{}', elapsed=0.5)
+        assert Cassette(path, 'replay', speed=1.0).delay({'elapsed': 0.5}) == 0.5
+        fast = Cassette(path, 'replay', speed=0)
+        assert fast.delay(fast.next('GET /a? 0')) == 0
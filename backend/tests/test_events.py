@@ -0,0 +1,77 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app import crud, events, schemas
+from app.events import EventBroker
+
+
+def _parse(chunk: bytes):
+    fields = dict(line.split(': ', 1) for line in chunk.decode().strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+
+class TestEvents:
+    """Test cases for the result push channel."""
+
+    @pytest.mark.asyncio
+    async def test_publish_reaches_subscribers_from_any_thread(self):
+        broker = EventBroker(max_queue=10, replay_size=10)
+        first, second = broker.subscribe(), broker.subscribe()
+        thread = threading.Thread(target=broker.publish, args=('result',), kwargs={'result_id': 7})
+        thread.start()
+        thread.join()
+        assert (await asyncio.wait_for(first.get(), 1))['result_id'] == 7
+        assert (await asyncio.wait_for(second.get(), 1))['result_id'] == 7
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_resync(self):
+        broker = EventBroker(max_queue=3, replay_size=10)
+        slow = broker.subscribe()
+        for i in range(5):
+            broker.publish('result', result_id=i)
+        await asyncio.sleep(0)
+        received = [slow.queue.get_nowait() for _ in range(slow.queue.qsize())]
+        assert received[0]['type'] == 'resync'
+        assert [e['result_id'] for e in received[1:]] == [4]
+        assert slow.dropped == 4
+
+    @pytest.mark.asyncio
+    async def test_last_event_id_replays_or_resyncs(self):
+        broker = EventBroker(max_queue=10, replay_size=3)
+        for i in range(5):
+            broker.publish('result', result_id=i)  # ids 1..5, ids 3..5 buffered
+        resumed = broker.subscribe(last_event_id=3)
+        assert [resumed.queue.get_nowait()['id'] for _ in range(2)] == [4, 5]
+        too_old = broker.subscribe(last_event_id=1)
+        assert too_old.queue.get_nowait()['type'] == 'resync'
+        restarted = broker.subscribe(last_event_id=99)
+        assert restarted.queue.get_nowait()['type'] == 'resync'
+
+    @pytest.mark.asyncio
+    async def test_create_result_streams_compact_event(self, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$AMD'))
+        disconnected = False
+
+        async def is_disconnected():
+            return disconnected
+
+        stream = events.event_stream(None, is_disconnected, heartbeat=0.05)
+        assert (await stream.__anext__()).startswith(b'retry:')
+        assert await stream.__anext__() == b': ping\n\n'
+
+        summary = 'x' * 1000
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=[{'id': 1}, {'id': 2}], summary=summary))
+        kind, data = _parse(await stream.__anext__())
+        assert kind == 'result'
+        assert data['keyword'] == '$AMD'
+        assert data['tweet_count'] == 2
+        assert len(data['summary_preview']) == events.SUMMARY_PREVIEW_CHARS
+
+        disconnected = True
+        assert len(events.broker) == 1
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert len(events.broker) == 0
@@ -0,0 +1,96 @@
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app import cli, crud, schemas
+from app.database import get_db
+from app.main import app
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def _tweet(i):
+    return {
+        'id': i, 'text': f'tweet {i}', 'created_at': '2026-10-01T12:00:00+00:00', 'author_id': 100 + i,
+        'author': {'username': f'user{i}'}, 'public_metrics': {'like_count': i, 'retweet_count': 0},
+        'url': f'https://twitter.com/i/status/{i}'
+    }
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def stored(db):
+    apple = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$AAPL'))
+    tesla = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$TSLA'))
+    results = [
+        crud.create_result(db, schemas.ResultCreate(keyword_id=apple.id, tweets_raw=[_tweet(1), _tweet(2)], summary='a1', insights={'tweet_count': 2})),
+        crud.create_result(db, schemas.ResultCreate(keyword_id=tesla.id, tweets_raw=[_tweet(3)], summary='t1')),
+        crud.create_result(db, schemas.ResultCreate(keyword_id=apple.id, tweets_raw=[_tweet(4)], summary='a2')),
+    ]
+    results[0].created_at = datetime.now(timezone.utc) - timedelta(days=10)
+    db.commit()
+    return apple, tesla, results
+
+
+class TestExport:
+    """Test cases for streaming NDJSON/Parquet exports."""
+
+    def test_ndjson_results_and_tweets(self, client, stored):
+        apple, _, results = stored
+        response = client.get('/api/export', params={'kind': 'results'})
+        assert response.headers['content-type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [(r['result_id'], r['keyword'], r['tweet_count']) for r in rows] == [
+            (results[0].id, '$AAPL', 2), (results[1].id, '$TSLA', 1), (results[2].id, '$AAPL', 1)
+        ]
+        assert rows[0]['insights'] == {'tweet_count': 2}
+
+        response = client.get('/api/export', params={'kind': 'tweets', 'term_id': apple.id})
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r['tweet_id'] for r in rows] == ['1', '2', '4']
+        assert (rows[0]['author_id'], rows[0]['author_username'], rows[0]['like_count']) == ('101', 'user1', 1)
+
+    def test_date_range_filters_by_result_time(self, client, stored):
+        _, _, results = stored
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=5)).isoformat()
+        rows = client.get('/api/export', params={'since': cutoff}).text.splitlines()
+        assert [json.loads(line)['result_id'] for line in rows] == [results[1].id, results[2].id]
+        rows = client.get('/api/export', params={'until': cutoff}).text.splitlines()
+        assert [json.loads(line)['result_id'] for line in rows] == [results[0].id]
+
+    def test_parquet_is_written_in_row_groups(self, client, stored):
+        with patch('app.export.Config.EXPORT_ROW_GROUP_SIZE', 2):
+            response = client.get('/api/export', params={'kind': 'tweets', 'format': 'parquet'})
+        assert response.status_code == 200
+        parquet = pq.ParquetFile(io.BytesIO(response.content))
+        assert parquet.metadata.num_row_groups == 2
+        table = parquet.read()
+        assert table.column('tweet_id').to_pylist() == ['1', '2', '3', '4']
+        assert table.column('keyword').to_pylist() == ['$AAPL', '$AAPL', '$TSLA', '$AAPL']
+
+        results = pq.read_table(io.BytesIO(client.get('/api/export', params={'format': 'parquet'}).content))
+        assert json.loads(results.column('insights')[0].as_py()) == {'tweet_count': 2}
+
+    def test_parquet_without_pyarrow_is_rejected(self, client, stored):
+        with patch('app.export.pa', None):
+            response = client.get('/api/export', params={'format': 'parquet'})
+        assert response.status_code == 400
+        assert 'pyarrow' in response.json()['detail']
+
+    def test_cli_export_writes_file(self, db, stored, tmp_path):
+        output = tmp_path / 'tweets.ndjson'
+        with patch('app.cli.SessionLocal', return_value=db), patch.object(db, 'close'):
+            cli.main(['export', '--kind', 'tweets', '--output', str(output)])
+        assert len(output.read_text().splitlines()) == 4
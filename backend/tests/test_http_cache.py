@@ -0,0 +1,92 @@
+import gzip
+import json
+
+import brotli
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, schemas
+from app.database import get_db
+from app.http_cache import response_cache
+from app.main import app
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    response_cache.invalidate()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        response_cache.invalidate()
+
+
+class TestHttpCache:
+    """Test cases for conditional GET, compression and the response cache."""
+
+    def test_unchanged_poll_returns_304(self, client):
+        client.post('/api/terms', json={'keyword': '$AAPL'})
+        first = client.get('/api/terms')
+        assert first.status_code == 200
+        assert first.headers['etag'].startswith('W/"')
+        assert 'last-modified' in first.headers
+
+        again = client.get('/api/terms', headers={'If-None-Match': first.headers['etag']})
+        assert again.status_code == 304
+        assert again.content == b''
+
+        # A version check without a cached body also answers 304
+        response_cache.invalidate()
+        again = client.get('/api/terms', headers={'If-None-Match': first.headers['etag']})
+        assert again.status_code == 304
+
+    def test_writes_invalidate_cache_and_etag(self, client):
+        client.post('/api/terms', json={'keyword': '$AAPL'})
+        first = client.get('/api/terms')
+        term_id = first.json()[0]['id']
+
+        client.put(f'/api/terms/{term_id}', json={'active': False})
+        updated = client.get('/api/terms', headers={'If-None-Match': first.headers['etag']})
+        assert updated.status_code == 200
+        assert updated.json()[0]['active'] is False
+        assert updated.headers['etag'] != first.headers['etag']
+
+    def test_new_result_changes_results_etag(self, client, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$TSLA'))
+        first = client.get('/api/results')
+        assert first.json() == []
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=[], summary='s'))
+        second = client.get('/api/results', headers={'If-None-Match': first.headers['etag']})
+        assert second.status_code == 200
+        assert second.json()[0]['monitored_term']['keyword'] == '$TSLA'
+
+    def test_if_modified_since(self, client):
+        client.post('/api/terms', json={'keyword': '$AAPL'})
+        first = client.get('/api/terms')
+        again = client.get('/api/terms', headers={'If-Modified-Since': first.headers['last-modified']})
+        assert again.status_code == 304
+        again = client.get('/api/terms', headers={'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'})
+        assert again.status_code == 200
+
+    def test_large_bodies_are_compressed(self, client, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$NVDA'))
+        tweets = [{'id': i, 'text': f'tweet number {i} about $NVDA'} for i in range(100)]
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=tweets, summary='s'))
+
+        br = client.get('/api/results', headers={'Accept-Encoding': 'br'})
+        assert br.headers['content-encoding'] == 'br'
+        assert len(br.headers['content-length']) and int(br.headers['content-length']) < 4000
+        # httpx without the brotli extra hands back the raw bytes
+        body = br.content if br.content.startswith(b'[') else brotli.decompress(br.content)
+        assert json.loads(body)[0]['tweets_raw'][99]['id'] == 99
+
+        gz = client.get('/api/results', headers={'Accept-Encoding': 'gzip'})
+        assert gz.headers['content-encoding'] == 'gzip'
+        assert gz.json()[0]['summary'] == 's'
+
+        plain = client.get('/api/results', headers={'Accept-Encoding': 'identity'})
+        assert 'content-encoding' not in plain.headers
+
+    def test_missing_result_is_404(self, client):
+        assert client.get('/api/results/999').status_code == 404
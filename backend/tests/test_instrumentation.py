@@ -0,0 +1,84 @@
+import time
+
+import pytest
+import requests
+import tweepy
+from unittest.mock import Mock, AsyncMock, patch
+from prometheus_client import REGISTRY
+
+from app import crud, instrumentation, schemas
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestInstrumentation:
+    """Test cases for Prometheus metrics on the hot paths."""
+
+    def test_timed_observes_calls(self):
+        histogram = Mock()
+        wrapped = instrumentation.timed(histogram, lambda x: x * 2)
+        assert wrapped(21) == 42
+        histogram.observe.assert_called_once()
+
+    def test_x_rate_limit_wait_is_counted(self):
+        response = requests.Response()
+        response.status_code, response.reason = 429, 'Too Many Requests'
+        response.headers['x-rate-limit-reset'] = str(int(time.time()) + 5)
+        with patch('app.services.twitter_service.tweepy.Client'):
+            from app.services.twitter_service import TwitterService
+            service = TwitterService()
+        service.client.search_recent_tweets.side_effect = [tweepy.TooManyRequests(response), 'page']
+        before = _sample('xmonitor_rate_limit_waits_total', source='x_api')
+        with patch('app.services.twitter_service.time.sleep') as sleep:
+            assert service._search_page(query='$X') == 'page'
+        sleep.assert_called_once()
+        assert _sample('xmonitor_rate_limit_waits_total', source='x_api') == before + 1
+
+    @pytest.mark.asyncio
+    async def test_search_errors_label_adhoc_keywords(self):
+        with patch('app.services.twitter_service.tweepy.Client'):
+            from app.services.twitter_service import TwitterService
+            service = TwitterService()
+        service._search_tweets_with_query = AsyncMock(side_effect=RuntimeError('boom'))
+        before = _sample('xmonitor_errors_total', term='adhoc', stage='x_search')
+
+        assert await service.search_tweets('anything a user typed') == []
+        with instrumentation.monitored_terms():
+            assert await service.search_tweets('$ORCL') == []
+
+        assert _sample('xmonitor_errors_total', term='adhoc', stage='x_search') == before + 1
+        assert _sample('xmonitor_errors_total', term='anything a user typed', stage='x_search') == 0
+        assert _sample('xmonitor_errors_total', term='$ORCL', stage='x_search') >= 1
+
+    def test_create_result_records_db_write_latency(self, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$ORCL'))
+        before = _sample('xmonitor_db_write_seconds_count', operation='create_result')
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=[], summary='s'))
+        assert _sample('xmonitor_db_write_seconds_count', operation='create_result') == before + 1
+
+    @pytest.mark.asyncio
+    async def test_process_term_records_term_metrics(self, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='#metrics'))
+        with patch('app.services.twitter_service.tweepy.Client'), \
+             patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            from app.services.scheduler_service import SchedulerService
+            service = SchedulerService()
+        service.twitter_service.search_tweets = AsyncMock(return_value=[{'id': 1, 'text': 'hi'}])
+        service.llm_service.summarize_tweets = AsyncMock(return_value='summary')
+
+        await service.process_term(db, term)
+        assert _sample('xmonitor_tweets_fetched_total', term='#metrics') == 1
+        assert _sample('xmonitor_term_last_success_timestamp_seconds', term='#metrics') > 0
+
+        # A new tweet, so summary diffing can't reuse the previous summary
+        service.twitter_service.search_tweets = AsyncMock(return_value=[{'id': 2, 'text': 'hello'}])
+        service.llm_service.summarize_tweets = AsyncMock(side_effect=RuntimeError('boom'))
+        await service.process_term(db, term)
+        assert _sample('xmonitor_errors_total', term='#metrics', stage='process_term') == 1
+
+    def test_render_latest_exposes_metrics(self):
+        body, content_type = instrumentation.render_latest()
+        assert content_type.startswith('text/plain')
+        assert b'xmonitor_http_request_seconds' in body
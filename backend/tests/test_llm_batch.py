@@ -0,0 +1,107 @@
+import json
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from prometheus_client import REGISTRY
+
+from app import crud, schemas
+from app.config import Config
+from app.services.llm_service import LLMService, parse_batch_response
+
+
+def _completion(content):
+    return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+
+
+def _service(handler):
+    requests = []
+
+    def record(request):
+        requests.append(json.loads(request.content))
+        return handler(requests[-1])
+
+    with patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+        service = LLMService(transport=httpx.MockTransport(record))
+    return service, requests
+
+
+BATCH = [('$AAPL', [{'text': 'aapl up'}]), ('#ai', [{'text': 'ai news'}]), ('$TSLA', [{'text': 'tsla down'}])]
+
+
+class TestLLMBatch:
+    """Test cases for cross-term batched summarisation."""
+
+    def test_parse_batch_response(self):
+        content = '```json\n{"T1": "one", "T2": ["• a", "• b"], "T3": "", "T9": "extra"}\n```'
+        assert parse_batch_response(content, ['T1', 'T2', 'T3']) == {'T1': 'one', 'T2': '• a\n• b'}
+        with pytest.raises(ValueError):
+            parse_batch_response('["not", "an", "object"]', ['T1'])
+        with pytest.raises(ValueError):
+            parse_batch_response('Sure! Here are the summaries', ['T1'])
+
+    @pytest.mark.asyncio
+    async def test_one_request_for_many_terms(self):
+        service, requests = _service(lambda body: _completion(json.dumps({'T1': 'apple', 'T2': 'ai', 'T3': 'tesla'})))
+        assert await service.summarize_batch(BATCH) == ['apple', 'ai', 'tesla']
+        assert len(requests) == 1
+        assert requests[0]['response_format'] == {'type': 'json_object'}
+        assert '### T2: "#ai"' in requests[0]['messages'][1]['content']
+
+    @pytest.mark.asyncio
+    async def test_parse_failure_falls_back_to_single_calls(self):
+        def handler(body):
+            return _completion('not json' if 'response_format' in body else 'single')
+
+        service, requests = _service(handler)
+        assert await service.summarize_batch(BATCH) == ['single'] * 3
+        assert len(requests) == 4
+
+    @pytest.mark.asyncio
+    async def test_missing_api_key_counts_as_request_failure(self):
+        def fallbacks(reason):
+            return REGISTRY.get_sample_value('xmonitor_llm_batch_fallbacks_total', {'reason': reason}) or 0.0
+
+        with patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', None):
+            service = LLMService(transport=httpx.MockTransport(lambda request: _completion('unused')))
+        before = {reason: fallbacks(reason) for reason in ('request', 'parse')}
+        await service.summarize_batch(BATCH)
+        assert fallbacks('request') == before['request'] + 3
+        assert fallbacks('parse') == before['parse']
+
+    @pytest.mark.asyncio
+    async def test_missing_terms_get_single_calls(self):
+        def handler(body):
+            return _completion(json.dumps({'T1': 'apple', 'T3': 'tesla'}) if 'response_format' in body else 'single')
+
+        service, requests = _service(handler)
+        assert await service.summarize_batch(BATCH) == ['apple', 'single', 'tesla']
+        assert len(requests) == 2
+        assert '"#ai"' in requests[1]['messages'][1]['content']
+
+    @pytest.mark.asyncio
+    async def test_daily_job_batches_low_volume_terms(self, db):
+        for keyword in ('$A', '$B', '$C', '$BIG'):
+            crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword=keyword))
+        with patch('app.services.twitter_service.tweepy.Client'), \
+             patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            from app.services.scheduler_service import SchedulerService
+            service = SchedulerService()
+
+        async def search(keyword, **kwargs):
+            count = 30 if keyword == '$BIG' else 2
+            return [{'id': i, 'text': f'{keyword} {i}'} for i in range(count)]
+
+        service.twitter_service.search_tweets = search
+        service.llm_service.summarize_tweets = AsyncMock(return_value='single')
+        service.llm_service.summarize_batch = AsyncMock(side_effect=lambda batch, digests=None: [f'batched {k}' for k, _ in batch])
+        with patch('app.services.scheduler_service.SessionLocal', return_value=db), \
+             patch.object(db, 'close'), \
+             patch.object(Config, 'LLM_BATCH_MAX_TERMS', 2):
+            await service.run_daily_job()
+
+        assert service.llm_service.summarize_tweets.await_count == 1
+        assert [[k for k, _ in call.args[0]] for call in service.llm_service.summarize_batch.await_args_list] == \
+            [['$A', '$B'], ['$C']]
+        summaries = {r.monitored_term.keyword: r.summary for r in crud.get_results(db)}
+        assert summaries == {'$A': 'batched $A', '$B': 'batched $B', '$C': 'batched $C', '$BIG': 'single'}
@@ -0,0 +1,151 @@
+import json
+import pstats
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+
+from app import crud, profiling, schemas
+from app.database import get_db
+from app.http_cache import response_cache
+from app.main import app
+from app.models import JobRun
+
+
+def _scheduler():
+    with patch('app.services.twitter_service.tweepy.Client'), \
+         patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+        from app.services.scheduler_service import SchedulerService
+        return SchedulerService()
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path):
+    with patch('app.profiling.Config.PROFILE_DIR', str(tmp_path)), \
+         patch('app.profiling.Config.PROFILE_SAMPLE_INTERVAL_MS', 1), \
+         patch('app.main.Config.ADMIN_TOKEN', 'secret'):
+        try:
+            yield tmp_path
+        finally:
+            profiling.control.disarm()
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    response_cache.invalidate()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        response_cache.invalidate()
+
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+
+class TestProfiling:
+    """Test cases for stage timings and opt-in profiles of runs and requests."""
+
+    def test_nested_spans_report_self_time(self):
+        with profiling.Trace(profiling.RUN, 'test') as trace:
+            with profiling.span('outer'):
+                _spin(0.02)
+                with profiling.span('inner'):
+                    _spin(0.03)
+        stages = trace.breakdown['stages']
+        assert stages['inner']['count'] == 1
+        assert stages['outer']['seconds'] >= stages['inner']['seconds'] >= 0.03
+        assert stages['outer']['self_seconds'] == pytest.approx(stages['outer']['seconds'] - stages['inner']['seconds'], abs=1e-3)
+        assert trace.profile_id is None
+
+        with profiling.span('outside'):  # no trace: a no-op
+            pass
+
+    @pytest.mark.asyncio
+    async def test_prompt_stage_counts_only_sent_prompts(self):
+        with patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            from app.services.llm_service import LLMService
+            service = LLMService()
+        service._deepseek_summarize = AsyncMock(return_value='summary')
+        tweets = [{'id': 1, 'text': 'hello'}]
+        with profiling.Trace(profiling.RUN, 'test') as trace:
+            service.estimate_prompt_tokens(tweets, '$X')
+            service.estimate_prompt_tokens(tweets, '$X', previous_summary='old')
+            await service.summarize_tweets(tweets, '$X')
+            await service.summarize_incremental(tweets, '$X', 'old')
+        assert trace.breakdown['stages']['prompt']['count'] == 2
+
+    @pytest.mark.asyncio
+    async def test_armed_run_is_profiled_and_recorded(self, db, profile_dir):
+        crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$AAPL'))
+        service = _scheduler()
+
+        async def search(keyword, **kwargs):
+            _spin(0.02)
+            return [{'id': i, 'text': f'tweet {i}'} for i in range(3)]
+
+        service.twitter_service.search_tweets = search
+        service.llm_service.summarize_tweets = AsyncMock(return_value='summary')
+        service.llm_service.summarize_batch = AsyncMock(return_value=['summary'])
+        profiling.control.arm(runs=1)
+        with patch('app.services.scheduler_service.SessionLocal', return_value=db), \
+             patch.object(db, 'close'):
+            await service.run_daily_job()
+            await service.run_daily_job()
+
+        profiled, timed = db.query(JobRun).order_by(JobRun.id).all()
+        assert profiled.job == 'daily' and profiled.stats['terms'] == 1
+        assert {'analytics', 'diff', 'db_write'} <= set(profiled.stages['stages'])
+        assert profiled.profile_id and timed.profile_id is None
+        assert profiling.control.state()['runs'] == 0
+
+        summary = profiling.store.get(profiled.profile_id)
+        assert summary['samples'] > 0 and summary['stages'] == profiled.stages
+        speedscope = json.loads((profile_dir / f'{profiled.profile_id}.speedscope.json').read_text())
+        assert 'search' in {frame['name'] for frame in speedscope['shared']['frames']}
+        stats = pstats.Stats(profiling.store.file(profiled.profile_id, 'pstats'))
+        assert any(name == 'run_daily_job' for _, _, name in stats.stats)
+
+    def test_admin_endpoints_need_token(self, client):
+        assert client.get('/api/admin/profiling').status_code == 401
+        assert client.get('/api/admin/profiling', headers={'X-Admin-Token': 'wrong'}).status_code == 401
+        with patch('app.main.Config.ADMIN_TOKEN', None):
+            assert client.get('/api/admin/profiling', headers=ADMIN).status_code == 403
+        assert client.get('/api/admin/profiling', headers=ADMIN).json() == {
+            'runs': 0, 'requests': 0, 'route_prefix': None, 'active': False
+        }
+
+    def test_armed_request_follows_sync_endpoint_thread(self, client):
+        def slow_terms(db, skip=0, limit=100):
+            _spin(0.05)
+            return []
+
+        state = client.post('/api/admin/profiling', json={'requests': 1, 'route_prefix': '/api/terms'}, headers=ADMIN).json()
+        assert state['requests'] == 1
+        assert 'X-Profile-Id' not in client.get('/api/runs').headers  # outside the prefix
+        with patch('app.main.crud.get_monitored_terms', slow_terms):
+            response = client.get('/api/terms')
+        profile_id = response.headers['X-Profile-Id']
+        assert 'X-Profile-Id' not in client.get('/api/terms').headers  # slot used up
+
+        assert [p['id'] for p in client.get('/api/admin/profiles', headers=ADMIN).json()] == [profile_id]
+        summary = client.get(f'/api/admin/profiles/{profile_id}', headers=ADMIN).json()
+        assert summary['name'] == 'GET /api/terms' and len(summary['threads']) >= 2
+        speedscope = client.get(f'/api/admin/profiles/{profile_id}/speedscope', headers=ADMIN).json()
+        assert 'slow_terms' in {frame['name'] for frame in speedscope['shared']['frames']}
+        assert client.get(f'/api/admin/profiles/{profile_id}/pstats', headers=ADMIN).status_code == 200
+        assert client.get(f'/api/admin/profiles/{profile_id}/svg', headers=ADMIN).status_code == 404
+        assert client.get('/api/admin/profiles/../config', headers=ADMIN).status_code == 404
+
+    def test_profile_header_requires_admin_token(self, client):
+        assert 'X-Profile-Id' not in client.get('/api/runs', headers={'X-Profile': '1'}).headers
+        response = client.get('/api/runs', headers={'X-Profile': '1', **ADMIN})
+        assert profiling.store.get(response.headers['X-Profile-Id'])['kind'] == 'request'
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import requests
+import tweepy
+from unittest.mock import AsyncMock, patch
+
+from app import crud, resilience, schemas, search
+from app.config import Config
+from app.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, DependencyError
+from app.services.llm_service import LLMService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler():
+    with patch('app.services.twitter_service.tweepy.Client'), \
+         patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+        from app.services.scheduler_service import SchedulerService
+        return SchedulerService()
+
+
+class TestResilience:
+    """Test cases for circuit breakers, deadlines, hedging and deferred summaries."""
+
+    def test_breaker_opens_then_probes_once(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('dep', failure_threshold=2, reset_timeout=10, clock=clock)
+        for _ in range(2):
+            breaker.acquire()
+            breaker.release(DependencyError('boom'))
+        assert breaker.state == resilience.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()
+
+        clock.now = 10
+        assert breaker.state == resilience.HALF_OPEN
+        breaker.acquire()  # the probe
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()  # only one probe at a time
+        breaker.release(DependencyError('still down'))
+        assert breaker.state == resilience.OPEN
+
+        clock.now = 20
+        breaker.acquire()
+        breaker.release()
+        assert breaker.state == resilience.CLOSED
+
+    def test_deadline_neither_trips_nor_leaks_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('dep', failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.open_for(5)
+        clock.now = 5
+        with pytest.raises(DeadlineExceeded):
+            with breaker.guard():
+                raise DeadlineExceeded('late')
+        assert breaker.allows()
+
+    def test_deadline_caps_timeouts_and_nests(self):
+        assert resilience.timeout_for(30) == 30
+        with resilience.deadline(5):
+            assert 4 < resilience.timeout_for(30) <= 5
+            with resilience.deadline(60):
+                assert resilience.remaining() <= 5  # the outer deadline is sooner
+        with resilience.deadline(0):
+            with pytest.raises(DeadlineExceeded):
+                resilience.timeout_for(30)
+            assert isinstance(resilience.dependency_error('X', TimeoutError()), DeadlineExceeded)
+        assert isinstance(resilience.dependency_error('X', TimeoutError()), DependencyError)
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_takes_first_success(self):
+        delays = [1.0, 0.0]
+        cancelled = []
+
+        async def call():
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        assert await resilience.hedged('dep', call, delay=0.05) == 0.0
+        await asyncio.sleep(0)
+        assert cancelled == [1.0]
+        assert await resilience.hedged('dep', AsyncMock(return_value='x'), delay=None) == 'x'
+
+    @pytest.mark.asyncio
+    async def test_llm_circuit_opens_after_server_errors(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        with patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            service = LLMService(transport=httpx.MockTransport(handler))
+        for _ in range(Config.CIRCUIT_FAILURE_THRESHOLD):
+            with pytest.raises(DependencyError):
+                await service.summarize_tweets([{'text': 'hi'}], '$X')
+        with pytest.raises(CircuitOpenError):
+            await service.summarize_tweets([{'text': 'hi'}], '$X')
+        assert len(calls) == Config.CIRCUIT_FAILURE_THRESHOLD
+        assert await service.summarize_batch([('$X', [{'text': 'a'}]), ('$Y', [{'text': 'b'}])]) == [None, None]
+
+    def test_long_x_rate_limit_opens_circuit(self):
+        response = requests.Response()
+        response.status_code, response.reason = 429, 'Too Many Requests'
+        response.headers['x-rate-limit-reset'] = str(int(time.time()) + 900)
+        with patch('app.services.twitter_service.tweepy.Client'):
+            from app.services.twitter_service import TwitterService
+            service = TwitterService()
+        service.client.search_recent_tweets.side_effect = tweepy.TooManyRequests(response)
+        with patch('app.services.twitter_service.time.sleep') as sleep:
+            with pytest.raises(resilience.Unavailable):
+                service._search_page(query='$X')
+            with pytest.raises(CircuitOpenError):
+                service._search_page(query='$X')
+        sleep.assert_not_called()
+        assert service.client.search_recent_tweets.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_x_rate_limit_wait_runs_off_the_event_loop(self):
+        response = requests.Response()
+        response.status_code, response.reason = 429, 'Too Many Requests'
+        response.headers['x-rate-limit-reset'] = str(int(time.time()) + 5)
+        with patch('app.services.twitter_service.tweepy.Client'):
+            from app.services.twitter_service import TwitterService
+            service = TwitterService()
+        page = tweepy.Response(data=[], includes={}, errors=[], meta={})
+        service.client.search_recent_tweets.side_effect = [tweepy.TooManyRequests(response), page]
+        sleeping_threads = []
+        with patch('app.services.twitter_service.time.sleep', side_effect=lambda _: sleeping_threads.append(threading.get_ident())):
+            assert await service.search_tweets('$X') == []
+        assert sleeping_threads and threading.get_ident() not in sleeping_threads
+
+    @pytest.mark.asyncio
+    async def test_unavailable_llm_stores_pending_then_sweep_fills_it(self, db):
+        crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$A'))
+        service = _scheduler()
+        service.twitter_service.search_tweets = AsyncMock(return_value=[{'id': '1', 'text': '$A looks great'}])
+        service.llm_service.summarize_batch = AsyncMock(return_value=[None])
+        service.llm_service.summarize_tweets = AsyncMock(return_value='late summary')
+        with patch('app.services.scheduler_service.SessionLocal', return_value=db), \
+             patch.object(db, 'close'):
+            await service.run_daily_job()
+            result = crud.get_results(db)[0]
+            assert result.summary_status == 'pending'
+            assert result.summary.startswith('Summary pending')
+            assert '• Tweets analysed: 1' in result.summary
+
+            assert await service.retry_pending_summaries() == 1
+
+        db.refresh(result)
+        assert (result.summary_status, result.summary) == ('complete', 'late summary')
+        hits, _ = search.search_documents(db, 'late', kind='summary')
+        assert [hit['result_id'] for hit in hits] == [result.id]
+        assert search.search_documents(db, 'pending', kind='summary')[0] == []
+
+    @pytest.mark.asyncio
+    async def test_sweep_skips_open_circuit_and_expires_old_results(self, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$A'))
+        result = crud.create_result(db, schemas.ResultCreate(
+            keyword_id=term.id, tweets_raw=[{'id': '1', 'text': 'x'}], summary='pending', summary_status='pending'
+        ))
+        service = _scheduler()
+        service.llm_service.summarize_tweets = AsyncMock(return_value='s')
+        with patch('app.services.scheduler_service.SessionLocal', return_value=db), \
+             patch.object(db, 'close'):
+            service.llm_service.breaker.open_for(60)
+            assert await service.retry_pending_summaries() == 0
+
+            service.llm_service.breaker = CircuitBreaker('deepseek', 5, 60)
+            result.created_at = datetime.now(timezone.utc) - timedelta(hours=Config.SUMMARY_RETRY_MAX_AGE_HOURS + 1)
+            db.commit()
+            assert await service.retry_pending_summaries() == 0
+
+        db.refresh(result)
+        assert result.summary_status == 'failed'
+        service.llm_service.summarize_tweets.assert_not_awaited()
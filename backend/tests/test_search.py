@@ -0,0 +1,130 @@
+import pytest
+from datetime import datetime, timezone
+
+from app import crud, schemas, search
+from app.models import SearchDocument
+
+
+def _tweet(tweet_id, text, created_at="2024-01-01T10:00:00+00:00"):
+    return {
+        'id': tweet_id,
+        'text': text,
+        'created_at': created_at,
+        'author_id': '1001',
+        'author': {'username': 'user1', 'name': 'User One', 'verified': False},
+        'public_metrics': {'like_count': 1, 'retweet_count': 0},
+        'url': f'https://twitter.com/i/status/{tweet_id}'
+    }
+
+
+class TestSearch:
+    """Test cases for the full-text search index."""
+
+    @pytest.fixture
+    def terms(self, db):
+        orcl = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword="$ORCL"))
+        ai = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword="#AI"))
+        return orcl, ai
+
+    def test_create_result_indexes_tweets_and_summary(self, db, terms):
+        """Writing a result adds one document per tweet plus the summary."""
+        orcl, _ = terms
+        crud.create_result(db, schemas.ResultCreate(
+            keyword_id=orcl.id,
+            tweets_raw=[_tweet(1, 'Oracle earnings beat'), _tweet(2, 'Cloud revenue up')],
+            summary='• Earnings beat expectations'
+        ))
+
+        kinds = sorted(doc.kind for doc in db.query(SearchDocument).all())
+        assert kinds == ['summary', 'tweet', 'tweet']
+
+    def test_search_ranks_and_filters(self, db, terms):
+        """Search matches tokens, ranks results and applies term/kind/date filters."""
+        orcl, ai = terms
+        crud.create_result(db, schemas.ResultCreate(
+            keyword_id=orcl.id,
+            tweets_raw=[
+                _tweet(1, 'Oracle earnings earnings earnings', '2024-01-01T10:00:00+00:00'),
+                _tweet(2, 'Oracle cloud earnings call', '2024-01-03T10:00:00+00:00'),
+            ],
+            summary='Earnings strong'
+        ))
+        crud.create_result(db, schemas.ResultCreate(
+            keyword_id=ai.id,
+            tweets_raw=[_tweet(3, 'AI earnings season')],
+            summary='AI models'
+        ))
+
+        hits, next_cursor = search.search_documents(db, 'earnings')
+        assert len(hits) == 4
+        assert next_cursor is None
+        assert hits[0]['tweet_id'] == '1'  # highest term frequency ranks first
+        assert '[earnings]' in hits[0]['snippet']
+
+        hits, _ = search.search_documents(db, '$ORCL earnings', keyword_id=orcl.id)
+        assert hits == []  # "orcl" never appears in the body text
+
+        hits, _ = search.search_documents(db, 'oracle earnings', keyword_id=orcl.id, kind='tweet')
+        assert {hit['tweet_id'] for hit in hits} == {'1', '2'}
+
+        hits, _ = search.search_documents(
+            db, 'earnings', kind='tweet',
+            since=datetime(2024, 1, 2, tzinfo=timezone.utc),
+            until=datetime(2024, 1, 4, tzinfo=timezone.utc)
+        )
+        assert [hit['tweet_id'] for hit in hits] == ['2']
+
+    def test_keyset_pagination(self, db, terms):
+        """Pages cover every hit exactly once, in rank order."""
+        orcl, _ = terms
+        crud.create_result(db, schemas.ResultCreate(
+            keyword_id=orcl.id,
+            tweets_raw=[_tweet(i, f'oracle update {i}') for i in range(7)],
+            summary='no match here'
+        ))
+
+        all_hits, _ = search.search_documents(db, 'oracle', limit=100)
+        seen, cursor = [], None
+        while True:
+            page, cursor = search.search_documents(db, 'oracle', cursor=cursor, limit=3)
+            seen.extend(hit['id'] for hit in page)
+            if cursor is None:
+                break
+        assert seen == [hit['id'] for hit in all_hits]
+        assert len(seen) == 7
+
+    def test_invalid_cursor_and_empty_query(self, db, terms):
+        """Malformed cursors raise ValueError; punctuation-only queries match nothing."""
+        with pytest.raises(ValueError):
+            search.search_documents(db, 'oracle', cursor='not-a-cursor')
+        assert search.search_documents(db, '"$#') == ([], None)
+
+    def test_rebuild_search_index(self, db, terms):
+        """Rebuilding recreates documents for existing results."""
+        orcl, _ = terms
+        crud.create_result(db, schemas.ResultCreate(
+            keyword_id=orcl.id, tweets_raw=[_tweet(1, 'oracle')], summary='summary'
+        ))
+        db.query(SearchDocument).delete()
+        db.commit()
+        assert search.search_documents(db, 'oracle') == ([], None)
+
+        assert search.rebuild_search_index(db) == 2
+        assert len(db.identity_map) == 0  # chunks are released as it goes
+        hits, _ = search.search_documents(db, 'oracle')
+        assert len(hits) == 1
+
+    def test_summary_document_uses_result_time(self, db, terms):
+        """Live indexing and a rebuild stamp the summary with the result's creation time."""
+        orcl, _ = terms
+        result = crud.create_result(db, schemas.ResultCreate(keyword_id=orcl.id, tweets_raw=[], summary='summary'))
+
+        def summary_time():
+            return db.query(SearchDocument.created_at).filter(SearchDocument.kind == 'summary').scalar()
+
+        live = summary_time()
+        assert live == result.created_at
+        db.query(SearchDocument).delete()
+        db.commit()
+        search.rebuild_search_index(db)
+        assert summary_time() == live
@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from unittest.mock import patch
+
+from app.container import ServiceContainer
+from app.services.llm_service import LLMService
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds app.main may add on top of importing fastapi and sqlalchemy.orm.
+# Measured at ~0.12s once services became lazy (previously ~0.6s).
+IMPORT_BUDGET_SECONDS = 0.5
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import fastapi, sqlalchemy.orm
+baseline = time.perf_counter() - start
+start = time.perf_counter()
+import app.main
+print(json.dumps({
+    "baseline": baseline,
+    "app": time.perf_counter() - start,
+    "loaded": sorted(m for m in ("tweepy", "apscheduler", "numpy") if m in sys.modules),
+}))
+"""
+
+
+def _probe_import():
+    env = {k: v for k, v in os.environ.items() if k != "DEEPSEEK_API_KEY"}
+    env["DB_URL"] = "sqlite://"
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Test cases for lazy service construction and import cost."""
+
+    def test_import_is_light_and_needs_no_llm_key(self):
+        probe = min((_probe_import() for _ in range(3)), key=lambda p: p["app"])
+        assert probe["loaded"] == []
+        assert probe["app"] < IMPORT_BUDGET_SECONDS
+
+    def test_container_builds_shared_services_on_demand(self):
+        container = ServiceContainer()
+        assert container._twitter_service is None and container._llm_service is None
+        with patch('app.services.twitter_service.tweepy.Client'):
+            scheduler = container.scheduler_service
+        assert scheduler.twitter_service is container.twitter_service
+        assert scheduler.llm_service is container.llm_service
+        assert container.stream_service is None
+
+    @pytest.mark.asyncio
+    async def test_missing_llm_key_fails_per_call(self):
+        with patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', ''):
+            service = LLMService()
+        assert not service.available
+        summary = await service.summarize_tweets([{'text': 'hello'}], 'kw')
+        assert summary.startswith("Error generating summary")
+        await service.aclose()
@@ -0,0 +1,199 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from app import crud, schemas
+from app.config import Config
+from app.models import StreamedTweet
+from app.services.stream_service import StreamService
+from app.services.term_matcher import TermMatcher, keyword_tokens
+from app.services.twitter_service import TwitterService, STREAM_RULE_TAG
+from tests.fake_x_stream import FakeXStream, stream_payload
+
+
+class TestTermMatcher:
+    """Test cases for Aho-Corasick term routing."""
+
+    def test_keyword_tokens_drop_operators(self):
+        assert keyword_tokens('$ORCL cloud -spam lang:en OR "earnings"') == ['$orcl', 'cloud', 'earnings']
+
+    def test_match_routes_to_every_term(self):
+        matcher = TermMatcher([(1, '$ORCL'), (2, '#AI'), (3, 'oracle cloud'), (4, 'cloud')])
+        assert matcher.match('$orcl beats; Oracle CLOUD revenue up #ai') == [1, 2, 3, 4]
+        assert matcher.match('cloud only') == [4]
+
+    def test_match_respects_word_boundaries(self):
+        matcher = TermMatcher([(1, '$ORCL'), (2, 'ai'), (3, 'cat')])
+        assert matcher.match('$ORCLX and $ORCL2') == []
+        assert matcher.match('#ai is not the word ai') == [2]
+        assert matcher.match('#ai only') == []
+        assert matcher.match('concatenate category') == []
+
+    def test_overlapping_patterns(self):
+        matcher = TermMatcher([(1, 'he'), (2, 'she'), (3, 'hers')])
+        assert matcher.match('she said hers') == [2, 3]
+        assert matcher.match('she told him: he, hers') == [1, 2, 3]
+
+
+class TestTwitterServiceStream:
+    """Test cases for filtered-stream rules and the reconnecting reader."""
+
+    @pytest.fixture
+    def make_service(self):
+        def make(fake):
+            with patch('app.services.twitter_service.tweepy.Client'):
+                service = TwitterService(transport=fake.transport)
+            service.stream_backoff_scale = 0
+            return service
+        return make
+
+    def test_build_stream_rules_packs_keywords(self, make_service):
+        service = make_service(FakeXStream())
+        with patch.object(Config, 'STREAM_RULE_MAX_LENGTH', 20), patch.object(Config, 'STREAM_MAX_RULES', 2):
+            rules = service.build_stream_rules(['$ORCL', '#AI', 'nvidia', 'tesla', '#AI'])
+        assert rules == ['(#AI) OR ($ORCL)', '(nvidia) OR (tesla)']
+
+    @pytest.mark.asyncio
+    async def test_sync_stream_rules(self, make_service):
+        fake = FakeXStream()
+        fake.rules = [
+            {'id': '90', 'value': '(old)', 'tag': STREAM_RULE_TAG},
+            {'id': '91', 'value': 'someone else', 'tag': 'other-app'},
+        ]
+        service = make_service(fake)
+
+        assert await service.sync_stream_rules(['$ORCL', '#AI']) == {'added': 1, 'deleted': 1}
+        assert sorted(rule['value'] for rule in fake.rules) == ['(#AI) OR ($ORCL)', 'someone else']
+
+        # Already in sync: no changes
+        assert await service.sync_stream_rules(['#AI', '$ORCL']) == {'added': 0, 'deleted': 0}
+
+    @pytest.mark.asyncio
+    async def test_stream_reconnects_after_close_and_errors(self, make_service):
+        fake = FakeXStream([
+            [stream_payload(1, 'first'), stream_payload(2, 'second')],
+            429,
+            500,
+            [stream_payload(3, 'third')],
+        ])
+        service = make_service(fake)
+
+        tweets = [tweet async for tweet in service.stream_tweets(max_connections=4)]
+
+        assert [tweet['id'] for tweet in tweets] == [1, 2, 3]
+        assert tweets[0]['author']['username'] == 'user1'
+        assert tweets[0]['url'] == 'https://twitter.com/i/status/1'
+        assert fake.connection_count == 4
+
+    def test_stream_backoff(self, make_service):
+        service = make_service(FakeXStream())
+        service.stream_backoff_scale = 1.0
+        assert service._stream_backoff('network', 2) == 0.5
+        assert service._stream_backoff('network', 500) == 16.0
+        assert service._stream_backoff('http', 3) == 20.0
+        assert service._stream_backoff('rate_limit', 1) == 60.0
+
+
+class TestStreamService:
+    """Test cases for end-to-end stream ingestion into micro-batched writes."""
+
+    @pytest.mark.asyncio
+    async def test_run_routes_and_writes_batches(self, db):
+        orcl = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$ORCL'))
+        ai = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='#AI'))
+        fake = FakeXStream([
+            [
+                stream_payload(1, '$ORCL and #AI'),
+                stream_payload(2, 'nothing relevant'),
+                stream_payload(3, '$ORCL again'),
+            ],
+            [stream_payload(3, '$ORCL again')],  # redelivered after reconnect
+        ])
+        with patch('app.services.twitter_service.tweepy.Client'):
+            twitter_service = TwitterService(transport=fake.transport)
+        twitter_service.stream_backoff_scale = 0
+        on_tweets = Mock()
+        service = StreamService(twitter_service, on_tweets=on_tweets, session_factory=lambda: db)
+        service.load_terms([orcl, ai])
+        orcl_id, ai_id = orcl.id, ai.id
+
+        with patch.object(Config, 'STREAM_BATCH_SIZE', 2):
+            await service.run(max_connections=2)
+
+        stored = {(row.keyword_id, row.tweet_id) for row in db.query(StreamedTweet).all()}
+        assert stored == {(orcl_id, '1'), (ai_id, '1'), (orcl_id, '3')}
+        assert service.stats == {'received': 4, 'unmatched': 1, 'routed': 4, 'written': 3}
+        assert on_tweets.called
+
+    @pytest.mark.asyncio
+    async def test_restrict_following_filters_authors(self, db):
+        term = crud.create_monitored_term(
+            db, schemas.MonitoredTermCreate(keyword='$ORCL', restrict_following=True)
+        )
+        twitter_service = Mock()
+        twitter_service.get_following_user_ids = Mock(return_value=None)
+
+        async def following():
+            return {'1001'}
+        twitter_service.get_following_user_ids.side_effect = following
+        service = StreamService(twitter_service, session_factory=lambda: db)
+        service.load_terms([term])
+
+        assert await service.route({'id': 1, 'text': '$ORCL', 'author_id': 1001}) == [term.id]
+        assert await service.route({'id': 2, 'text': '$ORCL', 'author_id': 2002}) == []
+
+    @pytest.mark.asyncio
+    async def test_flush_skips_terms_removed_since_buffering(self, db):
+        orcl = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$ORCL'))
+        ai = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='#AI'))
+        on_tweets = Mock()
+        service = StreamService(Mock(), on_tweets=on_tweets, session_factory=lambda: db)
+        service.load_terms([orcl, ai])
+        await service.route({'id': 1, 'text': '$ORCL and #AI'})
+        service.load_terms([ai])
+
+        assert await service.flush() == 2
+        assert [call.args[1].keyword for call in on_tweets.call_args_list] == ['#AI']
+        assert service.stats['written'] == 2
+
+    @pytest.mark.asyncio
+    async def test_process_term_consumes_pending_stream_tweets(self, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$ORCL'))
+        crud.create_streamed_tweets(db, [
+            (term.id, {'id': i, 'text': f'$ORCL {i}', 'created_at': '2024-01-01T10:00:00Z'})
+            for i in range(3)
+        ])
+        with patch('app.services.twitter_service.tweepy.Client'), \
+             patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            from app.services.scheduler_service import SchedulerService
+            scheduler_service = SchedulerService()
+
+        with patch.object(Config, 'INGESTION_MODE', 'stream'), \
+             patch.object(scheduler_service.llm_service, 'summarize_tweets', return_value='summary') as mock_llm, \
+             patch.object(scheduler_service.twitter_service, 'search_tweets') as mock_search:
+            await scheduler_service.process_term(db, term)
+
+        mock_search.assert_not_called()
+        assert len(mock_llm.call_args[0][0]) == 3
+        assert crud.get_pending_streamed_tweets(db, keyword_id=term.id) == []
+
+    @pytest.mark.asyncio
+    async def test_backlog_beyond_one_run_stays_pending(self, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$ORCL'))
+        crud.create_streamed_tweets(db, [
+            (term.id, {'id': i, 'text': f'$ORCL {i}', 'created_at': '2024-01-01T10:00:00Z'})
+            for i in range(60)
+        ])
+        with patch('app.services.twitter_service.tweepy.Client'), \
+             patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            from app.services.scheduler_service import SchedulerService
+            scheduler_service = SchedulerService()
+
+        with patch.object(Config, 'INGESTION_MODE', 'stream'), \
+             patch.object(scheduler_service.llm_service, 'summarize_tweets', return_value='summary') as mock_llm:
+            await scheduler_service.process_term(db, term)
+            assert [t['id'] for t in mock_llm.call_args[0][0]] == list(range(50))
+            assert [row.tweet['id'] for row in crud.get_pending_streamed_tweets(db, keyword_id=term.id)] == list(range(50, 60))
+
+            await scheduler_service.process_term(db, term)
+            assert [t['id'] for t in mock_llm.call_args[0][0]] == list(range(50, 60))
+        assert crud.get_pending_streamed_tweets(db, keyword_id=term.id) == []
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app import crud, schemas
+from app.models import Result
+from app.services import summary_diff
+
+
+def _tweets(ids, prefix='tweet'):
+    return [{'id': i, 'text': f'{prefix} number {i}'} for i in ids]
+
+
+def _scheduler():
+    with patch('app.services.twitter_service.tweepy.Client'), \
+         patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+        from app.services.scheduler_service import SchedulerService
+        return SchedulerService()
+
+
+class TestSummaryDiff:
+    """Test cases for re-summarising only what changed since the previous result."""
+
+    def test_plan_by_overlap(self):
+        previous = _tweets(range(10))
+        assert summary_diff.plan_summary(_tweets(range(10)), previous)[0] == summary_diff.REUSE
+        mode, new_tweets, overlap = summary_diff.plan_summary(_tweets(range(4, 14)), previous)
+        assert (mode, [t['id'] for t in new_tweets], overlap) == (summary_diff.INCREMENTAL, [10, 11, 12, 13], 0.6)
+        mode, new_tweets, _ = summary_diff.plan_summary(_tweets(range(8, 18)), previous)
+        assert mode == summary_diff.FULL and len(new_tweets) == 10
+        assert summary_diff.plan_summary(_tweets(range(3)), None)[0] == summary_diff.FULL
+
+    def test_retweets_and_links_count_as_seen(self):
+        previous = [{'id': 1, 'text': 'Big news on $X https://t.co/abc'}]
+        tweets = [{'id': 2, 'text': 'RT @someone: big news   on $X https://t.co/zzz'}]
+        assert summary_diff.plan_summary(tweets, previous)[0] == summary_diff.REUSE
+
+    @pytest.mark.asyncio
+    async def test_daily_job_reuses_and_updates_incrementally(self, db):
+        stable = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$STABLE'))
+        moving = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$MOVING'))
+        for term, ids in ((stable, range(20)), (moving, range(20))):
+            crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=_tweets(ids), summary=f'old {term.keyword}'))
+
+        service = _scheduler()
+
+        async def search(keyword, **kwargs):
+            return _tweets(range(20) if keyword == '$STABLE' else range(5, 25))
+
+        service.twitter_service.search_tweets = search
+        service.llm_service.summarize_tweets = AsyncMock(return_value='full')
+        service.llm_service.summarize_batch = AsyncMock(return_value=['full'])
+        service.llm_service.summarize_incremental = AsyncMock(return_value='updated')
+        with patch('app.services.scheduler_service.SessionLocal', return_value=db), \
+             patch.object(db, 'close'):
+            await service.run_daily_job()
+
+        latest = {r.monitored_term.keyword: r for r in db.query(Result).order_by(Result.id.desc()).limit(2)}
+        assert (latest['$STABLE'].summary, latest['$STABLE'].summary_mode) == ('old $STABLE', 'reuse')
+        assert (latest['$MOVING'].summary, latest['$MOVING'].summary_mode) == ('updated', 'incremental')
+        new_tweets, keyword, previous_summary = service.llm_service.summarize_incremental.await_args.args
+        assert [t['id'] for t in new_tweets] == [20, 21, 22, 23, 24]
+        assert previous_summary == 'old $MOVING'
+        service.llm_service.summarize_tweets.assert_not_awaited()
+
+        stats = service.run_stats
+        assert stats['summaries'] == {'full': 0, 'incremental': 1, 'reuse': 1}
+        assert stats['skipped_ratio'] == 0.5
+        assert 0.5 < stats['tokens_saved_ratio'] < 1
+
+    def test_reused_and_failed_results_are_not_a_baseline(self, db):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$A'))
+        generated = crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=_tweets([1]), summary='s'))
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=_tweets([1]), summary='s', summary_mode='reuse'))
+        crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=[], summary='p', summary_status='pending'))
+        assert crud.get_previous_results(db, [term.id])[term.id].id == generated.id
+        assert crud.get_previous_results(db, []) == {}
@@ -0,0 +1,108 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+
+from app import crud, schemas
+from app.container import get_services
+from app.database import get_db
+from app.http_cache import response_cache
+from app.main import app
+from app.models import Anomaly, MonitoredTerm, Result, SearchDocument, StreamedTweet, TermMetric, TermMetricTweet
+from app.term_registry import TermRegistry, registry
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    response_cache.invalidate()
+    registry.invalidate()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        response_cache.invalidate()
+        registry.invalidate()
+
+
+class TestTermRegistry:
+    """Test cases for bulk term management and the keyword -> term registry."""
+
+    def test_bulk_import_skips_or_updates_existing_keywords(self, client, db):
+        client.post('/api/terms', json={'keyword': '$AAPL'})
+        response = client.post('/api/terms/bulk', json={'terms': [
+            {'keyword': ' $aapl', 'active': False},
+            {'keyword': '$MSFT'},
+            {'keyword': '$msft '},
+            {'keyword': '$NVDA', 'restrict_following': True},
+        ]})
+        assert response.json() == {'created': 2, 'updated': 0, 'skipped': 2, 'deleted': 0}
+        assert db.query(MonitoredTerm).count() == 3
+
+        response = client.post('/api/terms/bulk', json={
+            'terms': [{'keyword': '$AAPL', 'active': False}, {'keyword': '$NVDA', 'restrict_following': True}],
+            'on_conflict': 'update'
+        })
+        assert response.json()['updated'] == 1 and response.json()['skipped'] == 1
+        assert {t['keyword']: t['active'] for t in client.get('/api/terms').json()}['$AAPL'] is False
+
+    def test_duplicate_keyword_is_a_conflict(self, client):
+        client.post('/api/terms', json={'keyword': 'Tesla  Motors'})
+        assert client.post('/api/terms', json={'keyword': 'tesla motors'}).status_code == 409
+        other = client.post('/api/terms', json={'keyword': '$TSLA'}).json()
+        assert client.put(f"/api/terms/{other['id']}", json={'keyword': 'TESLA MOTORS'}).status_code == 409
+        assert client.get(f"/api/terms/{other['id']}/timeseries").status_code == 200
+
+    def test_bulk_update_and_delete_are_all_or_nothing(self, client, db):
+        client.post('/api/terms/bulk', json={'terms': [{'keyword': f'$T{i}'} for i in range(3)]})
+        ids = [t['id'] for t in client.get('/api/terms').json()]
+
+        response = client.put('/api/terms/bulk', json={'terms': [{'id': ids[0], 'active': False}, {'id': 999, 'active': False}]})
+        assert response.status_code == 404
+        assert '999' in response.json()['detail']
+        assert all(term.active for term in db.query(MonitoredTerm))
+
+        response = client.put('/api/terms/bulk', json={'terms': [{'id': i, 'active': False} for i in ids[:2]]})
+        assert response.json()['updated'] == 2
+        assert [t['active'] for t in client.get('/api/terms').json()] == [False, False, True]
+
+        assert client.post('/api/terms/bulk/delete', json={'ids': [ids[0], 999]}).status_code == 404
+        assert client.post('/api/terms/bulk/delete', json={'ids': ids[:2]}).json()['deleted'] == 2
+        assert [t['id'] for t in client.get('/api/terms').json()] == ids[2:]
+
+    def test_deleting_terms_removes_their_results(self, client, db):
+        client.post('/api/terms/bulk', json={'terms': [{'keyword': '$AAPL'}, {'keyword': '$MSFT'}, {'keyword': '$NVDA'}]})
+        apple, msft, nvda = db.query(MonitoredTerm).order_by(MonitoredTerm.id).all()
+        tweets = [{'id': '1', 'text': 'earnings beat', 'author_id': '7', 'created_at': '2026-10-01T12:00:00+00:00'}]
+        for term in (apple, msft, nvda):
+            result = crud.create_result(db, schemas.ResultCreate(keyword_id=term.id, tweets_raw=tweets, summary='summary'))
+            crud.create_streamed_tweets(db, [(term.id, tweets[0])])
+            crud.create_anomaly(db, schemas.AnomalyCreate(
+                keyword_id=term.id, bucket_start=result.created_at, tweet_count=50, baseline_mean=5.0, zscore=6.0
+            ))
+
+        assert client.post('/api/terms/bulk/delete', json={'ids': [apple.id, msft.id]}).json()['deleted'] == 2
+        assert client.delete(f'/api/terms/{nvda.id}').status_code == 200
+        for model in (MonitoredTerm, Result, SearchDocument, TermMetric, TermMetricTweet, Anomaly, StreamedTweet):
+            assert db.query(model).count() == 0
+
+    def test_registry_reloads_after_writes(self, db):
+        terms = TermRegistry(ttl=3600)
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$AAPL'))
+        assert terms.lookup(db, ' $aapl ').id == term.id
+        db.add(MonitoredTerm(keyword='$MSFT'))
+        db.commit()
+        assert terms.lookup(db, '$MSFT') is None  # not through crud, so still cached
+        terms.invalidate()
+        assert terms.lookup(db, '$msft').keyword == '$MSFT'
+
+    def test_manual_run_stores_result_for_term_past_first_page(self, client, db):
+        client.post('/api/terms/bulk', json={'terms': [{'keyword': f'$T{i}'} for i in range(150)]})
+        container = MagicMock()
+        container.twitter_service.search_tweets = AsyncMock(return_value=[{'id': '1', 'text': 'hello'}])
+        container.llm_service.summarize_tweets = AsyncMock(return_value='summary')
+        app.dependency_overrides[get_services] = lambda: container
+
+        response = client.post('/api/run', json={'keyword': '$t149'})
+        assert response.status_code == 200
+        result = db.query(Result).one()
+        assert result.monitored_term.keyword == '$T149'
@@ -0,0 +1,128 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+from app import crud, schemas
+from app.services.trend_service import CountMinSketch, TrendDetector, extract_tags
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _tweets(first_id, count, hour, text='tweet'):
+    created_at = (START + timedelta(hours=hour)).isoformat()
+    return [
+        {'id': first_id + i, 'text': text, 'created_at': created_at}
+        for i in range(count)
+    ]
+
+
+class TestTrendDetector:
+    """Test cases for online spike detection."""
+
+    @pytest.fixture
+    def detector(self):
+        return TrendDetector(bucket_seconds=3600, alpha=0.3, zscore_threshold=3.0,
+                             min_count=5, warmup_buckets=3)
+
+    def test_extract_tags(self):
+        assert extract_tags('$ORCL up, #AI and #ai again; email a#b $5') == ['#ai', '$orcl']
+
+    def test_count_min_sketch_never_undercounts(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(500):
+            sketch.add(f'key{i % 50}')
+        assert all(sketch.estimate(f'key{i}') >= 10 for i in range(50))
+        assert sketch.estimate('missing') <= sketch.total
+
+    def test_steady_volume_raises_no_anomaly(self, detector):
+        next_id = 1
+        for hour in range(8):
+            assert detector.observe(1, _tweets(next_id, 6, hour)) == []
+            next_id += 6
+        assert detector.state(1).mean == pytest.approx(6.0)
+
+    def test_spike_in_open_bucket_is_reported_once(self, detector):
+        next_id = 1
+        for hour in range(5):
+            detector.observe(1, _tweets(next_id, 5, hour))
+            next_id += 5
+
+        anomalies = detector.observe(1, _tweets(next_id, 40, 5, text='$ORCL #earnings'))
+        assert len(anomalies) == 1
+        assert anomalies[0]['keyword_id'] == 1
+        assert anomalies[0]['tweet_count'] == 40
+        assert anomalies[0]['bucket_start'] == START + timedelta(hours=5)
+        assert {t['tag'] for t in anomalies[0]['top_tags']} == {'$orcl', '#earnings'}
+
+        # More tweets in the same bucket, and closing it, do not re-alert
+        assert detector.observe(1, _tweets(next_id + 40, 10, 5)) == []
+        assert detector.observe(1, _tweets(next_id + 50, 5, 6)) == []
+
+    def test_refetched_tweets_are_ignored(self, detector):
+        batch = _tweets(1, 6, 0)
+        detector.observe(1, batch)
+        detector.observe(1, batch)
+        assert detector.state(1).open_count == 6
+
+    def test_no_alert_during_warmup(self, detector):
+        detector.observe(1, _tweets(1, 5, 0))
+        assert detector.observe(1, _tweets(100, 50, 1)) == []
+
+
+class TestSchedulerSpikes:
+    """Test cases for spike handling in SchedulerService."""
+
+    @pytest.fixture
+    def scheduler_service(self):
+        with patch('app.services.twitter_service.tweepy.Client'), \
+             patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            from app.services.scheduler_service import SchedulerService
+            service = SchedulerService()
+        service.trend_detector = TrendDetector(bucket_seconds=3600, min_count=5, warmup_buckets=3)
+        return service
+
+    def test_observe_tweets_stores_anomalies_and_triggers_run(self, db, scheduler_service):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword="$ORCL"))
+        next_id = 1
+        for hour in range(5):
+            scheduler_service.observe_tweets(db, term, _tweets(next_id, 5, hour))
+            next_id += 5
+
+        with patch.object(scheduler_service, 'trigger_term_run') as mock_trigger:
+            scheduler_service.observe_tweets(db, term, _tweets(next_id, 60, 5))
+
+        anomalies = crud.get_anomalies(db, keyword_id=term.id)
+        assert len(anomalies) == 1
+        assert anomalies[0].tweet_count == 60
+        mock_trigger.assert_called_once_with(term.id)
+
+    def test_trigger_term_run_respects_cooldown(self, scheduler_service):
+        scheduler_service.scheduler = Mock(running=True)
+        scheduler_service._last_term_run[1] = datetime.now(timezone.utc)
+        assert scheduler_service.trigger_term_run(1) is False
+        scheduler_service.scheduler.add_job.assert_not_called()
+
+        scheduler_service._last_term_run[1] -= timedelta(days=1)
+        assert scheduler_service.trigger_term_run(1) is True
+        scheduler_service.scheduler.add_job.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_spike_in_polled_tweets_schedules_term_run(self, db, scheduler_service):
+        term = crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword="$ORCL"))
+        scheduler_service.scheduler = Mock(running=True)
+        scheduler_service.llm_service.summarize_tweets = AsyncMock(return_value='summary')
+        batches = [_tweets(1 + 5 * hour, 5, hour) for hour in range(5)] + [_tweets(100, 60, 5)]
+        scheduler_service.twitter_service.search_tweets = AsyncMock(side_effect=batches)
+
+        for _ in range(5):
+            await scheduler_service.process_term(db, term)
+            # The next scheduled poll comes well after the cooldown
+            scheduler_service._last_term_run[term.id] -= timedelta(days=1)
+        scheduler_service.scheduler.add_job.assert_not_called()
+
+        await scheduler_service.process_term(db, term)
+        assert len(crud.get_anomalies(db, keyword_id=term.id)) == 1
+        scheduler_service.scheduler.add_job.assert_called_once()
+        assert scheduler_service.scheduler.add_job.call_args.kwargs['args'] == [term.id]
+        assert datetime.now(timezone.utc) - scheduler_service._last_term_run[term.id] < timedelta(minutes=1)
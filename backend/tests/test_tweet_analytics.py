@@ -0,0 +1,92 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app import crud, schemas
+from app.services import tweet_analytics
+from app.services.llm_service import LLMService
+
+
+def _tweets(*texts):
+    return [{'id': str(i), 'text': text} for i, text in enumerate(texts, 1)]
+
+
+class TestTweetAnalytics:
+    """Test cases for local pre-summary analytics."""
+
+    def test_sentiment_and_negation(self):
+        insights = tweet_analytics.analyze_tweets('$AAPL', _tweets(
+            'great quarter, strong gains',
+            'this is not good at all',
+            'earnings call at 5pm',
+        ))
+        sentiment = insights['sentiment']
+        assert (sentiment['positive'], sentiment['negative'], sentiment['neutral']) == (1, 1, 1)
+        assert insights['most_positive_id'] == '1'
+        assert insights['most_negative_id'] == '2'
+
+    def test_entities_are_counted_per_group(self):
+        insights = tweet_analytics.analyze_tweets('$AAPL', _tweets(
+            '$AAPL and $MSFT #earnings via @analyst https://t.co/x',
+            'watching $MSFT #earnings',
+        ))
+        assert insights['cashtags'] == [['$msft', 2], ['$aapl', 1]]
+        assert insights['hashtags'] == [['#earnings', 2]]
+        assert insights['mentions'] == [['@analyst', 1]]
+
+    def test_top_terms_favour_distinctive_words_and_skip_keyword(self):
+        results = tweet_analytics.analyze_batch([
+            ('tesla', _tweets('tesla deliveries market', 'tesla deliveries record market')),
+            ('nvidia', _tweets('nvidia chips market', 'nvidia chips demand market')),
+        ])
+        tesla_terms = [term for term, _ in results[0]['top_terms']]
+        assert tesla_terms[0] == 'deliveries'
+        assert 'tesla' not in tesla_terms
+        # "market" appears for both terms, so it ranks below words unique to one
+        assert tesla_terms.index('market') > tesla_terms.index('deliveries')
+        assert results[1]['top_terms'][0][0] == 'chips'
+
+    def test_empty_group_and_digest(self):
+        results = tweet_analytics.analyze_batch([('$A', []), ('$B', _tweets('bullish on $B'))])
+        assert results[0]['tweet_count'] == 0
+        assert tweet_analytics.format_digest(results[0]) == ''
+        digest = tweet_analytics.format_digest(results[1])
+        assert '• Tweets analysed: 1' in digest
+        assert '• Cashtags: $b (1)' in digest
+
+    @pytest.mark.asyncio
+    async def test_digest_in_prompt_and_as_fallback(self):
+        prompts = []
+
+        def handler(request):
+            prompts.append(request.content.decode())
+            return httpx.Response(400)
+
+        with patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            service = LLMService(transport=httpx.MockTransport(handler))
+        tweets = _tweets(*[f'tweet {i}' for i in range(30)])
+        summary = await service.summarize_tweets(tweets, '$X', digest='• Sentiment: +0.50')
+        assert summary.startswith('Automated summary (LLM unavailable')
+        assert summary.endswith('• Sentiment: +0.50')
+        assert 'Precomputed analytics over all 30 tweets' in prompts[0]
+        assert 'tweet 9' in prompts[0] and 'tweet 10' not in prompts[0]
+
+    @pytest.mark.asyncio
+    async def test_daily_job_stores_insights(self, db):
+        crud.create_monitored_term(db, schemas.MonitoredTermCreate(keyword='$A'))
+        with patch('app.services.twitter_service.tweepy.Client'), \
+             patch('app.services.llm_service.Config.DEEPSEEK_API_KEY', 'test-key'):
+            from app.services.scheduler_service import SchedulerService
+            service = SchedulerService()
+
+        service.twitter_service.search_tweets = AsyncMock(return_value=_tweets('$A looks great', '$A crash'))
+        service.llm_service.summarize_batch = AsyncMock(return_value=['summary'])
+        with patch('app.services.scheduler_service.SessionLocal', return_value=db), \
+             patch.object(db, 'close'):
+            await service.run_daily_job()
+
+        digests = service.llm_service.summarize_batch.await_args.kwargs['digests']
+        assert '• Tweets analysed: 2' in digests[0]
+        result = crud.get_results(db)[0]
+        assert result.insights['tweet_count'] == 2
+        assert result.insights['sentiment']['positive'] == 1
@@ -103,7 +103,7 @@ class TestTwitterService:
         service, mock_client = mock_twitter_service
         
         # Mock followed user IDs - only user 1001 is followed
-        with patch.object(service, '_get_following_user_ids', new_callable=AsyncMock) as mock_following:
+        with patch.object(service, 'get_following_user_ids', new_callable=AsyncMock) as mock_following:
             mock_following.return_value = {'1001'}  # Only user1 is followed
             
             result = await service._filter_tweets_by_following(sample_tweets)
@@ -131,18 +131,18 @@ class TestTwitterService:
             mock_paginator_class.return_value = mock_paginator
             
             # First call should hit the API
-            result1 = await service._get_following_user_ids()
+            result1 = await service.get_following_user_ids()
             assert result1 == {'1001', '1002', '1003'}
             assert mock_client.get_me.call_count == 1
             
             # Second call should use cache
-            result2 = await service._get_following_user_ids()
+            result2 = await service.get_following_user_ids()
             assert result2 == {'1001', '1002', '1003'}
             assert mock_client.get_me.call_count == 1  # Still only 1 call
             
             # Clear cache and call again
             service.clear_following_cache()
-            result3 = await service._get_following_user_ids()
+            result3 = await service.get_following_user_ids()
             assert result3 == {'1001', '1002', '1003'}
             assert mock_client.get_me.call_count == 2  # Now 2 calls
     
@@ -170,7 +170,7 @@ class TestTwitterService:
         """Test behavior when no following list is available."""
         service, mock_client = mock_twitter_service
         
-        with patch.object(service, '_get_following_user_ids', new_callable=AsyncMock) as mock_following:
+        with patch.object(service, 'get_following_user_ids', new_callable=AsyncMock) as mock_following:
             mock_following.return_value = set()  # Empty following list
             
             result = await service._filter_tweets_by_following(sample_tweets)
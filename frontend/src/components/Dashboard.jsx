@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react'
 import { Plus, Play, Edit2, Trash2 } from 'lucide-react'
-import { termsApi, runApi } from '../services/api'
+import { termsApi, runApi, subscribeToEvents } from '../services/api'
 import AddTermModal from './AddTermModal'
 import LoadingSpinner from './LoadingSpinner'
 
@@ -9,9 +9,16 @@ const Dashboard = () => {
   const [loading, setLoading] = useState(true)
   const [showAddModal, setShowAddModal] = useState(false)
   const [runningTerm, setRunningTerm] = useState(null)
+  const [latestByTerm, setLatestByTerm] = useState({})
 
   useEffect(() => {
     loadTerms()
+    return subscribeToEvents({
+      result: (event) => setLatestByTerm(prev => ({ ...prev, [event.keyword_id]: event })),
+      result_updated: (event) => setLatestByTerm(prev => (
+        prev[event.keyword_id]?.result_id === event.result_id ? { ...prev, [event.keyword_id]: event } : prev
+      )),
+    })
   }, [])
 
   const loadTerms = async () => {
@@ -32,6 +39,9 @@ const Dashboard = () => {
       setShowAddModal(false)
     } catch (error) {
       console.error('Error adding term:', error)
+      if (error.response?.status === 409) {
+        alert(`"${termData.keyword}" is already being monitored.`)
+      }
     }
   }
 
@@ -130,6 +140,11 @@ const Dashboard = () => {
               <tr key={term.id} className={term.active ? '' : 'bg-gray-50'}>
                 <td className="px-6 py-4 whitespace-nowrap">
                   <div className="text-sm font-medium text-gray-900">{term.keyword}</div>
+                  {latestByTerm[term.id] && (
+                    <div className="mt-1 max-w-md truncate text-xs text-gray-500" title={latestByTerm[term.id].summary_preview}>
+                      New result · {latestByTerm[term.id].tweet_count} tweets · {latestByTerm[term.id].summary_preview}
+                    </div>
+                  )}
                 </td>
                 <td className="px-6 py-4 whitespace-nowrap">
                   <button
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react'
 import { ExternalLink, Calendar, MessageSquare, Code } from 'lucide-react'
-import { resultsApi } from '../services/api'
+import { resultsApi, subscribeToEvents } from '../services/api'
 import LoadingSpinner from './LoadingSpinner'
 
 const Results = () => {
@@ -11,8 +11,33 @@ const Results = () => {
 
   useEffect(() => {
     loadResults()
+    return subscribeToEvents({
+      result: (event) => addResult(event.result_id),
+      result_updated: (event) => replaceResult(event.result_id),
+      resync: () => loadResults(),
+    })
   }, [])
 
+  // Fetch only the new result instead of re-downloading the whole list
+  const addResult = async (resultId) => {
+    try {
+      const response = await resultsApi.getById(resultId)
+      setResults(prev => [response.data, ...prev.filter(r => r.id !== resultId)])
+    } catch (error) {
+      console.error('Error loading new result:', error)
+    }
+  }
+
+  // A pending summary was filled in by the retry sweep; update it in place
+  const replaceResult = async (resultId) => {
+    try {
+      const response = await resultsApi.getById(resultId)
+      setResults(prev => prev.map(r => (r.id === resultId ? response.data : r)))
+    } catch (error) {
+      console.error('Error reloading result:', error)
+    }
+  }
+
   const loadResults = async () => {
     try {
       const response = await resultsApi.getAll()
@@ -84,6 +109,21 @@ const Results = () => {
                   {result.monitored_term?.keyword || 'Unknown Term'}
                 </h3>
                 <div className="flex items-center space-x-4">
+                  {result.summary_mode === 'reuse' && (
+                    <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-gray-100 text-gray-800" title="Most tweets were already covered by the previous summary">
+                      Unchanged
+                    </span>
+                  )}
+                  {result.summary_mode === 'incremental' && (
+                    <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-blue-100 text-blue-800" title="Previous summary updated with new tweets">
+                      Updated
+                    </span>
+                  )}
+                  {result.summary_status === 'pending' && (
+                    <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-yellow-100 text-yellow-800">
+                      Summary pending
+                    </span>
+                  )}
                   <button
                     onClick={(e) => {
                       e.stopPropagation()
@@ -101,6 +141,16 @@ const Results = () => {
                 </div>
               </div>
               
+              {result.insights && result.insights.tweet_count > 0 && (
+                <p className="mt-2 text-xs text-gray-500">
+                  Sentiment {result.insights.sentiment.mean >= 0 ? '+' : ''}{result.insights.sentiment.mean.toFixed(2)}
+                  {' '}({result.insights.sentiment.positive} positive, {result.insights.sentiment.negative} negative)
+                  {result.insights.top_terms.length > 0 && (
+                    <> · {result.insights.top_terms.slice(0, 5).map(([term]) => term).join(', ')}</>
+                  )}
+                </p>
+              )}
+
               <div className="mt-4">
                 <div className="text-sm text-gray-600">
                   {formatSummary(result.summary).slice(0, 2)}
@@ -25,4 +25,15 @@ export const runApi = {
   manual: (request) => api.post('/api/run', request),
 }
 
+// Server-sent events: `result` (new result preview), `job_completed` and
+// `resync` (the client missed events and should refetch). EventSource
+// reconnects on its own and resumes from the last event id.
+export const subscribeToEvents = (handlers) => {
+  const source = new EventSource(`${API_BASE_URL}/api/events`)
+  Object.entries(handlers).forEach(([type, handler]) => {
+    source.addEventListener(type, (event) => handler(JSON.parse(event.data)))
+  })
+  return () => source.close()
+}
+
 export default api
\ No newline at end of file
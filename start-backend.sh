@@ -1,4 +1,5 @@
 #!/bin/bash
 cd backend
 source venv/bin/activate
+alembic upgrade head
 python -m uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file